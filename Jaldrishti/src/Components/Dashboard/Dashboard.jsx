@@ -1,30 +1,43 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import './Dashboard.css';
 
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+
 const Dashboard = () => {
+  const [stats, setStats] = useState(null);
+
+  useEffect(() => {
+    fetch(`${API_URL}/reports/stats`)
+      .then((res) => (res.ok ? res.json() : null))
+      .then(setStats)
+      .catch(() => setStats(null));
+  }, []);
+
+  const show = (value) => (stats ? value : '—');
+
   return (
     <div className="dashboard">
       <h1>Water Hazard Dashboard</h1>
       <div className="dashboard-grid">
         <div className="dashboard-card">
           <h3>Total Reports</h3>
-          <p className="stat">156</p>
+          <p className="stat">{show(stats?.total_reports)}</p>
         </div>
         <div className="dashboard-card">
           <h3>Active Hazards</h3>
-          <p className="stat">42</p>
+          <p className="stat">{show(stats?.active_hazards)}</p>
         </div>
         <div className="dashboard-card">
           <h3>Resolved Issues</h3>
-          <p className="stat">114</p>
+          <p className="stat">{show(stats?.resolved)}</p>
         </div>
         <div className="dashboard-card">
-          <h3>Response Time</h3>
-          <p className="stat">24h</p>
+          <h3>High Risk</h3>
+          <p className="stat">{show(stats?.by_risk?.High ?? 0)}</p>
         </div>
       </div>
     </div>
   );
 };
 
-export default Dashboard;
\ No newline at end of file
+export default Dashboard;
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+
+# What a request may run: the text models, the image models, and why not.
+Decision = namedtuple("Decision", "text_models images reason")
+
+FULL_QUALITY = "full"
+LEXICON_ONLY = "lexicon-only"
+
+
+class AdmissionController:
+    """Degrades requests to lexicon-only scoring when the service is overloaded.
+
+    Pressure is the worst of: requests in flight, text-model queue depth and
+    recent text-model latency, each relative to its limit. At pressure >= 1
+    new requests skip the models (and images) until it falls back below
+    `low_watermark`; texts with high-severity keywords keep the full path
+    until `priority_headroom`. Latency is an EWMA that decays once nothing
+    new is observed, so a drained service recovers without traffic.
+    """
+
+    def __init__(self, max_inflight=64, max_queue=256, target_latency_ms=500.0,
+                 max_image_queue=None, queue_depth=None, image_queue_depth=None,
+                 priority_headroom=2.0, low_watermark=0.7, half_life_s=5.0, clock=time.monotonic):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.target_latency = target_latency_ms / 1000.0
+        self.max_image_queue = max_image_queue
+        self.queue_depth = queue_depth or (lambda: 0)
+        self.image_queue_depth = image_queue_depth or (lambda: 0)
+        self.priority_headroom = priority_headroom
+        self.low_watermark = low_watermark
+        self.half_life = half_life_s
+        self.clock = clock
+        self.inflight = 0
+        self.degraded = False
+        self._latency = 0.0
+        self._latency_at = clock()
+        self._lock = threading.Lock()
+        self.decisions = Counter()
+
+    @contextmanager
+    def slot(self):
+        with self._lock:
+            self.inflight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.inflight -= 1
+
+    def observe_latency(self, seconds):
+        with self._lock:
+            self._latency = 0.8 * self._decayed_latency() + 0.2 * seconds
+            self._latency_at = self.clock()
+
+    def _decayed_latency(self):
+        age = self.clock() - self._latency_at
+        return self._latency * 0.5 ** (age / self.half_life) if self.half_life else self._latency
+
+    def pressure(self):
+        with self._lock:
+            latency = self._decayed_latency()
+            inflight = self.inflight
+        parts = {
+            "inflight": inflight / self.max_inflight if self.max_inflight else 0.0,
+            "queue": self.queue_depth() / self.max_queue if self.max_queue else 0.0,
+            "latency": latency / self.target_latency if self.target_latency else 0.0,
+        }
+        return max(parts.values()), parts
+
+    def _image_pressure(self):
+        if not self.max_image_queue:
+            return 0.0
+        return self.image_queue_depth() / self.max_image_queue
+
+    def decide(self, priority=False):
+        level, parts = self.pressure()
+        with self._lock:
+            if level >= 1.0:
+                self.degraded = True
+            elif level < self.low_watermark:
+                self.degraded = False
+            degraded = self.degraded
+        if degraded and (not priority or level >= self.priority_headroom):
+            decision = Decision(False, False, "overload:" + max(parts, key=parts.get))
+        elif degraded:
+            # High-severity text under pressure: keep the text models, drop images.
+            decision = Decision(True, False, "overload:priority")
+        elif self._image_pressure() >= 1.0:
+            decision = Decision(True, False, "overload:image_queue")
+        else:
+            decision = Decision(True, True, None)
+        with self._lock:
+            self.decisions[decision.reason or FULL_QUALITY] += 1
+        return decision
+
+    def stats(self):
+        level, parts = self.pressure()
+        with self._lock:
+            return {
+                "pressure": level,
+                "components": parts,
+                "degraded": self.degraded,
+                "inflight": self.inflight,
+                "image_pressure": self._image_pressure(),
+                "decisions": dict(self.decisions),
+                "limits": {
+                    "max_inflight": self.max_inflight,
+                    "max_queue": self.max_queue,
+                    "target_latency_ms": self.target_latency * 1000.0,
+                    "max_image_queue": self.max_image_queue,
+                    "priority_headroom": self.priority_headroom,
+                },
+            }
+
+
+def admission_from_env(queue_depth=None, image_queue_depth=None, max_image_queue=None):
+    """HAZARD_ADMISSION=0 disables; limits via HAZARD_ADMISSION_* variables."""
+    if os.getenv("HAZARD_ADMISSION", "1") == "0":
+        return None
+    return AdmissionController(
+        max_inflight=int(os.getenv("HAZARD_ADMISSION_MAX_INFLIGHT", "64")),
+        max_queue=int(os.getenv("HAZARD_ADMISSION_MAX_QUEUE", "256")),
+        target_latency_ms=float(os.getenv("HAZARD_ADMISSION_TARGET_MS", "500")),
+        max_image_queue=max_image_queue,
+        queue_depth=queue_depth,
+        image_queue_depth=image_queue_depth,
+        priority_headroom=float(os.getenv("HAZARD_ADMISSION_PRIORITY_HEADROOM", "2.0")),
+    )
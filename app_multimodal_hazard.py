@@ -1,236 +1,563 @@
-import os
-import re
-import io
-import requests
-import pandas as pd
-from wordcloud import WordCloud
-from dotenv import load_dotenv
-from PIL import Image
-from collections import Counter
-
-
-from transformers import pipeline
-import tweepy
-
-
-import nltk
-from nltk.corpus import stopwords
-
-nltk.download('stopwords', quiet=True)
-STOPWORDS = set(stopwords.words('english'))
-
-
-load_dotenv()
-BEARER_TOKEN = os.getenv("BEARER_TOKEN")
-
-
-twitter_client = None
-if BEARER_TOKEN:
-    try:
-        twitter_client = tweepy.Client(
-            bearer_token=BEARER_TOKEN, wait_on_rate_limit=True
-        )
-    except Exception:
-        twitter_client = None
-
-
-try:
-    import torch
-    DEVICE = 0 if torch.cuda.is_available() else -1
-except Exception:
-    DEVICE = -1
-
-
-def init_pipelines():
-    sentiment = pipeline("sentiment-analysis", device=DEVICE)
-    zero_shot = pipeline(
-        "zero-shot-classification",
-        model="cardiffnlp/twitter-roberta-base-sentiment",
-        device=DEVICE,
-    )
-    image_clf = pipeline("image-classification", device=DEVICE)
-    return sentiment, zero_shot, image_clf
-
-sentiment_pipeline, zero_shot_pipeline, image_pipeline = init_pipelines()
-
-
-HAZARD_WEIGHTS = {
-    # 🔴 Critical Hazards (High Fatality / Sudden Onset)
-    "tsunami": 10,
-    "earthquake": 10,
-    "cyclone": 9,
-    "hurricane": 9,
-    "volcano": 9,
-    "eruption": 9,
-    "wildfire": 9,
-    
-    # 🟠 Severe Hazards (Regional Damage, Strong Warnings)
-    "flood": 8,
-    "flooding": 8,
-    "landslide": 8,
-    "mudslide": 8,
-    "avalanche": 8,
-    "storm": 7,
-    "typhoon": 7,
-    "surge": 7,
-    
-    # 🟡 Medium Hazards (Localized / Manageable Risks)
-    "tornado": 6,
-    "drought": 6,
-    "heatwave": 6,
-    "hailstorm": 5,
-    "snowstorm": 5,
-    "inundation": 5,
-    
-    # 🟢 Lower-Weight Contextual Keywords (indicators but not direct hazards)
-    "wave": 3,
-    "waves": 3,
-    "coast": 2,
-    "shore": 2,
-    "sea": 2,
-    "rain": 2,
-    "wind": 2,
-    "high": 1,
-    "water": 1
-}
-
-
-HIGH_SEVERITY_KEYWORDS = {
-    "tsunami", "earthquake", "cyclone", "hurricane", "volcano", "eruption",
-    "wildfire", "flood", "flooding", "landslide", "mudslide", "avalanche"
-}
-
-
-IMAGE_HAZARD_KEYWORDS = [
-    # Water-related hazards
-    "flood", "storm", "cyclone", "hurricane", "tsunami", "wave", "waves",
-    "surge", "sea", "ocean", "river", "coast", "shore", "harbor", "pier",
-    
-    # Damage indicators
-    "wreck", "ruin", "collapse", "broken", "destruction", "damaged",
-    "debris", "mud", "landslide", "avalanche", "rockfall",
-    
-    # Environment / human impact
-    "drought", "fire", "wildfire", "smoke", "ash", "eruption",
-    "storm-cloud", "thunderstorm", "hail", "snowstorm",
-    
-    # Secondary objects that imply hazard impact
-    "boat", "shipwreck", "rescue", "evacuation", "people", "crowd",
-    "shelter", "tent", "emergency", "ambulance"
-]
-
-
-
-def clean_text(t: str):
-    t = re.sub(r"http\S+", " ", t)
-    t = re.sub(r"[^A-Za-z0-9\s]", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
-    return t.lower()
-
-def extract_keywords_from_texts(texts, top_n=15):
-    all_words = []
-    for t in texts:
-        for w in clean_text(t).split():
-            if w not in STOPWORDS and len(w) > 2:
-                all_words.append(w)
-    return [w for w, _ in Counter(all_words).most_common(top_n)]
-
-
-def calculate_text_hazard_score(text):
-    text_l = clean_text(text)
-    score = 0
-    for kw, weight in HAZARD_WEIGHTS.items():
-        matches = len(re.findall(rf"\b{re.escape(kw)}\b", text_l))
-        score += matches * weight
-    urgency = text.count("!") + sum(1 for w in text.split() if w.isupper() and len(w) > 1)
-    score += min(urgency * 1.5, 4)
-    return float(score)
-
-def risk_from_score(score):
-    if score >= 6:
-        return "High"
-    elif score >= 3:
-        return "Medium"
-    else:
-        return "Low"
-
-def calculate_image_hazard_score(pil_image):
-    try:
-        results = image_pipeline(pil_image, top_k=5)
-    except Exception:
-        return 0.0, []
-    score = 0.0
-    matched_labels = []
-    for r in results:
-        label = r.get("label", "").lower()
-        conf = float(r.get("score", 0.0))
-        for key in IMAGE_HAZARD_KEYWORDS:
-            if key in label:
-                score += conf * 5.0
-                matched_labels.append((label, conf))
-                break
-    score = min(score, 5.0)
-    return float(round(score, 3)), matched_labels
-
-def fuse_scores(text_score, image_score, image_confident=False):
-    text_norm = min(text_score / 10.0, 1.0)
-    image_norm = min(image_score / 5.0, 1.0)
-    if image_confident and image_score >= 3.5:
-        w_image, w_text = 0.6, 0.4
-    else:
-        w_image, w_text = 0.4, 0.6
-    fused = w_text * text_norm + w_image * image_norm
-    return float(round(fused * 10, 3)), {
-        "text_norm": text_norm,
-        "image_norm": image_norm,
-        "w_text": w_text,
-        "w_image": w_image,
-    }
-
-
-def fetch_tweets_with_media(keywords, max_results=20):
-    if not twitter_client:
-        return []
-    query = "(" + " OR ".join(keywords) + ") -is:retweet lang:en"
-    try:
-        resp = twitter_client.search_recent_tweets(
-            query=query,
-            max_results=max_results,
-            expansions=["attachments.media_keys"],
-            media_fields=["url", "preview_image_url", "type"],
-        )
-    except Exception:
-        return []
-    tweets, includes = [], resp.includes or {}
-    media_map = {}
-    if "media" in includes:
-        for m in includes["media"]:
-            key = getattr(m, "media_key", None)
-            url = getattr(m, "url", None) or getattr(m, "preview_image_url", None)
-            if key and url:
-                media_map[key] = url
-    if resp.data:
-        for t in resp.data:
-            text, m_urls = t.text, []
-            if hasattr(t, "attachments") and getattr(t.attachments, "media_keys", None):
-                for mk in t.attachments.media_keys:
-                    if mk in media_map:
-                        m_urls.append(media_map[mk])
-            tweets.append({"text": text, "media_urls": m_urls})
-    return tweets
-
-def download_image_from_url(url):
-    try:
-        r = requests.get(url, timeout=8)
-        return Image.open(io.BytesIO(r.content)).convert("RGB")
-    except Exception:
-        return None
-
-# --- Mock Data (offline demo) ---
-MOCK_TWEETS = [
-    {"text": "Huge tsunami warning issued for coastal areas!", "media_urls": []},
-    {"text": "Massive storm surge expected tonight, stay safe!", "media_urls": []},
-    {"text": "Cyclone approaching, authorities on high alert!", "media_urls": []},
-    {"text": "Flood waters rising fast, avoid low-lying areas!", "media_urls": []},
-    {"text": "High waves reported along the coast, surfing dangerous!", "media_urls": []},
-]
+import os
+import re
+from dotenv import load_dotenv
+from collections import Counter
+from functools import lru_cache, partial
+from itertools import islice
+
+from cache import cache_from_env, content_key
+from cascade import FULL, cascade_from_env
+from downloader import DownloadError, downloader_from_env
+from imaging import ImageRejected, ImageUnreadable, model_input_size, preprocess_image
+from inference_server import RemotePipeline, client_from_env
+from label_classifier import LabelEmbeddingClassifier, MeanPoolingEncoder, OnnxMeanPoolingEncoder
+from hazards import (
+    HAZARD_LEXICON, HAZARD_WEIGHTS, HIGH_SEVERITY_KEYWORDS, dominant_hazard, is_high_severity,
+)
+import media
+import metrics
+from model_registry import ModelRegistry
+import onnx_backend
+from onnx_backend import BACKENDS
+from phash import dhash, index_from_env
+from stopwords import ENGLISH
+from tweets import search_tweets
+
+
+# Heavy and optional dependencies (transformers/torch, tweepy) are imported on
+# first use, so importing this module for the API stays fast and offline.
+STOPWORDS = set(ENGLISH)
+
+
+load_dotenv()
+BEARER_TOKEN = os.getenv("BEARER_TOKEN")
+
+
+_twitter_client = None
+
+def get_twitter_client():
+    """Twitter v2 client, created on first use; None without a bearer token."""
+    global _twitter_client
+    if _twitter_client is None and BEARER_TOKEN:
+        try:
+            import tweepy
+
+            _twitter_client = tweepy.Client(
+                bearer_token=BEARER_TOKEN, wait_on_rate_limit=True
+            )
+        except Exception:
+            return None
+    return _twitter_client
+
+
+@lru_cache(maxsize=None)
+def device():
+    """Pipeline device index: 0 for the first GPU, -1 for CPU."""
+    try:
+        import torch
+        return 0 if torch.cuda.is_available() else -1
+    except Exception:
+        return -1
+
+
+ZERO_SHOT_LABELS = [
+    l.strip()
+    for l in os.getenv("HAZARD_LABELS", "hazard alert,safe,neutral").split(",")
+    if l.strip()
+]
+
+SENTIMENT_MODEL = "distilbert/distilbert-base-uncased-finetuned-sst-2-english"
+ZERO_SHOT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment"
+IMAGE_MODEL = "google/vit-base-patch16-224"
+LABEL_ENCODER_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# "embedding" scores texts against cached label embeddings (one encoder pass
+# per text); "nli" runs the zero-shot NLI pipeline (one pass per label).
+ZERO_SHOT_MODE = os.getenv("HAZARD_ZERO_SHOT", "embedding")
+
+# "torch" (default), "onnx" or "onnx-int8"; see onnx_backend.py.
+BACKEND = os.getenv("HAZARD_BACKEND", "torch")
+if BACKEND not in BACKENDS:
+    raise ValueError(f"HAZARD_BACKEND must be one of {BACKENDS}, got {BACKEND!r}")
+
+
+def _load(task, model_id, backend=None):
+    backend = backend or BACKEND
+    if backend == "torch":
+        from transformers import pipeline
+
+        return pipeline(task, model=model_id, device=device())
+    return onnx_backend.load_pipeline(task, model_id, quantize=backend == "onnx-int8")
+
+def load_sentiment_pipeline(backend=None):
+    return _load("sentiment-analysis", SENTIMENT_MODEL, backend)
+
+def load_zero_shot_pipeline(backend=None):
+    backend = backend or BACKEND
+    if ZERO_SHOT_MODE == "embedding":
+        if backend == "torch":
+            encoder = MeanPoolingEncoder(LABEL_ENCODER_MODEL, device())
+        else:
+            encoder = OnnxMeanPoolingEncoder(*onnx_backend.load_encoder(
+                LABEL_ENCODER_MODEL, quantize=backend == "onnx-int8"
+            ))
+        return LabelEmbeddingClassifier(encoder, ZERO_SHOT_LABELS)
+    return _load("zero-shot-classification", ZERO_SHOT_MODEL, backend)
+
+def load_image_pipeline(backend=None):
+    return _load("image-classification", IMAGE_MODEL, backend)
+
+
+# Pipelines are loaded on first use; call registry.warm_up() to preload them.
+registry = ModelRegistry()
+registry.register("sentiment", load_sentiment_pipeline)
+registry.register("zero_shot", load_zero_shot_pipeline)
+registry.register("image", load_image_pipeline)
+
+# With HAZARD_INFERENCE_SOCKET set the models live in the shared inference
+# server (inference_server.py) and this process only holds thin clients.
+inference_client = client_from_env()
+if inference_client is not None:
+    for _name in ("sentiment", "zero_shot", "image"):
+        registry.register(_name, partial(RemotePipeline, inference_client, _name))
+
+sentiment_pipeline = registry.lazy("sentiment")
+zero_shot_pipeline = registry.lazy("zero_shot")
+image_pipeline = registry.lazy("image")
+
+
+def init_pipelines():
+    return (
+        registry.get("sentiment"),
+        registry.get("zero_shot"),
+        registry.get("image"),
+    )
+
+
+IMAGE_HAZARD_KEYWORDS = [
+    # Water-related hazards
+    "flood", "storm", "cyclone", "hurricane", "tsunami", "wave", "waves",
+    "surge", "sea", "ocean", "river", "coast", "shore", "harbor", "pier",
+    
+    # Damage indicators
+    "wreck", "ruin", "collapse", "broken", "destruction", "damaged",
+    "debris", "mud", "landslide", "avalanche", "rockfall",
+    
+    # Environment / human impact
+    "drought", "fire", "wildfire", "smoke", "ash", "eruption",
+    "storm-cloud", "thunderstorm", "hail", "snowstorm",
+    
+    # Secondary objects that imply hazard impact
+    "boat", "shipwreck", "rescue", "evacuation", "people", "crowd",
+    "shelter", "tent", "emergency", "ambulance"
+]
+
+
+
+def clean_text(t: str):
+    t = re.sub(r"http\S+", " ", t)
+    t = re.sub(r"[^A-Za-z0-9\s]", " ", t)
+    t = re.sub(r"\s+", " ", t).strip()
+    return t.lower()
+
+def extract_keywords_from_texts(texts, top_n=15):
+    all_words = []
+    for t in texts:
+        for w in clean_text(t).split():
+            if w not in STOPWORDS and len(w) > 2:
+                all_words.append(w)
+    return [w for w, _ in Counter(all_words).most_common(top_n)]
+
+
+def calculate_text_hazard_score(text):
+    # Untimed: this is the per-text hot path; callers time the "keywords" stage.
+    return HAZARD_LEXICON.score(text)
+
+def calculate_text_hazard_scores(texts):
+    with metrics.stage("keywords"):
+        return HAZARD_LEXICON.score_many(texts)
+
+# Early exit from the lexicon score (HAZARD_CASCADE=1); None runs every stage.
+CASCADE = cascade_from_env(HAZARD_LEXICON, HIGH_SEVERITY_KEYWORDS)
+
+def risk_from_score(score):
+    if score >= 6:
+        return "High"
+    elif score >= 3:
+        return "Medium"
+    else:
+        return "Low"
+
+def report_risk(text_score, fused_score, has_images):
+    """Risk of a report: from the fused score once an image was scored, else
+    from the text score alone (fusion caps text-only reports below High)."""
+    return risk_from_score(fused_score if has_images else text_score)
+
+# Model outputs keyed by content: normalized text for the text pipelines and
+# raw bytes for images, so reposts and re-shared media skip inference.
+result_cache = cache_from_env()
+
+# Cache namespaces name the model and backend behind each output, so a
+# persistent cache (HAZARD_CACHE_PATH) never answers for a replaced model.
+SENTIMENT_CACHE_KIND = f"sentiment:{SENTIMENT_MODEL}:{BACKEND}"
+ZERO_SHOT_CACHE_KIND = (
+    f"zero_shot:{LABEL_ENCODER_MODEL if ZERO_SHOT_MODE == 'embedding' else ZERO_SHOT_MODEL}:{BACKEND}"
+)
+IMAGE_CACHE_KIND = f"image:{IMAGE_MODEL}:{BACKEND}"
+
+def _cached_text_batch(kind, texts, compute):
+    with metrics.stage("clean_text"):
+        keys = [content_key(kind, clean_text(t)) for t in texts]
+    results = [result_cache.get(k) for k in keys]
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        computed = compute([texts[i] for i in missing])
+        for i, r in zip(missing, computed):
+            result_cache.put(keys[i], r)
+            results[i] = r
+    return results
+
+def image_hazard_from_labels(results):
+    score = 0.0
+    matched_labels = []
+    for r in results:
+        label = r.get("label", "").lower()
+        conf = float(r.get("score", 0.0))
+        for key in IMAGE_HAZARD_KEYWORDS:
+            if key in label:
+                score += conf * 5.0
+                matched_labels.append((label, conf))
+                break
+    score = min(score, 5.0)
+    return float(round(score, 3)), matched_labels
+
+def _image_inference(pil_image):
+    with metrics.stage("image_inference"):
+        return image_pipeline(pil_image, top_k=5)
+
+# Near-duplicate photos (recompressed, resized reposts) reuse the labels of
+# the first copy seen, matched by perceptual hash before inference.
+image_index = index_from_env()
+
+def _classify_deduped(pil_image):
+    if image_index is None:
+        return _image_inference(pil_image)
+    with metrics.stage("phash"):
+        key = dhash(pil_image)
+        results = image_index.lookup(key)
+    if results is None:
+        results = _image_inference(pil_image)
+        image_index.add(key, results)
+    return results
+
+def classify_image(pil_image, cache_key=None):
+    if cache_key is None:
+        return _classify_deduped(pil_image)
+    return result_cache.get_or_compute(cache_key, lambda: _classify_deduped(pil_image))
+
+def calculate_image_hazard_score(pil_image, cache_key=None):
+    try:
+        results = classify_image(pil_image, cache_key)
+    except Exception:
+        return 0.0, []
+    return image_hazard_from_labels(results)
+
+def calculate_image_hazard_score_bytes(data, strict=False):
+    """Score encoded image bytes; cache hits skip decoding as well as inference.
+
+    Unusable bytes score 0, or with `strict` raise ImageRejected/ImageUnreadable.
+    """
+    key = content_key(IMAGE_CACHE_KIND, data)
+    results = result_cache.get(key)
+    if results is None:
+        kind = media.media_kind(data)
+        if kind != media.IMAGE:
+            results = classify_media(data, kind, strict)
+            if results is None:
+                return 0.0, []
+            result_cache.put(key, results)
+            return image_hazard_from_labels(results)
+        image = decode_image(data, strict)
+        if image is None:
+            return 0.0, []
+        return calculate_image_hazard_score(image, cache_key=key)
+    return image_hazard_from_labels(results)
+
+# Images per image-model call when several are scored together (albums,
+# multi-photo reports, batches of tweets).
+IMAGE_BATCH_SIZE = int(os.getenv("HAZARD_IMAGE_BATCH_SIZE", "8"))
+
+def _image_inference_batch(pil_images):
+    with metrics.stage("image_inference"):
+        return image_pipeline(pil_images, top_k=5, batch_size=len(pil_images))
+
+def classify_images(pil_images, cache_keys=None):
+    """Labels for many images, None where inference failed.
+
+    Near-duplicates are answered from the perceptual index; the rest go
+    through the model IMAGE_BATCH_SIZE at a time. New results are stored
+    under `cache_keys` (callers check the result cache themselves).
+    """
+    results = [None] * len(pil_images)
+    hashes = [None] * len(pil_images)
+    if image_index is not None:
+        with metrics.stage("phash"):
+            for i, image in enumerate(pil_images):
+                hashes[i] = dhash(image)
+                results[i] = image_index.lookup(hashes[i])
+    missing = [i for i, r in enumerate(results) if r is None]
+    for start in range(0, len(missing), IMAGE_BATCH_SIZE):
+        chunk = missing[start:start + IMAGE_BATCH_SIZE]
+        try:
+            computed = _image_inference_batch([pil_images[i] for i in chunk])
+        except Exception:
+            # One bad image should not cost the rest of the batch.
+            computed = []
+            for i in chunk:
+                try:
+                    computed.append(_image_inference(pil_images[i]))
+                except Exception:
+                    computed.append(None)
+        for i, r in zip(chunk, computed):
+            if r is None:
+                continue
+            results[i] = r
+            if hashes[i] is not None:
+                image_index.add(hashes[i], r)
+            if cache_keys is not None:
+                result_cache.put(cache_keys[i], r)
+    return results
+
+def classify_media(data, kind=None, strict=False):
+    """Labels of the best sampled frame of an animation or video (media.classify_media)."""
+    size = model_input_size(registry.get("image") if registry.is_loaded("image") else None)
+    return media.classify_media(data, classify_images, image_hazard_from_labels, kind, size, strict)
+
+def calculate_image_hazard_scores_bytes(datas, strict=False):
+    """[(score, labels)] for many encoded images, scored with batched inference.
+
+    Identical bytes are scored once; cache hits skip decoding and inference.
+    Animations and videos are scored from sampled frames (classify_media).
+    Unusable images score 0, or with `strict` raise ImageRejected or
+    ImageUnreadable naming the first such image.
+    """
+    keys = [content_key(IMAGE_CACHE_KIND, d) for d in datas]
+    first = {}
+    for key, data in zip(keys, datas):
+        first.setdefault(key, data)
+    labels = {key: result_cache.get(key) for key in first}
+    todo = []
+    for key in [k for k, r in labels.items() if r is None]:
+        kind = media.media_kind(first[key])
+        if kind == media.IMAGE:
+            todo.append(key)
+            continue
+        labels[key] = _numbered(keys, key, classify_media, first[key], kind, strict)
+        if labels[key] is not None:
+            result_cache.put(key, labels[key])
+    decoded = [(key, image) for key in todo
+               if (image := _numbered(keys, key, decode_image, first[key], strict)) is not None]
+    if decoded:
+        found = classify_images([image for _, image in decoded], [key for key, _ in decoded])
+        labels.update(zip((key for key, _ in decoded), found))
+    return [image_hazard_from_labels(labels[k]) if labels[k] is not None else (0.0, []) for k in keys]
+
+def calculate_image_hazard_scores_or_errors(datas):
+    """Like calculate_image_hazard_scores_bytes(datas, strict=True), but an
+    unusable image yields its ImageRejected/ImageUnreadable in place of a
+    result instead of failing the images batched with it."""
+    try:
+        return calculate_image_hazard_scores_bytes(datas, strict=True)
+    except (ImageRejected, ImageUnreadable):
+        pass
+    # Rare: rescore one at a time so each error lands on its own image.
+    out = []
+    for data in datas:
+        try:
+            out.append(calculate_image_hazard_score_bytes(data, strict=True))
+        except (ImageRejected, ImageUnreadable) as e:
+            out.append(e)
+    return out
+
+def _numbered(keys, key, fn, *args):
+    """fn(*args), with the image's position added to ImageRejected/ImageUnreadable messages."""
+    try:
+        return fn(*args)
+    except (ImageRejected, ImageUnreadable) as e:
+        raise type(e)(f"image {keys.index(key) + 1}: {e}") from e
+
+def aggregate_image_scores(scored):
+    """Report-level view of [(score, labels)]: the best image drives fusion."""
+    scores = [score for score, _ in scored]
+    best = max(range(len(scores)), key=scores.__getitem__, default=None)
+    image_score = scores[best] if best is not None else 0.0
+    return {
+        "image_count": len(scores),
+        "image_score": image_score,
+        "mean_image_score": round(sum(scores) / len(scores), 3) if scores else 0.0,
+        "confident_images": sum(1 for s in scores if s >= IMAGE_CONFIDENT_SCORE),
+        "best_image": best,
+        "matched_labels": scored[best][1] if best is not None else [],
+        "image_confident": image_score >= IMAGE_CONFIDENT_SCORE,
+    }
+
+def score_images_bytes(datas, strict=False):
+    """Per-image and aggregated hazard scores for the images of one report."""
+    scored = calculate_image_hazard_scores_bytes(datas, strict)
+    images = [{"image_score": score, "matched_labels": labels} for score, labels in scored]
+    return dict(aggregate_image_scores(scored), images=images)
+
+def analyze_sentiment_batch(texts):
+    texts = list(texts)
+    if not texts:
+        return []
+    def compute(xs):
+        with metrics.stage("sentiment"):
+            return sentiment_pipeline(xs, batch_size=len(xs))
+
+    return _cached_text_batch(SENTIMENT_CACHE_KIND, texts, compute)
+
+def classify_hazard_batch(texts, labels=None):
+    texts = list(texts)
+    if not texts:
+        return []
+    labels = labels or ZERO_SHOT_LABELS
+
+    def compute(xs):
+        with metrics.stage("zero_shot"):
+            out = zero_shot_pipeline(
+                xs, candidate_labels=labels, batch_size=len(xs) * len(labels)
+            )
+        return out if isinstance(out, list) else [out]
+
+    kind = f"{ZERO_SHOT_CACHE_KIND}:" + "|".join(labels)
+    results = _cached_text_batch(kind, texts, compute)
+    return [dict(r, sequence=t) for r, t in zip(results, texts)]
+
+# Image scores at or above this count as a confident visual hazard when fusing.
+IMAGE_CONFIDENT_SCORE = 3.0
+
+def fuse_scores(text_score, image_score, image_confident=False):
+    text_norm = min(text_score / 10.0, 1.0)
+    image_norm = min(image_score / 5.0, 1.0)
+    if image_confident and image_score >= 3.5:
+        w_image, w_text = 0.6, 0.4
+    else:
+        w_image, w_text = 0.4, 0.6
+    fused = w_text * text_norm + w_image * image_norm
+    return float(round(fused * 10, 3)), {
+        "text_norm": text_norm,
+        "image_norm": image_norm,
+        "w_text": w_text,
+        "w_image": w_image,
+    }
+
+
+def fetch_tweets_with_media(keywords, max_results=20):
+    client = get_twitter_client()
+    if not client:
+        return []
+    try:
+        return search_tweets(client, keywords, max_results)
+    except Exception:
+        return []
+
+def decode_image(data, strict=False):
+    """Reduced-resolution decode sized for the image model.
+
+    None if unusable, or with `strict` ImageRejected (too large) or
+    ImageUnreadable (not a decodable image) is raised.
+    """
+    size = model_input_size(registry.get("image") if registry.is_loaded("image") else None)
+    try:
+        with metrics.stage("decode"):
+            return preprocess_image(data, size)
+    except Exception as e:
+        if not strict:
+            return None
+        if isinstance(e, (ImageRejected, ImageUnreadable)):
+            raise
+        raise ImageUnreadable(str(e)) from e
+
+# Bodies only: scoring decodes them (and tells stills from animations) itself.
+image_downloader = downloader_from_env()
+
+def download_image_bytes(url, check=None):
+    try:
+        return image_downloader.fetch(url, check=check)
+    except DownloadError:
+        return None
+
+def download_images(urls, deadline_s=None):
+    """Yields (url, bytes) as downloads finish; failures give (url, None)."""
+    for url, data, _ in image_downloader.fetch_many(urls, deadline_s=deadline_s):
+        yield url, data
+
+def download_image_from_url(url):
+    data = download_image_bytes(url)
+    return decode_image(data) if data is not None else None
+
+def score_reports(reports, use_images=True, image_deadline_s=30.0, cascade=None):
+    """Scores a batch of {"text", "media_urls"} records with batched inference.
+
+    Each result keeps the record's other fields and adds the per-branch and
+    fused scores; an item's image score is the max over its attachments, whose
+    own scores are listed in `image_scores`.
+    `cascade` defaults to CASCADE; pass False to run every stage. The tier
+    that produced each result is recorded as `tier`.
+    """
+    if cascade is None:
+        cascade = CASCADE
+    reports = list(reports)
+    texts = [r.get("text") or "" for r in reports]
+    text_scores = calculate_text_hazard_scores(texts)
+    tiers = [cascade.tier(t, s) if cascade else FULL for t, s in zip(texts, text_scores)]
+    with_text = [i for i, t in enumerate(texts) if t and (not cascade or cascade.runs_text_models(tiers[i]))]
+    sentiments = dict(zip(with_text, analyze_sentiment_batch([texts[i] for i in with_text])))
+    classes = dict(zip(with_text, classify_hazard_batch([texts[i] for i in with_text])))
+
+    image_results = {}
+    with_images = [r for r, tier in zip(reports, tiers) if not cascade or cascade.runs_images(tier)]
+    urls = [u for r in with_images for u in r.get("media_urls") or []] if use_images else []
+    urls = list(dict.fromkeys(urls))
+    if urls:
+        # Score in batches as downloads finish, so inference overlaps the slow tail.
+        fetched = ((url, data) for url, data in download_images(urls, deadline_s=image_deadline_s)
+                   if data is not None)
+        while True:
+            chunk = list(islice(fetched, IMAGE_BATCH_SIZE))
+            if not chunk:
+                break
+            scored = calculate_image_hazard_scores_bytes([data for _, data in chunk])
+            image_results.update(zip((url for url, _ in chunk), scored))
+
+    results = []
+    for i, r in enumerate(reports):
+        scored = [image_results.get(url, (0.0, [])) for url in r.get("media_urls") or []]
+        image = aggregate_image_scores(scored)
+        image_score, matched = image["image_score"], image["matched_labels"]
+        fused, norms = fuse_scores(text_scores[i], image_score, image_confident=image_score >= IMAGE_CONFIDENT_SCORE)
+        sentiment = sentiments.get(i)
+        zero = classes.get(i)
+        results.append(dict(
+            r,
+            text_score=text_scores[i],
+            sentiment=sentiment["label"] if sentiment else "NEUTRAL",
+            text_hazard_class=zero["labels"][0] if zero else "neutral",
+            image_score=image_score,
+            image_scores=[score for score, _ in scored],
+            matched_image_labels=matched,
+            fused_score=fused,
+            final_risk=report_risk(text_scores[i], fused, bool(scored)),
+            tier=tiers[i],
+        ))
+    return results
+
+# --- Mock Data (offline demo) ---
+MOCK_TWEETS = [
+    {"text": "Huge tsunami warning issued for coastal areas!", "media_urls": []},
+    {"text": "Massive storm surge expected tonight, stay safe!", "media_urls": []},
+    {"text": "Cyclone approaching, authorities on high alert!", "media_urls": []},
+    {"text": "Flood waters rising fast, avoid low-lying areas!", "media_urls": []},
+    {"text": "High waves reported along the coast, surfing dangerous!", "media_urls": []},
+]
@@ -0,0 +1,318 @@
+"""Offline re-scoring of archived posts and reports.
+
+    python backfill.py archive.jsonl --out rescored.jsonl --workers 4
+    python backfill.py export.csv --out rescored/ --format parquet --text-field body
+
+Input is streamed (JSONL, or CSV with a header row), cut into chunks and
+scored by score_reports in a pool of worker processes; each worker batches
+its chunk through the models. Results are written in input order, so the
+checkpoint is just "the first N records are in the output": rerunning the
+same command resumes after them, dropping any rows written past the last
+checkpoint. Progress and throughput go to stderr, a summary to stdout.
+
+Every worker loads its own models; set HAZARD_INFERENCE_SOCKET to have them
+share one inference server (inference_server.py) instead.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+
+def read_records(path, fmt=None, text_field="text", media_field="media_urls"):
+    """Yields {"text", "media_urls", ...} records one at a time."""
+    fmt = fmt or ("csv" if path.endswith(".csv") else "jsonl")
+    with open(path, newline="" if fmt == "csv" else None, encoding="utf-8") as f:
+        rows = csv.DictReader(f) if fmt == "csv" else (json.loads(l) for l in f if l.strip())
+        for row in rows:
+            media = row.get(media_field) or []
+            if isinstance(media, str):
+                media = media.replace("|", " ").split()
+            record = dict(row)
+            record.pop(text_field, None)
+            record.pop(media_field, None)
+            record["text"] = row.get(text_field) or ""
+            record["media_urls"] = media
+            yield record
+
+
+def chunked(records, size):
+    it = iter(records)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# --- Worker side -------------------------------------------------------------
+
+_options = {}
+
+
+def _init_worker(use_images, batch_size, stub_models):
+    import app_multimodal_hazard as hazard
+
+    if stub_models:
+        from benchmarks import stubs
+
+        stubs.install(hazard.registry)
+    _options.update(hazard=hazard, use_images=use_images, batch_size=batch_size)
+
+
+def _score_chunk(seq, records):
+    hazard, size = _options["hazard"], _options["batch_size"]
+    out = []
+    for i in range(0, len(records), size):
+        out.extend(hazard.score_reports(records[i:i + size], use_images=_options["use_images"]))
+    return seq, out
+
+
+# --- Output sinks --------------------------------------------------------------
+
+class JsonlSink:
+    """Appends rows; every write is a commit point (the file offset is checkpointed)."""
+
+    def __init__(self, path, state=None):
+        self.path = path
+        self.offset = 0
+        if state:
+            size = os.path.getsize(path) if os.path.exists(path) else None
+            if size is None or size < state["bytes"]:
+                raise SystemExit(
+                    f"{path} is {'missing' if size is None else f'{size} bytes'} but the checkpoint "
+                    f"covers {state['bytes']} bytes; remove the checkpoint to start over"
+                )
+            self.f = open(path, "r+b")
+            self.offset = state["bytes"]
+            self.f.truncate(self.offset)
+            self.f.seek(self.offset)
+        else:
+            self.f = open(path, "wb")
+
+    def write(self, rows):
+        self.f.write("".join(json.dumps(r, default=str) + "\n" for r in rows).encode("utf-8"))
+        self.f.flush()
+        self.offset = self.f.tell()
+        return True
+
+    def close(self):
+        self.f.close()
+        return True
+
+    def state(self):
+        return {"bytes": self.offset}
+
+
+class ParquetSink:
+    """Writes part-NNNNN.parquet files of `rows_per_file` rows; each part is a commit point.
+
+    Nested values (labels, model outputs) are stored as JSON strings.
+    """
+
+    def __init__(self, path, state=None, rows_per_file=100_000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow") from e
+        self._pa, self._pq = pa, pq
+        self.path = path
+        self.rows_per_file = rows_per_file
+        self.parts = state["parts"] if state else 0
+        os.makedirs(path, exist_ok=True)
+        missing = [i for i in range(self.parts) if not os.path.exists(self._part_path(i))]
+        if missing:
+            raise SystemExit(
+                f"{self._part_path(missing[0])} is missing but the checkpoint covers {self.parts} "
+                "parts; remove the checkpoint to start over"
+            )
+        for part in glob.glob(os.path.join(path, "part-*.parquet")):
+            if int(os.path.basename(part)[5:10]) >= self.parts:
+                os.remove(part)
+        self.buffer = []
+
+    def write(self, rows):
+        self.buffer.extend(rows)
+        if len(self.buffer) < self.rows_per_file:
+            return False
+        self._flush()
+        return True
+
+    def _part_path(self, i):
+        return os.path.join(self.path, f"part-{i:05d}.parquet")
+
+    def _flush(self):
+        if not self.buffer:
+            return
+        rows = [
+            {k: json.dumps(v, default=str) if isinstance(v, (dict, list, tuple)) else v
+             for k, v in r.items()}
+            for r in self.buffer
+        ]
+        table = self._pa.Table.from_pylist(rows)
+        self._pq.write_table(table, self._part_path(self.parts))
+        self.parts += 1
+        self.buffer = []
+
+    def close(self):
+        self._flush()
+        return True
+
+    def state(self):
+        return {"parts": self.parts}
+
+
+# --- Driver --------------------------------------------------------------------
+
+def load_checkpoint(path, input_path, out_path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    if state.get("input") != os.path.abspath(input_path) or state.get("output") != os.path.abspath(out_path):
+        raise SystemExit(f"{path} belongs to a different input/output; remove it to start over")
+    return state
+
+
+def save_checkpoint(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(dict(state, saved_at=time.time()), f)
+    os.replace(tmp, path)
+
+
+class Progress:
+    def __init__(self, done=0, every_s=5.0, total=None, stream=sys.stderr):
+        self.start = time.monotonic()
+        self.resumed_at = done
+        self.done = done
+        self.total = total
+        self.every = every_s
+        self.last = self.start
+        self.stream = stream
+
+    def rate(self):
+        elapsed = time.monotonic() - self.start
+        return (self.done - self.resumed_at) / elapsed if elapsed > 0 else 0.0
+
+    def update(self, n, force=False):
+        self.done += n
+        now = time.monotonic()
+        if not force and now - self.last < self.every:
+            return
+        self.last = now
+        rate = self.rate()
+        line = f"{self.done} records, {rate:.1f}/s, {now - self.start:.0f}s elapsed"
+        if self.total and rate > 0:
+            line += f", ~{max(0, self.total - self.done) / rate:.0f}s left"
+        print(line, file=self.stream, flush=True)
+
+
+def run(input_path, out_path, fmt="jsonl", input_format=None, text_field="text",
+        media_field="media_urls", workers=None, chunk_size=256, batch_size=32,
+        use_images=True, checkpoint_path=None, rows_per_file=100_000, total=None,
+        progress_every=5.0, stub_models=False):
+    checkpoint_path = checkpoint_path or out_path.rstrip("/") + ".checkpoint.json"
+    state = load_checkpoint(checkpoint_path, input_path, out_path)
+    skip = state["records_done"] if state else 0
+    sink_state = state["sink"] if state else None
+    sink = ParquetSink(out_path, sink_state, rows_per_file) if fmt == "parquet" else JsonlSink(out_path, sink_state)
+
+    records = islice(read_records(input_path, input_format, text_field, media_field), skip, None)
+    chunks = enumerate(chunked(records, chunk_size))
+    workers = workers or os.cpu_count() or 1
+    progress = Progress(skip, progress_every, total)
+    # Records written to the sink but not yet covered by a commit point.
+    uncommitted = 0
+    committed = skip
+
+    def commit():
+        nonlocal committed, uncommitted
+        committed += uncommitted
+        uncommitted = 0
+        save_checkpoint(checkpoint_path, {
+            "input": os.path.abspath(input_path), "output": os.path.abspath(out_path),
+            "format": fmt, "records_done": committed, "sink": sink.state(),
+        })
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(use_images, batch_size, stub_models)) as pool:
+        pending, ready, next_seq = {}, {}, 0
+        exhausted = False
+        while True:
+            # Keep a bounded number of chunks in flight so memory stays flat.
+            while not exhausted and len(pending) + len(ready) < 2 * workers:
+                try:
+                    seq, chunk = next(chunks)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[pool.submit(_score_chunk, seq, chunk)] = seq
+            if not pending and not ready:
+                break
+            if pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    del pending[fut]
+                    seq, rows = fut.result()
+                    ready[seq] = rows
+            while next_seq in ready:
+                rows = ready.pop(next_seq)
+                next_seq += 1
+                uncommitted += len(rows)
+                if sink.write(rows):
+                    commit()
+                progress.update(len(rows))
+    sink.close()
+    commit()
+    progress.update(0, force=True)
+    return {
+        "input": input_path,
+        "output": out_path,
+        "records_done": committed,
+        "resumed_from": skip,
+        "scored_this_run": committed - skip,
+        "elapsed_s": time.monotonic() - progress.start,
+        "records_per_s": progress.rate(),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Re-score archived posts in bulk")
+    ap.add_argument("input", help="JSONL or CSV file")
+    ap.add_argument("--out", required=True, help="JSONL file, or directory for --format parquet")
+    ap.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl")
+    ap.add_argument("--input-format", choices=("jsonl", "csv"), help="default: from the extension")
+    ap.add_argument("--text-field", default="text")
+    ap.add_argument("--media-field", default="media_urls",
+                    help="list in JSONL; space- or |-separated URLs in CSV")
+    ap.add_argument("--workers", type=int, default=None, help="default: CPU count")
+    ap.add_argument("--chunk-size", type=int, default=256, help="records per worker task")
+    ap.add_argument("--batch-size", type=int, default=32, help="records per score_reports call")
+    ap.add_argument("--no-images", action="store_true", help="skip downloading media")
+    ap.add_argument("--checkpoint", help="default: <out>.checkpoint.json")
+    ap.add_argument("--rows-per-file", type=int, default=100_000, help="Parquet part size")
+    ap.add_argument("--total", type=int, help="expected record count, for the ETA")
+    ap.add_argument("--progress-every", type=float, default=5.0, help="seconds")
+    ap.add_argument("--stub-models", action="store_true",
+                    help="deterministic stand-in models (dry runs, throughput tests)")
+    args = ap.parse_args()
+
+    summary = run(
+        args.input, args.out, fmt=args.format, input_format=args.input_format,
+        text_field=args.text_field, media_field=args.media_field, workers=args.workers,
+        chunk_size=args.chunk_size, batch_size=args.batch_size, use_images=not args.no_images,
+        checkpoint_path=args.checkpoint, rows_per_file=args.rows_per_file, total=args.total,
+        progress_every=args.progress_every, stub_models=args.stub_models,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
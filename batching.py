@@ -0,0 +1,127 @@
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+import metrics
+
+BATCH_SIZES = metrics.REGISTRY.histogram(
+    "hazard_batch_size", "Items per dispatched micro-batch", metrics.SIZE_BUCKETS
+)
+BATCH_SECONDS = metrics.REGISTRY.histogram(
+    "hazard_batch_seconds", "Time to run one micro-batch"
+)
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-item calls into batched calls of `fn`.
+
+    `fn` takes a list of items and returns a list of results in the same order.
+    A batch is dispatched once `max_batch_size` items are waiting or the oldest
+    item has waited `max_wait_ms`, whichever comes first.
+    """
+
+    def __init__(self, fn, max_batch_size=16, max_wait_ms=5.0, name="batcher"):
+        self.fn = fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name=self.name, daemon=True
+                    )
+                    self._worker.start()
+
+    def submit(self, item):
+        self._ensure_worker()
+        fut = Future()
+        self._queue.put((item, fut))
+        return fut
+
+    def __call__(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def map(self, items, timeout=None):
+        futures = [self.submit(i) for i in items]
+        return [f.result(timeout) for f in futures]
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            start = time.perf_counter()
+            try:
+                results = self.fn(items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name}: expected {len(items)} results, got {len(results)}"
+                    )
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(items)
+            BATCH_SIZES.observe(len(items), batcher=self.name)
+            BATCH_SECONDS.observe(time.perf_counter() - start, batcher=self.name)
+            for (_, fut), result in zip(batch, results):
+                fut.set_result(result)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": (self.items / self.batches) if self.batches else 0.0,
+            "pending": self._queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+
+def imap_unordered(fn, items, executor, window=64):
+    """Yields (index, result, error) for each item as soon as it finishes.
+
+    At most `window` items are in flight, so `items` can be a lazy iterable
+    and results never pile up faster than the consumer reads them.
+    """
+    pending = {}
+    items = iter(enumerate(items))
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) < window:
+            try:
+                idx, item = next(items)
+            except StopIteration:
+                exhausted = True
+                break
+            pending[executor.submit(fn, item)] = idx
+        if not pending:
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            idx = pending.pop(fut)
+            err = fut.exception()
+            yield idx, (None if err else fut.result()), err
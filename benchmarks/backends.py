@@ -0,0 +1,112 @@
+"""Compare inference backends on identical inputs.
+
+    python -m benchmarks.backends --backends torch onnx onnx-int8 --n 64
+
+Reports per-call latency, batched throughput and drift from the first
+backend (top-label agreement and max absolute score difference) as JSON.
+The zero_shot stage runs whichever model HAZARD_ZERO_SHOT selects: the
+MiniLM label encoder (default) or the NLI pipeline.
+"""
+import argparse
+import json
+import statistics
+import time
+
+from PIL import Image
+
+import app_multimodal_hazard as hazard
+
+TEXTS = [t["text"] for t in hazard.MOCK_TWEETS] + [
+    "Just had a lovely walk by the sea, calm water today.",
+    "EARTHQUAKE!!! buildings shaking downtown, stay outside",
+    "Landslide blocked the highway after heavy rain overnight",
+    "Nothing to report, sunny skies and light wind",
+]
+
+LOADERS = {
+    "sentiment": hazard.load_sentiment_pipeline,
+    "zero_shot": hazard.load_zero_shot_pipeline,
+    "image": hazard.load_image_pipeline,
+}
+
+
+def _inputs(stage, n):
+    if stage == "image":
+        colors = ["navy", "teal", "gray", "sienna", "white", "darkgreen"]
+        return [Image.new("RGB", (224, 224), colors[i % len(colors)]) for i in range(n)]
+    return [TEXTS[i % len(TEXTS)] for i in range(n)]
+
+
+def _call(stage, pipe, x):
+    if stage == "zero_shot":
+        return pipe(x, candidate_labels=hazard.ZERO_SHOT_LABELS)
+    if stage == "image":
+        return pipe(x, top_k=5)
+    return pipe(x)
+
+
+def _top(stage, out):
+    if stage == "zero_shot":
+        return out["labels"][0], out["scores"][0]
+    if stage == "sentiment":
+        out = out[0] if isinstance(out, list) else out
+        return out["label"], out["score"]
+    return out[0]["label"], out[0]["score"]
+
+
+def run_stage(stage, backend, inputs):
+    start = time.perf_counter()
+    pipe = LOADERS[stage](backend)
+    load_s = time.perf_counter() - start
+    _call(stage, pipe, inputs[0])
+    latencies, outputs = [], []
+    for x in inputs:
+        t = time.perf_counter()
+        outputs.append(_top(stage, _call(stage, pipe, x)))
+        latencies.append(time.perf_counter() - t)
+    t = time.perf_counter()
+    if stage == "zero_shot":
+        pipe(inputs, candidate_labels=hazard.ZERO_SHOT_LABELS, batch_size=16)
+    elif stage == "image":
+        pipe(inputs, top_k=5, batch_size=16)
+    else:
+        pipe(inputs, batch_size=16)
+    batch_s = time.perf_counter() - t
+    latencies.sort()
+    return {
+        "load_s": load_s,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "throughput_per_s": len(inputs) / batch_s,
+    }, outputs
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--backends", nargs="+", default=list(hazard.BACKENDS), choices=hazard.BACKENDS)
+    ap.add_argument("--stages", nargs="+", default=list(LOADERS), choices=list(LOADERS))
+    ap.add_argument("--n", type=int, default=64, help="inputs per stage")
+    ap.add_argument("--out", help="write the JSON report here as well as stdout")
+    args = ap.parse_args()
+
+    report = {}
+    for stage in args.stages:
+        inputs = _inputs(stage, args.n)
+        baseline = None
+        report[stage] = {}
+        for backend in args.backends:
+            result, outputs = run_stage(stage, backend, inputs)
+            if baseline is None:
+                baseline = outputs
+            result["label_agreement"] = sum(a[0] == b[0] for a, b in zip(outputs, baseline)) / len(outputs)
+            result["max_score_diff"] = max(abs(a[1] - b[1]) for a, b in zip(outputs, baseline))
+            report[stage][backend] = result
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
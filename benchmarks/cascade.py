@@ -0,0 +1,154 @@
+"""Offline evaluation of the inference cascade against the full stack.
+
+    python -m benchmarks.cascade --n 2000 --media-ratio 0.3
+    python -m benchmarks.cascade --input ingested.jsonl --real --critical-min 8
+
+Scores the same reports twice, once with every stage and once through the
+cascade, then reports the tier mix, model items and model time saved, and
+how far risk labels and fused scores moved. Stub models are used unless
+--real; synthetic media is served from a local HTTP server.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import corpus, stubs
+from benchmarks.common import emit, metadata
+
+MODEL_STAGES = ("sentiment", "zero_shot", "image_inference")
+
+
+def serve_images(images):
+    """Serves images at /<index>.jpg from a background thread; returns the URLs."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            try:
+                data = images[int(self.path.strip("/").split(".")[0])]
+            except (ValueError, IndexError):
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return [f"http://127.0.0.1:{server.server_port}/{i}.jpg" for i in range(len(images))]
+
+
+def load_reports(path):
+    with open(path, encoding="utf-8") as f:
+        return [
+            {"text": r.get("text") or "", "media_urls": r.get("media_urls") or []}
+            for r in map(json.loads, filter(str.strip, f))
+        ]
+
+
+def _model_totals(metrics):
+    return {s: metrics.STAGE_SECONDS.total(stage=s) for s in MODEL_STAGES}
+
+
+def _run(hazard, reports, cascade, batch_size):
+    import metrics
+
+    hazard.result_cache.clear()
+    if hazard.image_index is not None:
+        hazard.image_index.clear()
+    before = _model_totals(metrics)
+    start = time.perf_counter()
+    results = []
+    for i in range(0, len(reports), batch_size):
+        results.extend(hazard.score_reports(reports[i:i + batch_size], cascade=cascade))
+    elapsed = time.perf_counter() - start
+    after = _model_totals(metrics)
+    model_s = {s: after[s][1] - before[s][1] for s in MODEL_STAGES}
+    return results, elapsed, model_s
+
+
+def evaluate(hazard, reports, cascade, batch_size=32):
+    full, full_s, full_model = _run(hazard, reports, False, batch_size)
+    fast, fast_s, fast_model = _run(hazard, reports, cascade, batch_size)
+
+    tiers = Counter(r["tier"] for r in fast)
+    confusion = Counter((a["final_risk"], b["final_risk"]) for a, b in zip(full, fast))
+    moved = sum(n for (a, b), n in confusion.items() if a != b)
+    diffs = [abs(a["fused_score"] - b["fused_score"]) for a, b in zip(full, fast)]
+    with_text = [r for r in fast if r.get("text")]
+    skipped_text = sum(1 for r in with_text if r["tier"] != "full")
+    skipped_images = sum(
+        len(r.get("media_urls") or []) for r in fast if not cascade.runs_images(r["tier"])
+    )
+    total_model_full = sum(full_model.values())
+    total_model_fast = sum(fast_model.values())
+    return {
+        "reports": len(reports),
+        "tiers": dict(tiers),
+        "early_exit_rate": 1 - tiers.get("full", 0) / len(fast) if fast else 0.0,
+        "text_model_items_saved": 2 * skipped_text,
+        "image_items_saved": skipped_images,
+        "model_seconds": {"full": full_model, "cascade": fast_model},
+        "model_time_saved": 1 - total_model_fast / total_model_full if total_model_full else 0.0,
+        "wall_seconds": {"full": full_s, "cascade": fast_s},
+        "risk_agreement": 1 - moved / len(full) if full else 1.0,
+        "risk_moved": moved,
+        "risk_confusion": {f"{a}->{b}": n for (a, b), n in sorted(confusion.items())},
+        "fused_abs_diff": {
+            "mean": sum(diffs) / len(diffs) if diffs else 0.0,
+            "max": max(diffs, default=0.0),
+        },
+    }
+
+
+def main():
+    from cascade import Cascade
+
+    ap = argparse.ArgumentParser(description="Evaluate the inference cascade offline")
+    ap.add_argument("--input", help="JSONL of {text, media_urls} records (default: synthetic)")
+    ap.add_argument("--n", type=int, default=2000, help="synthetic reports")
+    ap.add_argument("--images", type=int, default=40, help="distinct synthetic images")
+    ap.add_argument("--media-ratio", type=float, default=0.3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--real", action="store_true")
+    ap.add_argument("--stub-cost-ms", type=float, default=2.0)
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--safe-max", type=float, default=0.0)
+    ap.add_argument("--critical-min", type=float, default=10.0)
+    ap.add_argument("--critical-severe", type=int, default=2)
+    ap.add_argument("--safe-skips-images", action="store_true")
+    ap.add_argument("--out")
+    args = ap.parse_args()
+
+    import app_multimodal_hazard as hazard
+
+    if not args.real:
+        stubs.install(hazard.registry, args.stub_cost_ms)
+    if args.input:
+        reports = load_reports(args.input)
+    else:
+        urls = serve_images(corpus.images(args.images, seed=args.seed, sizes=((640, 480),)))
+        reports = corpus.tweets(args.n, seed=args.seed, media_ratio=args.media_ratio, media_urls=urls)
+    cascade = Cascade(
+        hazard.HAZARD_LEXICON, hazard.HIGH_SEVERITY_KEYWORDS,
+        safe_max_score=args.safe_max, critical_min_score=args.critical_min,
+        critical_min_severe=args.critical_severe, safe_skips_images=args.safe_skips_images,
+    )
+    hazard.registry.warm_up(background=False)
+    report = {
+        "benchmark": "cascade",
+        "meta": metadata(mode="real" if args.real else "stub", input=args.input, seed=args.seed,
+                         policy={k: v for k, v in cascade.stats().items() if k not in ("decisions", "tiers", "early_exit_rate")}),
+        "results": evaluate(hazard, reports, cascade, args.batch_size),
+    }
+    emit(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
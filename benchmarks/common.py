@@ -0,0 +1,53 @@
+import json
+import platform
+import subprocess
+import sys
+import time
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(latencies, elapsed, n=None):
+    """Latency percentiles (ms) and throughput for a run."""
+    lat = sorted(latencies)
+    n = len(lat) if n is None else n
+    return {
+        "count": n,
+        "elapsed_s": elapsed,
+        "per_s": n / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(lat, 0.50) * 1000,
+        "p95_ms": percentile(lat, 0.95) * 1000,
+        "p99_ms": percentile(lat, 0.99) * 1000,
+        "max_ms": (lat[-1] * 1000) if lat else 0.0,
+    }
+
+
+def metadata(**extra):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return dict(
+        timestamp=time.time(),
+        python=sys.version.split()[0],
+        platform=platform.platform(),
+        commit=commit,
+        **extra,
+    )
+
+
+def emit(report, out=None):
+    text = json.dumps(report, indent=2)
+    print(text)
+    if out:
+        with open(out, "w") as f:
+            f.write(text + "\n")
@@ -0,0 +1,56 @@
+"""Compare two benchmark JSON reports.
+
+    python -m benchmarks.compare baseline.json current.json --threshold 0.10
+
+Prints the relative change of every shared latency/throughput metric and
+exits with status 1 if any got worse by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+# Metrics where a larger value is better; every other *_ms / *_s is lower-is-better.
+HIGHER_IS_BETTER = {"per_s", "rps", "items_per_s", "throughput_per_s"}
+TRACKED = HIGHER_IS_BETTER | {"p50_ms", "p95_ms", "p99_ms"}
+
+
+def _flatten(d, prefix=""):
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            yield from _flatten(v, key + ".")
+        elif isinstance(v, (int, float)) and k in TRACKED:
+            yield key, k, v
+
+
+def compare(base, current, threshold):
+    old = {key: v for key, _, v in _flatten(base.get("results", base))}
+    rows, regressions = [], []
+    for key, metric, new in _flatten(current.get("results", current)):
+        if key not in old or not old[key]:
+            continue
+        change = (new - old[key]) / old[key]
+        worse = -change if metric in HIGHER_IS_BETTER else change
+        rows.append({"metric": key, "baseline": old[key], "current": new, "change": change})
+        if worse > threshold:
+            regressions.append(key)
+    return rows, regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare two benchmark reports")
+    ap.add_argument("baseline")
+    ap.add_argument("current")
+    ap.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+    args = ap.parse_args()
+    with open(args.baseline) as f:
+        base = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows, regressions = compare(base, current, args.threshold)
+    print(json.dumps({"comparison": rows, "regressions": regressions}, indent=2))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
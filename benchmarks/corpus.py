@@ -0,0 +1,91 @@
+"""Synthetic tweet and image corpora of configurable size (seeded)."""
+import io
+import random
+
+from PIL import Image, ImageDraw
+
+HAZARDS = ["tsunami", "earthquake", "cyclone", "flood", "flooding", "storm", "surge",
+           "landslide", "waves", "high tide", "inundation", "heatwave"]
+PLACES = ["Chennai", "Puri", "Kochi", "Mumbai", "Vizag", "the coast", "Marina beach", "the harbour"]
+FILLER = ["just now", "near", "reported", "people", "please", "stay safe", "roads", "today",
+          "water", "rising", "everyone", "avoid", "update", "area", "the", "and", "lol"]
+TEMPLATES = [
+    "{h} warning issued for {p}!",
+    "Massive {h} hitting {p}, {f} {f}",
+    "{F} {h} near {p} {u}",
+    "{f} {f} at {p}, nothing serious {u}",
+    "Beautiful sunset at {p} today, {f} {f}",
+    "RT @user: {h} alert!! {f} {p} {u}",
+    "Is the {h} in {p} getting worse? {f} {f} {f}",
+]
+
+
+def tweets(n, seed=0, media_ratio=0.0, media_urls=()):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        text = rng.choice(TEMPLATES).format_map(_Fill(rng))
+        urls = []
+        if media_urls and rng.random() < media_ratio:
+            urls = rng.sample(list(media_urls), k=min(len(media_urls), rng.randint(1, 3)))
+        out.append({"id": str(i), "text": text, "media_urls": urls})
+    return out
+
+
+class _Fill(dict):
+    def __init__(self, rng):
+        super().__init__()
+        self.rng = rng
+
+    def __missing__(self, key):
+        r = self.rng
+        if key == "h":
+            return r.choice(HAZARDS)
+        if key == "p":
+            return r.choice(PLACES)
+        if key == "f":
+            return r.choice(FILLER)
+        if key == "F":
+            return r.choice(FILLER).upper()
+        if key == "u":
+            return f"https://t.co/{r.getrandbits(32):08x}"
+        return ""
+
+
+def images(n, seed=0, sizes=((640, 480), (1280, 960), (4032, 3024)), fmt="JPEG"):
+    """Encoded images with some structure (bands and shapes), not flat fills."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        w, h = rng.choice(sizes)
+        img = Image.new("RGB", (w, h), tuple(rng.randrange(256) for _ in range(3)))
+        draw = ImageDraw.Draw(img)
+        for _ in range(12):
+            x0, y0 = rng.randrange(w), rng.randrange(h)
+            x1, y1 = min(w, x0 + rng.randrange(w // 2 + 1)), min(h, y0 + rng.randrange(h // 2 + 1))
+            draw.rectangle((x0, y0, x1, y1), fill=tuple(rng.randrange(256) for _ in range(3)))
+        buf = io.BytesIO()
+        img.save(buf, fmt, quality=85)
+        out.append(buf.getvalue())
+    return out
+
+
+def animated_gifs(n, seed=0, frames=48, scenes=3, size=(320, 240), duration_ms=80):
+    """Animated GIFs of `scenes` distinct shots, each a shape drifting across a backdrop."""
+    rng = random.Random(seed)
+    w, h = size
+    out = []
+    for _ in range(n):
+        shots = [(tuple(rng.randrange(256) for _ in range(3)), tuple(rng.randrange(256) for _ in range(3)),
+                  rng.randrange(w // 2), rng.randrange(h // 2)) for _ in range(scenes)]
+        seq = []
+        for i in range(frames):
+            bg, fg, x, y = shots[i * scenes // frames]
+            img = Image.new("RGB", size, bg)
+            dx = i % max(1, frames // scenes)
+            ImageDraw.Draw(img).rectangle((x + dx, y, x + dx + w // 3, y + h // 3), fill=fg)
+            seq.append(img)
+        buf = io.BytesIO()
+        seq[0].save(buf, "GIF", save_all=True, append_images=seq[1:], duration=duration_ms, loop=0)
+        out.append(buf.getvalue())
+    return out
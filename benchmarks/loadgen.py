@@ -0,0 +1,201 @@
+"""HTTP load generator for the FastAPI service.
+
+    python -m benchmarks.loadgen --scenario text --concurrency 16 --duration 20
+    python -m benchmarks.loadgen --url http://127.0.0.1:8000 --scenario image
+
+Without --url the app from main.py is started in-process on a free local
+port, with stub models unless --real is given, and a throwaway report
+store. Each worker thread keeps one HTTP/1.1 connection open, like a
+pooled client. The report has p50/p95/p99 latency, requests per second and
+status-code counts as JSON.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from urllib.parse import urlsplit
+
+from benchmarks import corpus, stubs
+from benchmarks.common import emit, metadata, summarize
+
+SCENARIOS = ("text", "image", "album", "fuse", "batch")
+
+
+def _multipart(field, files, content_type="image/jpeg"):
+    """Body and content type for `files`, a list of (filename, data), all under `field`."""
+    boundary = uuid.uuid4().hex
+    body = b"".join(
+        (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode() + data + b"\r\n"
+        for filename, data in files
+    ) + f"--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def build_requests(scenario, n, seed, batch_items=16, album_size=4):
+    """(method, path, body, content type) tuples cycled through by the workers."""
+    tweets = corpus.tweets(n, seed=seed)
+    if scenario == "text":
+        return [("POST", "/analyze-text", json.dumps({"text": t["text"]}).encode(), "application/json")
+                for t in tweets]
+    if scenario == "fuse":
+        return [("POST", "/analyze-fuse",
+                 json.dumps({"text_score": i % 23, "image_score": (i * 7) % 19}).encode(),
+                 "application/json") for i in range(n)]
+    if scenario == "image":
+        return [("POST", "/analyze-image", *_multipart("file", [(f"{i}.jpg", img)]))
+                for i, img in enumerate(corpus.images(n, seed=seed))]
+    if scenario == "album":
+        images = corpus.images(n, seed=seed)
+        return [("POST", "/analyze-images",
+                 *_multipart("files", [(f"{j}.jpg", img) for j, img in enumerate(images[i:i + album_size])]))
+                for i in range(0, len(images), album_size)]
+    items = [{"id": t["id"], "text": t["text"]} for t in tweets]
+    return [("POST", "/analyze-batch", json.dumps({"items": items[i:i + batch_items]}).encode(),
+             "application/json") for i in range(0, len(items), batch_items)]
+
+
+class _Worker(threading.Thread):
+    def __init__(self, host, port, requests, stop_at, max_requests, counter, timeout):
+        super().__init__(daemon=True)
+        self.host, self.port = host, port
+        self.requests = requests
+        self.stop_at = stop_at
+        self.max_requests = max_requests
+        self.counter = counter
+        self.timeout = timeout
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = Counter()
+
+    def _conn(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def run(self):
+        conn = self._conn()
+        for i in self.counter:
+            if i >= self.max_requests or time.monotonic() >= self.stop_at:
+                break
+            method, path, body, ctype = self.requests[i % len(self.requests)]
+            t = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers={"Content-Type": ctype})
+                resp = conn.getresponse()
+                resp.read()
+            except Exception as e:
+                self.errors[type(e).__name__] += 1
+                conn.close()
+                conn = self._conn()
+                continue
+            self.latencies.append(time.perf_counter() - t)
+            self.statuses[resp.status] += 1
+        conn.close()
+
+
+def run_load(url, requests, concurrency, duration, max_requests, timeout=30.0):
+    parts = urlsplit(url)
+    counter = itertools.count()
+    stop_at = time.monotonic() + duration if duration else float("inf")
+    workers = [
+        _Worker(parts.hostname, parts.port or 80, requests, stop_at,
+                max_requests or float("inf"), counter, timeout)
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    latencies = [x for w in workers for x in w.latencies]
+    statuses, errors = Counter(), Counter()
+    for w in workers:
+        statuses.update(w.statuses)
+        errors.update(w.errors)
+    result = summarize(latencies, elapsed)
+    result["ok"] = sum(v for k, v in statuses.items() if 200 <= k < 300)
+    result["rps"] = result.pop("per_s")
+    result["status"] = {str(k): v for k, v in sorted(statuses.items())}
+    result["errors"] = dict(errors)
+    return result
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve_local(real=False, stub_cost_ms=0.0):
+    """Starts main.app on a local port in a background thread; returns its URL."""
+    import uvicorn
+
+    os.environ.setdefault("HAZARD_STORE_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+    import app_multimodal_hazard as hazard
+
+    if not real:
+        stubs.install(hazard.registry, stub_cost_ms)
+    import main
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="bench-server", daemon=True).start()
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 600
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/readyz")
+            if conn.getresponse().status == 200:
+                return url
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("benchmark server did not become ready")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load-test the hazard API")
+    ap.add_argument("--url", help="target an already running server instead of starting one")
+    ap.add_argument("--real", action="store_true", help="local server uses the real models")
+    ap.add_argument("--stub-cost-ms", type=float, default=0.0)
+    ap.add_argument("--scenario", choices=SCENARIOS, default="text")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds (0 = until --requests)")
+    ap.add_argument("--requests", type=int, default=0, help="stop after this many (0 = no limit)")
+    ap.add_argument("--warmup", type=int, default=20, help="requests sent before measuring")
+    ap.add_argument("--corpus-size", type=int, default=500)
+    ap.add_argument("--album-size", type=int, default=4, help="images per request (album scenario)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="write the JSON report here as well as stdout")
+    args = ap.parse_args()
+    if not args.duration and not args.requests:
+        ap.error("give --duration or --requests")
+
+    url = args.url or serve_local(args.real, args.stub_cost_ms)
+    requests = build_requests(args.scenario, args.corpus_size, args.seed, album_size=args.album_size)
+    if args.warmup:
+        run_load(url, requests, min(args.concurrency, args.warmup), 0, args.warmup)
+    report = {
+        "benchmark": "loadgen",
+        "meta": metadata(url=url if args.url else "local", mode="real" if args.real else "stub",
+                         scenario=args.scenario, concurrency=args.concurrency,
+                         corpus_size=args.corpus_size, seed=args.seed,
+                         stub_cost_ms=None if args.real or args.url else args.stub_cost_ms),
+        "results": run_load(url, requests, args.concurrency, args.duration, args.requests),
+    }
+    emit(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
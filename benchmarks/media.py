@@ -0,0 +1,96 @@
+"""Animated media scoring: frame sampling against classifying every frame.
+
+    python -m benchmarks.media --clips 20 --frames 48 --stub-cost-ms 5
+
+Clips are synthetic animated GIFs (benchmarks/corpus.py) scored with stub
+models unless --real is given. "every_frame" classifies all decoded frames
+in batches (same decoding and downscaling), "sampled" is
+calculate_image_hazard_score_bytes with its scene sampling and early stop. The report includes frames classified per clip
+and how often the sampled score matches the every-frame maximum.
+"""
+import argparse
+import time
+
+from benchmarks import corpus, stubs
+from benchmarks.common import emit, metadata, summarize
+
+
+def run(hazard, clips):
+    import media
+
+    def fresh():
+        hazard.result_cache.clear()
+        if hazard.image_index is not None:
+            hazard.image_index.clear()
+
+    def every_frame(data):
+        frames = [f for _, f in media.sample_frames(data, min_change=0, min_interval_s=0)]
+        scores = []
+        for i in range(0, len(frames), hazard.IMAGE_BATCH_SIZE):
+            for labels in hazard.classify_images(frames[i:i + hazard.IMAGE_BATCH_SIZE]):
+                scores.append(hazard.image_hazard_from_labels(labels)[0] if labels is not None else 0.0)
+        return max(scores, default=0.0), len(frames)
+
+    report = {}
+    fresh()
+    full, latencies = [], []
+    start = time.perf_counter()
+    for data in clips:
+        t = time.perf_counter()
+        full.append(every_frame(data))
+        latencies.append(time.perf_counter() - t)
+    report["every_frame"] = dict(summarize(latencies, time.perf_counter() - start),
+                                 frames_per_clip=sum(n for _, n in full) / len(clips))
+
+    fresh()
+    count_before, _ = media.MEDIA_FRAMES.total()
+    sampled, latencies = [], []
+    start = time.perf_counter()
+    for data in clips:
+        t = time.perf_counter()
+        sampled.append(hazard.calculate_image_hazard_score_bytes(data)[0])
+        latencies.append(time.perf_counter() - t)
+    count, frames = media.MEDIA_FRAMES.total()
+    report["sampled"] = dict(summarize(latencies, time.perf_counter() - start),
+                             frames_per_clip=frames / max(1, count - count_before))
+    report["sampled_matches_max"] = sum(
+        1 for s, (m, _) in zip(sampled, full) if abs(s - m) < 1e-9
+    ) / len(clips)
+    report["sampled_reaches_stop_score"] = sum(
+        1 for s, (m, _) in zip(sampled, full) if s >= min(m, media.MEDIA_STOP_SCORE)
+    ) / len(clips)
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark animated media scoring")
+    ap.add_argument("--real", action="store_true", help="use the real image model instead of a stub")
+    ap.add_argument("--stub-cost-ms", type=float, default=0.0,
+                    help="simulated per-frame inference time for the stub")
+    ap.add_argument("--clips", type=int, default=20)
+    ap.add_argument("--frames", type=int, default=48, help="frames per GIF")
+    ap.add_argument("--scenes", type=int, default=3, help="distinct shots per GIF")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="write the JSON report here as well as stdout")
+    args = ap.parse_args()
+
+    import app_multimodal_hazard as hazard
+    import media
+
+    if not args.real:
+        stubs.install(hazard.registry, args.stub_cost_ms)
+    hazard.registry.warm_up(["image"], background=False)
+    clips = corpus.animated_gifs(args.clips, seed=args.seed, frames=args.frames, scenes=args.scenes)
+    report = {
+        "benchmark": "media",
+        "meta": metadata(mode="real" if args.real else "stub", seed=args.seed, clips=args.clips,
+                         frames=args.frames, scenes=args.scenes,
+                         max_frames=media.MEDIA_MAX_FRAMES, stop_score=media.MEDIA_STOP_SCORE,
+                         stub_cost_ms=None if args.real else args.stub_cost_ms),
+        "results": run(hazard, clips),
+    }
+    emit(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""In-process benchmarks of the scoring functions.
+
+    python -m benchmarks.pipeline --texts 2000 --images 50 --out stub.json
+    python -m benchmarks.pipeline --real --texts 200 --images 20
+
+By default the transformers pipelines are replaced with deterministic stubs
+(benchmarks/stubs.py), so the numbers measure this code's own overhead;
+--real loads the configured models. The result cache is cleared before
+each stage unless --warm-cache is given.
+"""
+import argparse
+import time
+
+from benchmarks import corpus, stubs
+from benchmarks.common import emit, metadata, summarize
+
+
+def _timed(fn, items):
+    latencies = []
+    start = time.perf_counter()
+    for x in items:
+        t = time.perf_counter()
+        fn(x)
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def run(hazard, texts, images, batch_size, warm_cache=False, album_size=4):
+    def fresh():
+        if not warm_cache:
+            hazard.result_cache.clear()
+            if hazard.image_index is not None:
+                hazard.image_index.clear()
+
+    report = {}
+    load_start = time.perf_counter()
+    hazard.registry.warm_up(["sentiment", "zero_shot", "image"], background=False)
+    report["load_s"] = time.perf_counter() - load_start
+
+    report["clean_text"] = _timed(hazard.clean_text, texts)
+    report["calculate_text_hazard_score"] = _timed(hazard.calculate_text_hazard_score, texts)
+    start = time.perf_counter()
+    hazard.calculate_text_hazard_scores(texts)
+    report["calculate_text_hazard_scores"] = summarize([], time.perf_counter() - start, len(texts))
+
+    pairs = [(i % 23, (i * 7) % 19) for i in range(len(texts))]
+    report["fuse_scores"] = _timed(lambda p: hazard.fuse_scores(p[0], p[1], image_confident=p[1] >= 3), pairs)
+
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    for name, fn in (("analyze_sentiment_batch", hazard.analyze_sentiment_batch),
+                     ("classify_hazard_batch", hazard.classify_hazard_batch)):
+        fresh()
+        stage = _timed(fn, batches)
+        stage["items_per_s"] = len(texts) / stage["elapsed_s"] if stage["elapsed_s"] else 0.0
+        report[name] = stage
+
+    if images:
+        fresh()
+        report["decode_image"] = _timed(hazard.decode_image, images)
+        decoded = [hazard.decode_image(b) for b in images]
+        fresh()
+        report["calculate_image_hazard_score"] = _timed(hazard.calculate_image_hazard_score, decoded)
+        fresh()
+        report["calculate_image_hazard_score_bytes"] = _timed(hazard.calculate_image_hazard_score_bytes, images)
+        # The same images as albums: one batched model call per album.
+        albums = [images[i:i + album_size] for i in range(0, len(images), album_size)]
+        fresh()
+        stage = _timed(hazard.calculate_image_hazard_scores_bytes, albums)
+        stage["items_per_s"] = len(images) / stage["elapsed_s"] if stage["elapsed_s"] else 0.0
+        report["calculate_image_hazard_scores_bytes"] = stage
+
+    fresh()
+    reports = [{"text": t, "media_urls": []} for t in texts]
+    stage = _timed(lambda b: hazard.score_reports(b, use_images=False),
+                   [reports[i:i + batch_size] for i in range(0, len(reports), batch_size)])
+    stage["items_per_s"] = len(reports) / stage["elapsed_s"] if stage["elapsed_s"] else 0.0
+    report["score_reports"] = stage
+    report["cache"] = hazard.result_cache.stats()
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the hazard scoring pipeline in-process")
+    ap.add_argument("--real", action="store_true", help="use the real models instead of stubs")
+    ap.add_argument("--stub-cost-ms", type=float, default=0.0,
+                    help="simulated per-item inference time for the stubs")
+    ap.add_argument("--texts", type=int, default=2000)
+    ap.add_argument("--images", type=int, default=50)
+    ap.add_argument("--batch-size", type=int, default=16)
+    ap.add_argument("--album-size", type=int, default=4, help="images per batched image call")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--warm-cache", action="store_true")
+    ap.add_argument("--out", help="write the JSON report here as well as stdout")
+    args = ap.parse_args()
+
+    import app_multimodal_hazard as hazard
+
+    if not args.real:
+        stubs.install(hazard.registry, args.stub_cost_ms)
+    texts = [t["text"] for t in corpus.tweets(args.texts, seed=args.seed)]
+    images = corpus.images(args.images, seed=args.seed)
+    report = {
+        "benchmark": "pipeline",
+        "meta": metadata(mode="real" if args.real else "stub", backend=hazard.BACKEND,
+                         zero_shot_mode=hazard.ZERO_SHOT_MODE, seed=args.seed,
+                         texts=args.texts, images=args.images, batch_size=args.batch_size,
+                         album_size=args.album_size,
+                         stub_cost_ms=None if args.real else args.stub_cost_ms),
+        "results": run(hazard, texts, images, args.batch_size, args.warm_cache, args.album_size),
+    }
+    emit(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Startup-time benchmark: import cost and time to first response.
+
+    python -m benchmarks.startup --repeat 5 --out startup.json
+    python -m benchmarks.startup --max-import-ms 1500   # exit 1 over budget
+
+Each measurement runs in a fresh interpreter. Importing the API must not
+pull in heavy or optional packages (--forbid); any that show up in
+sys.modules after `import main` are reported and fail the run, as does an
+import slower than --max-import-ms. Time to first response starts the app
+under uvicorn (model warm-up off, stub models unless --real) and polls
+until GET / and then POST /analyze-text answer.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import emit, metadata
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["transformers", "torch", "tweepy", "pandas", "wordcloud", "nltk", "matplotlib", "streamlit"]
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted(m for m in sys.modules if "." not in m)}}))
+"""
+
+SERVE = """
+import sys
+import uvicorn
+if sys.argv[2] == "stub":
+    import app_multimodal_hazard as hazard
+    from benchmarks import stubs
+    stubs.install(hazard.registry)
+import main
+uvicorn.run(main.app, host="127.0.0.1", port=int(sys.argv[1]), log_level="warning")
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("HAZARD_WARMUP", "0")
+    env.setdefault("HAZARD_STORE_PATH", "")
+    return env
+
+
+def measure_import(module, repeat):
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE.format(module=module)],
+            cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    seconds = [r["seconds"] for r in runs]
+    return {
+        "median_ms": statistics.median(seconds) * 1000,
+        "min_ms": min(seconds) * 1000,
+        "heavy_modules": [m for m in HEAVY if m in runs[-1]["modules"]],
+        "module_count": len(runs[-1]["modules"]),
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _request(port, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    conn.request(method, path, body=body, headers=headers)
+    resp = conn.getresponse()
+    resp.read()
+    return resp.status
+
+
+def measure_first_response(real, timeout=600):
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", SERVE, str(port), "real" if real else "stub"],
+        cwd=ROOT, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        result = {}
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited: {proc.stderr.read().decode()[-2000:]}")
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError("server did not answer in time")
+            try:
+                if _request(port, "GET", "/") == 200:
+                    break
+            except OSError:
+                time.sleep(0.02)
+        result["first_response_ms"] = (time.perf_counter() - start) * 1000
+        t = time.perf_counter()
+        status = _request(port, "POST", "/analyze-text", json.dumps({"text": "Flood warning near Puri!"}))
+        result["first_analyze_text_ms"] = (time.perf_counter() - t) * 1000
+        result["first_analyze_text_status"] = status
+        return result
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Measure API import time and time to first response")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--real", action="store_true", help="first /analyze-text loads the real models")
+    ap.add_argument("--skip-server", action="store_true")
+    ap.add_argument("--max-import-ms", type=float, help="fail if `import main` is slower")
+    ap.add_argument("--forbid", nargs="*", default=HEAVY,
+                    help="packages `import main` must not load")
+    ap.add_argument("--out")
+    args = ap.parse_args()
+
+    results = {
+        "import_app_multimodal_hazard": measure_import("app_multimodal_hazard", args.repeat),
+        "import_main": measure_import("main", args.repeat),
+    }
+    if not args.skip_server:
+        results["server"] = measure_first_response(args.real)
+
+    failures = []
+    loaded = [m for m in results["import_main"]["heavy_modules"] if m in args.forbid]
+    if loaded:
+        failures.append(f"import main loaded {', '.join(loaded)}")
+    if args.max_import_ms and results["import_main"]["median_ms"] > args.max_import_ms:
+        failures.append(f"import main took {results['import_main']['median_ms']:.0f} ms")
+    report = {
+        "benchmark": "startup",
+        "meta": metadata(mode="real" if args.real else "stub", repeat=args.repeat),
+        "results": results,
+        "failures": failures,
+    }
+    emit(report, args.out)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import threading
+from collections import Counter
+
+# Tier that produced a result.
+SAFE = "lexicon-safe"
+CRITICAL = "lexicon-critical"
+FULL = "full"
+
+
+class Cascade:
+    """Decides from the lexicon score alone whether the model stages must run.
+
+    - lexicon-safe: score <= `safe_max_score` (no hazard keyword, no urgency).
+      Sentiment and zero-shot are skipped; images still run unless
+      `safe_skips_images`, since a photo alone can raise the risk.
+    - lexicon-critical: score >= `critical_min_score`, or at least
+      `critical_min_severe` distinct high-severity keywords. Every model
+      stage is skipped. With the default threshold of 10 the fused risk is
+      High whatever the image scores, so the label cannot change.
+    - full: everything runs, as without a cascade.
+    """
+
+    def __init__(self, lexicon, severe_keywords, safe_max_score=0.0, critical_min_score=10.0,
+                 critical_min_severe=2, safe_skips_images=False):
+        self.lexicon = lexicon
+        self.severe_keywords = set(severe_keywords)
+        self.safe_max_score = safe_max_score
+        self.critical_min_score = critical_min_score
+        self.critical_min_severe = critical_min_severe
+        self.safe_skips_images = safe_skips_images
+        self.tiers = Counter()
+        self._lock = threading.Lock()
+
+    def tier(self, text, text_score):
+        if not text:
+            # Image-only reports: the photo is the only signal.
+            tier = FULL
+        elif text_score <= self.safe_max_score:
+            tier = SAFE
+        elif text_score >= self.critical_min_score:
+            tier = CRITICAL
+        elif self.critical_min_severe and sum(
+            1 for k in self.lexicon.keyword_counts(text) if k in self.severe_keywords
+        ) >= self.critical_min_severe:
+            tier = CRITICAL
+        else:
+            tier = FULL
+        with self._lock:
+            self.tiers[tier] += 1
+        return tier
+
+    @staticmethod
+    def runs_text_models(tier):
+        return tier == FULL
+
+    def runs_images(self, tier):
+        if tier == CRITICAL:
+            return False
+        return not (tier == SAFE and self.safe_skips_images)
+
+    def stats(self):
+        with self._lock:
+            total = sum(self.tiers.values())
+            return {
+                "decisions": total,
+                "tiers": dict(self.tiers),
+                "early_exit_rate": (total - self.tiers[FULL]) / total if total else 0.0,
+                "safe_max_score": self.safe_max_score,
+                "critical_min_score": self.critical_min_score,
+                "critical_min_severe": self.critical_min_severe,
+                "safe_skips_images": self.safe_skips_images,
+            }
+
+
+def cascade_from_env(lexicon, severe_keywords):
+    """HAZARD_CASCADE=1 enables the cascade; thresholds via HAZARD_CASCADE_* variables."""
+    if os.getenv("HAZARD_CASCADE", "0") != "1":
+        return None
+    return Cascade(
+        lexicon,
+        severe_keywords,
+        safe_max_score=float(os.getenv("HAZARD_CASCADE_SAFE_MAX", "0")),
+        critical_min_score=float(os.getenv("HAZARD_CASCADE_CRITICAL_MIN", "10")),
+        critical_min_severe=int(os.getenv("HAZARD_CASCADE_CRITICAL_SEVERE", "2")),
+        safe_skips_images=os.getenv("HAZARD_CASCADE_SAFE_SKIPS_IMAGES", "0") == "1",
+    )
@@ -0,0 +1,175 @@
+import ipaddress
+import os
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+
+class DownloadError(Exception):
+    pass
+
+
+class UnsafeURL(DownloadError):
+    pass
+
+
+MAX_REDIRECTS = 5
+
+
+def check_url(url, allowed_hosts=None):
+    """Raises UnsafeURL unless `url` is http(s) on a public address.
+
+    Every address the host resolves to must be globally routable, which rules
+    out private, loopback, link-local (cloud metadata) and reserved ranges.
+    With `allowed_hosts` the host must also be one of them or a subdomain.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise UnsafeURL(f"only http(s) URLs are fetched, got {url!r}")
+    host = parts.hostname.rstrip(".").lower()
+    if allowed_hosts and not any(host == h or host.endswith("." + h) for h in allowed_hosts):
+        raise UnsafeURL(f"{host} is not an allowed media host")
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (ValueError, OSError) as e:
+        raise UnsafeURL(f"cannot resolve {url!r}: {e}") from e
+    for info in infos:
+        addr = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not addr.is_global:
+            raise UnsafeURL(f"{host} resolves to non-public address {addr}")
+
+
+class ImageDownloader:
+    """Fetches media over a shared connection pool with bounded parallelism.
+
+    Each host gets at most `per_host` concurrent requests, bodies larger than
+    `max_bytes` or with a non-image, non-video content type are rejected, and
+    `fetch_many` stops waiting once its batch deadline has passed.
+    """
+
+    def __init__(self, max_workers=16, per_host=4, max_bytes=10 * 1024 * 1024,
+                 timeout=8.0, decode=None):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.decode = decode
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="image-download")
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        with self._hosts_lock:
+            sem = self._hosts.get(host)
+            if sem is None:
+                sem = self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return sem
+
+    def fetch(self, url, deadline=None, check=None):
+        """Returns the body of `url` as bytes, or raises DownloadError.
+
+        `check(url)` (e.g. check_url) vets the URL and every redirect target
+        before it is requested.
+        """
+        with metrics.stage("image_download"):
+            return self._fetch(url, deadline, check)
+
+    def _get(self, url, timeout, check):
+        if check is None:
+            return self.session.get(url, timeout=timeout, stream=True)
+        for _ in range(MAX_REDIRECTS + 1):
+            check(url)
+            r = self.session.get(url, timeout=timeout, stream=True, allow_redirects=False)
+            if not r.is_redirect:
+                return r
+            url = urljoin(url, r.headers["Location"])
+            r.close()
+        raise DownloadError(f"more than {MAX_REDIRECTS} redirects")
+
+    def _fetch(self, url, deadline, check=None):
+        timeout = self.timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                raise DownloadError(f"deadline passed before fetching {url}")
+        slot = self._host_slot(url)
+        if not slot.acquire(timeout=timeout):
+            raise DownloadError(f"no free connection slot for {url}")
+        try:
+            with self._get(url, timeout, check) as r:
+                r.raise_for_status()
+                ctype = r.headers.get("Content-Type", "")
+                if ctype and not ctype.startswith(("image/", "video/")):
+                    raise DownloadError(f"unexpected content type {ctype!r} for {url}")
+                length = r.headers.get("Content-Length")
+                if length and int(length) > self.max_bytes:
+                    raise DownloadError(f"{url} is {length} bytes, limit {self.max_bytes}")
+                chunks, size = [], 0
+                for chunk in r.iter_content(64 * 1024):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise DownloadError(f"{url} exceeds {self.max_bytes} bytes")
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise DownloadError(f"deadline passed while fetching {url}")
+                    chunks.append(chunk)
+                return b"".join(chunks)
+        except requests.RequestException as e:
+            raise DownloadError(f"{url}: {e}") from e
+        finally:
+            slot.release()
+
+    def _fetch_and_decode(self, url, deadline):
+        data = self.fetch(url, deadline)
+        image = self.decode(data) if self.decode is not None else None
+        return data, image
+
+    def fetch_many(self, urls, deadline_s=None):
+        """Yields (url, bytes, decoded) for each URL in completion order.
+
+        Decoding runs on the download thread, so it overlaps with the
+        remaining transfers. Failed or timed-out URLs yield (url, None, None).
+        """
+        deadline = time.monotonic() + deadline_s if deadline_s is not None else None
+        pending = {
+            self._executor.submit(self._fetch_and_decode, url, deadline): url
+            for url in dict.fromkeys(urls)
+        }
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                for fut, url in pending.items():
+                    fut.cancel()
+                    yield url, None, None
+                return
+            for fut in done:
+                url = pending.pop(fut)
+                try:
+                    data, image = fut.result()
+                except Exception:
+                    yield url, None, None
+                else:
+                    yield url, data, image
+
+
+def downloader_from_env(decode=None):
+    return ImageDownloader(
+        max_workers=int(os.getenv("HAZARD_DOWNLOAD_WORKERS", "16")),
+        per_host=int(os.getenv("HAZARD_DOWNLOAD_PER_HOST", "4")),
+        max_bytes=int(os.getenv("HAZARD_DOWNLOAD_MAX_BYTES", str(10 * 1024 * 1024))),
+        timeout=float(os.getenv("HAZARD_DOWNLOAD_TIMEOUT", "8")),
+        decode=decode,
+    )
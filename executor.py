@@ -0,0 +1,113 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+import metrics
+
+QUEUE_WAIT = metrics.REGISTRY.histogram(
+    "hazard_executor_wait_seconds", "Time a task waited for an executor worker"
+)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def _timed_call(fn, args):
+    # Wall clock so it is comparable across processes in process-pool mode.
+    return time.time(), fn(*args)
+
+
+class BoundedExecutor:
+    """Runs blocking work off the event loop with a bounded backlog.
+
+    At most `max_workers` calls run at once and at most `max_queue` more wait
+    for a worker; beyond that `run` fails fast with QueueFullError instead of
+    letting the backlog (and everyone's latency) grow without limit.
+    """
+
+    def __init__(self, max_workers=2, max_queue=32, kind="thread", name="inference"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.kind = kind
+        self.name = name
+        if kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def queue_depth(self):
+        return max(0, self._pending - self.max_workers)
+
+    def submit(self, fn, *args):
+        """Like `run` for callers on plain threads: returns a concurrent Future."""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(f"{self._pending} tasks already pending")
+            self._pending += 1
+        submitted = time.time()
+        try:
+            if self.kind == "process":
+                fut = self._executor.submit(_timed_call, fn, args)
+            else:
+                # Threads see the caller's context, so stage timings reach its trace.
+                fut = self._executor.submit(_timed_call, contextvars.copy_context().run, (fn, *args))
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        out = Future()
+        fut.add_done_callback(partial(self._finished, out, submitted))
+        return out
+
+    def _finished(self, out, submitted, fut):
+        with self._lock:
+            self._pending -= 1
+        try:
+            started, result = fut.result()
+        except BaseException as e:
+            out.set_exception(e)
+            return
+        waited = max(0.0, started - submitted)
+        QUEUE_WAIT.observe(waited, executor=self.name)
+        with self._lock:
+            self.completed += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        out.set_result(result)
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self):
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "queue_depth": self.queue_depth(),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_s": (self.total_wait / self.completed) if self.completed else 0.0,
+            "max_wait_s": self.max_wait,
+        }
+
+
+def executor_from_env(prefix, default_workers=2, default_queue=32):
+    return BoundedExecutor(
+        max_workers=int(os.getenv(f"{prefix}_WORKERS", str(default_workers))),
+        max_queue=int(os.getenv(f"{prefix}_QUEUE", str(default_queue))),
+        kind=os.getenv(f"{prefix}_KIND", "thread"),
+        name=prefix.lower(),
+    )
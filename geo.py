@@ -0,0 +1,269 @@
+import math
+import re
+
+# Zoom levels with precomputed cluster cells (Web Mercator / slippy-map tiles).
+MIN_ZOOM = 0
+MAX_ZOOM = 16
+EARTH_RADIUS_KM = 6371.0
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS report_geo USING rtree (
+    id, min_lat, max_lat, min_lon, max_lon
+);
+CREATE TABLE IF NOT EXISTS report_points (
+    id INTEGER PRIMARY KEY,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS geo_tiles (
+    z INTEGER NOT NULL,
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    max_score REAL NOT NULL,
+    sum_lat REAL NOT NULL,
+    sum_lon REAL NOT NULL,
+    PRIMARY KEY (z, x, y)
+) WITHOUT ROWID;
+"""
+
+# Small offline gazetteer for free-text report locations (coastal India).
+GAZETTEER = {
+    "mumbai": (19.076, 72.8777),
+    "chennai": (13.0827, 80.2707),
+    "kolkata": (22.5726, 88.3639),
+    "visakhapatnam": (17.6868, 83.2185),
+    "vizag": (17.6868, 83.2185),
+    "kochi": (9.9312, 76.2673),
+    "cochin": (9.9312, 76.2673),
+    "thiruvananthapuram": (8.5241, 76.9366),
+    "puducherry": (11.9416, 79.8083),
+    "pondicherry": (11.9416, 79.8083),
+    "mangaluru": (12.9141, 74.856),
+    "mangalore": (12.9141, 74.856),
+    "goa": (15.2993, 74.124),
+    "panaji": (15.4909, 73.8278),
+    "puri": (19.8135, 85.8312),
+    "paradip": (20.3164, 86.611),
+    "bhubaneswar": (20.2961, 85.8245),
+    "surat": (21.1702, 72.8311),
+    "kandla": (23.0333, 70.2167),
+    "porbandar": (21.6417, 69.6293),
+    "dwarka": (22.2442, 68.9685),
+    "digha": (21.6266, 87.5074),
+    "kakinada": (16.9891, 82.2475),
+    "machilipatnam": (16.1875, 81.1389),
+    "nellore": (14.4426, 79.9865),
+    "cuddalore": (11.748, 79.7714),
+    "nagapattinam": (10.7672, 79.8449),
+    "rameswaram": (9.2876, 79.3129),
+    "thoothukudi": (8.7642, 78.1348),
+    "tuticorin": (8.7642, 78.1348),
+    "kanyakumari": (8.0883, 77.5385),
+    "kozhikode": (11.2588, 75.7804),
+    "alappuzha": (9.4981, 76.3388),
+    "ratnagiri": (16.9902, 73.312),
+    "port blair": (11.6234, 92.7265),
+}
+
+_LATLON_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+def geocode(location):
+    """(lat, lon) for "lat, lon" strings or known place names, else None."""
+    if not location:
+        return None
+    m = _LATLON_RE.match(location)
+    if m:
+        lat, lon = float(m.group(1)), float(m.group(2))
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            return lat, lon
+        return None
+    name = location.strip().lower()
+    if name in GAZETTEER:
+        return GAZETTEER[name]
+    for part in re.split(r"[,/]", name):
+        part = part.strip()
+        if part in GAZETTEER:
+            return GAZETTEER[part]
+    return None
+
+
+def tile_xy(lat, lon, z):
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    n = 1 << z
+    x = int((lon + 180.0) / 360.0 * n)
+    rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def install(conn):
+    conn.executescript(SCHEMA)
+
+
+def index_points(conn, points):
+    """Adds (report_id, lat, lon, score) points inside the caller's transaction.
+
+    Updates the R-tree and every zoom level's cluster cell, so viewport and
+    tile queries never aggregate raw points.
+    """
+    if not points:
+        return
+    conn.executemany(
+        "INSERT INTO report_geo (id, min_lat, max_lat, min_lon, max_lon) VALUES (?, ?, ?, ?, ?)",
+        [(rid, lat, lat, lon, lon) for rid, lat, lon, _ in points],
+    )
+    conn.executemany(
+        "INSERT INTO report_points (id, lat, lon) VALUES (?, ?, ?)",
+        [(rid, lat, lon) for rid, lat, lon, _ in points],
+    )
+    add_to_tiles(conn, [(lat, lon, score) for _, lat, lon, score in points])
+
+
+def _cells(points):
+    cells = {}
+    for lat, lon, score in points:
+        score = score or 0.0
+        for z in range(MIN_ZOOM, MAX_ZOOM + 1):
+            key = (z, *tile_xy(lat, lon, z))
+            c = cells.get(key)
+            if c is None:
+                cells[key] = [1, score, lat, lon]
+            else:
+                c[0] += 1
+                c[1] = max(c[1], score)
+                c[2] += lat
+                c[3] += lon
+    return cells
+
+
+def add_to_tiles(conn, points):
+    """Counts (lat, lon, score) points into every zoom level's cluster cell."""
+    conn.executemany(
+        "INSERT INTO geo_tiles (z, x, y, count, max_score, sum_lat, sum_lon) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(z, x, y) DO UPDATE SET "
+        "count = count + excluded.count, "
+        "max_score = max(max_score, excluded.max_score), "
+        "sum_lat = sum_lat + excluded.sum_lat, "
+        "sum_lon = sum_lon + excluded.sum_lon",
+        [(z, x, y, *agg) for (z, x, y), agg in _cells(points).items()],
+    )
+
+
+def remove_from_tiles(conn, points, live_max):
+    """Takes (lat, lon, score) points back out of their cluster cells.
+
+    Counts and centroid sums are decremented. A max can't be, so cells
+    whose max may have come from a removed point are recomputed finest
+    first: the MAX_ZOOM cell from `live_max(ids)` over the report ids still
+    in it, each coarser cell from its four children. Empty cells are dropped.
+    """
+    cells = _cells(points)
+    conn.executemany(
+        "UPDATE geo_tiles SET count = count - ?, sum_lat = sum_lat - ?, sum_lon = sum_lon - ? "
+        "WHERE z = ? AND x = ? AND y = ?",
+        [(n, sum_lat, sum_lon, z, x, y) for (z, x, y), (n, _, sum_lat, sum_lon) in cells.items()],
+    )
+    conn.execute("DELETE FROM geo_tiles WHERE count <= 0")
+    for (z, x, y), (_, removed_max, _, _) in sorted(cells.items(), reverse=True):
+        row = conn.execute(
+            "SELECT max_score FROM geo_tiles WHERE z = ? AND x = ? AND y = ?", (z, x, y)
+        ).fetchone()
+        if row is None or removed_max < row[0]:
+            continue
+        if z == MAX_ZOOM:
+            best = live_max(_ids_in_tile(conn, z, x, y))
+        else:
+            best = conn.execute(
+                "SELECT max(max_score) FROM geo_tiles "
+                "WHERE z = ? AND x BETWEEN ? AND ? AND y BETWEEN ? AND ?",
+                (z + 1, 2 * x, 2 * x + 1, 2 * y, 2 * y + 1),
+            ).fetchone()[0]
+        conn.execute(
+            "UPDATE geo_tiles SET max_score = ? WHERE z = ? AND x = ? AND y = ?",
+            (best or 0.0, z, x, y),
+        )
+
+
+def tile_bounds(z, x, y):
+    """(min_lat, min_lon, max_lat, max_lon) of slippy-map tile x/y at zoom z."""
+    n = 1 << z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0
+
+
+def _ids_in_tile(conn, z, x, y):
+    min_lat, min_lon, max_lat, max_lon = tile_bounds(z, x, y)
+    # tile_xy clamps the poles into the edge rows.
+    if y == 0:
+        max_lat = 90.0
+    if y == (1 << z) - 1:
+        min_lat = -90.0
+    # R-tree boxes are stored as rounded-out 32-bit floats, so take any overlap
+    # and let tile_xy on the exact point decide which cell owns it.
+    rows = conn.execute(
+        "SELECT p.id, p.lat, p.lon FROM report_geo g JOIN report_points p ON p.id = g.id "
+        "WHERE g.max_lat >= ? AND g.min_lat <= ? AND g.max_lon >= ? AND g.min_lon <= ?",
+        (min_lat, max_lat, min_lon, max_lon),
+    ).fetchall()
+    return [r[0] for r in rows if tile_xy(r[1], r[2], z) == (x, y)]
+
+
+def in_bbox(conn, min_lat, min_lon, max_lat, max_lon, limit=1000):
+    return conn.execute(
+        "SELECT r.*, p.lat, p.lon FROM report_geo g "
+        "JOIN report_points p ON p.id = g.id JOIN reports r ON r.id = g.id "
+        "WHERE g.min_lat >= ? AND g.max_lat <= ? AND g.min_lon >= ? AND g.max_lon <= ? "
+        "ORDER BY r.id DESC LIMIT ?",
+        (min_lat, max_lat, min_lon, max_lon, limit),
+    ).fetchall()
+
+
+def within_radius(conn, lat, lon, radius_km, limit=1000):
+    """Points within `radius_km`, nearest first: R-tree box prefilter, exact distance after."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+    rows = conn.execute(
+        "SELECT r.*, p.lat, p.lon FROM report_geo g "
+        "JOIN report_points p ON p.id = g.id JOIN reports r ON r.id = g.id "
+        "WHERE g.min_lat >= ? AND g.max_lat <= ? AND g.min_lon >= ? AND g.max_lon <= ?",
+        (lat - dlat, lat + dlat, lon - dlon, lon + dlon),
+    ).fetchall()
+    hits = []
+    for row in rows:
+        d = haversine_km(lat, lon, row["lat"], row["lon"])
+        if d <= radius_km:
+            hits.append((d, row))
+    hits.sort(key=lambda h: h[0])
+    return hits[:limit]
+
+
+def tiles(conn, z, min_lat, min_lon, max_lat, max_lon):
+    """Cluster cells at zoom `z` covering the bounding box."""
+    z = max(MIN_ZOOM, min(MAX_ZOOM, z))
+    x0, y0 = tile_xy(max_lat, min_lon, z)
+    x1, y1 = tile_xy(min_lat, max_lon, z)
+    rows = conn.execute(
+        "SELECT x, y, count, max_score, sum_lat, sum_lon FROM geo_tiles "
+        "WHERE z = ? AND x BETWEEN ? AND ? AND y BETWEEN ? AND ?",
+        (z, x0, x1, y0, y1),
+    ).fetchall()
+    return [
+        {
+            "z": z, "x": r[0], "y": r[1], "count": r[2], "max_score": r[3],
+            "lat": r[4] / r[2], "lon": r[5] / r[2],
+        }
+        for r in rows
+    ]
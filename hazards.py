@@ -0,0 +1,66 @@
+"""Hazard keyword weights and the keyword-level judgements built on them.
+
+Kept free of model and I/O setup so the API, the Streamlit app and the
+offline tools all classify reports the same way.
+"""
+from lexicon import HazardLexicon
+
+HAZARD_WEIGHTS = {
+    # 🔴 Critical Hazards (High Fatality / Sudden Onset)
+    "tsunami": 10,
+    "earthquake": 10,
+    "cyclone": 9,
+    "hurricane": 9,
+    "volcano": 9,
+    "eruption": 9,
+    "wildfire": 9,
+    
+    # 🟠 Severe Hazards (Regional Damage, Strong Warnings)
+    "flood": 8,
+    "flooding": 8,
+    "landslide": 8,
+    "mudslide": 8,
+    "avalanche": 8,
+    "storm": 7,
+    "typhoon": 7,
+    "surge": 7,
+    
+    # 🟡 Medium Hazards (Localized / Manageable Risks)
+    "tornado": 6,
+    "drought": 6,
+    "heatwave": 6,
+    "hailstorm": 5,
+    "snowstorm": 5,
+    "inundation": 5,
+    
+    # 🟢 Lower-Weight Contextual Keywords (indicators but not direct hazards)
+    "wave": 3,
+    "waves": 3,
+    "coast": 2,
+    "shore": 2,
+    "sea": 2,
+    "rain": 2,
+    "wind": 2,
+    "high": 1,
+    "water": 1
+}
+
+
+HIGH_SEVERITY_KEYWORDS = {
+    "tsunami", "earthquake", "cyclone", "hurricane", "volcano", "eruption",
+    "wildfire", "flood", "flooding", "landslide", "mudslide", "avalanche"
+}
+
+
+# Rebuild with HazardLexicon(HAZARD_WEIGHTS) after re-tuning the weights.
+HAZARD_LEXICON = HazardLexicon(HAZARD_WEIGHTS)
+
+
+def dominant_hazard(text, min_weight=5):
+    """The highest-weighted hazard keyword in `text` (context words excluded)."""
+    return HAZARD_LEXICON.dominant(text, min_weight)
+
+
+def is_high_severity(text):
+    """True if `text` mentions any HIGH_SEVERITY_KEYWORDS hazard."""
+    return any(k in HIGH_SEVERITY_KEYWORDS for k in HAZARD_LEXICON.keyword_counts(text))
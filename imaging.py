@@ -0,0 +1,60 @@
+import io
+import os
+
+from PIL import Image
+
+# Larger images are rejected before any pixel data is decoded.
+MAX_IMAGE_PIXELS = int(os.getenv("HAZARD_MAX_IMAGE_PIXELS", str(40_000_000)))
+# Shortest side kept after downscaling; classifiers resize to ~224px anyway.
+DEFAULT_INPUT_SIZE = int(os.getenv("HAZARD_IMAGE_SIZE", "224"))
+
+
+class ImageRejected(Exception):
+    """Refused before decoding: more pixels than MAX_IMAGE_PIXELS."""
+
+
+class ImageUnreadable(Exception):
+    """Not an image Pillow can decode (unknown format, truncated, corrupt)."""
+
+
+def model_input_size(pipe=None):
+    """Shortest input edge the image pipeline's processor expects."""
+    processor = getattr(pipe, "image_processor", None) if pipe is not None else None
+    size = getattr(processor, "size", None)
+    if isinstance(size, dict):
+        edges = [v for k, v in size.items() if k in ("shortest_edge", "height", "width")]
+        if edges:
+            return int(min(edges))
+    elif isinstance(size, int):
+        return size
+    return DEFAULT_INPUT_SIZE
+
+
+def preprocess_image(data, size=DEFAULT_INPUT_SIZE):
+    """Decodes `data` straight to a small RGB image for classification.
+
+    Only the header is read before the pixel-count check, JPEGs are decoded
+    at a reduced DCT scale (draft mode) when they are much larger than
+    `size`, and the result is downscaled so its shortest side is `size`.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+    except Image.DecompressionBombError as e:
+        raise ImageRejected(str(e)) from e
+    except (OSError, ValueError) as e:
+        raise ImageUnreadable("not a recognized image format") from e
+    w, h = image.size
+    if w * h > MAX_IMAGE_PIXELS:
+        raise ImageRejected(f"{w}x{h} image exceeds {MAX_IMAGE_PIXELS} pixels")
+    scale = size / min(w, h)
+    try:
+        if scale < 1:
+            target = (max(size, round(w * scale)), max(size, round(h * scale)))
+            image.draft("RGB", target)
+            image = image.convert("RGB")
+            if min(image.size) > size:
+                image = image.resize(target, Image.BILINEAR, reducing_gap=2.0)
+            return image
+        return image.convert("RGB")
+    except (OSError, ValueError) as e:
+        raise ImageUnreadable(str(e)) from e
@@ -0,0 +1,343 @@
+"""Shared local inference server.
+
+    python inference_server.py --socket /tmp/jaldrishti-inference.sock
+
+One process loads the models; every uvicorn worker and the Streamlit app
+connect over a Unix socket (HAZARD_INFERENCE_SOCKET) and get lightweight
+RemotePipeline stand-ins instead of loading their own copies. Requests from
+all clients land in one micro-batcher per model, so concurrent callers in
+different processes share batches.
+
+Wire format: each message is a pickled tuple over multiprocessing.connection;
+requests are (request_id, op, args), replies (request_id, ok, result). A
+client may have many requests in flight on one connection.
+
+Nothing is unpickled before a client passes the HMAC handshake with the
+shared key: HAZARD_INFERENCE_AUTHKEY, or else a random key the server
+writes to an owner-only file next to the socket (<socket>.key, or
+HAZARD_INFERENCE_AUTHKEY_FILE) for clients running as the same user.
+"""
+import argparse
+import logging
+import os
+import secrets
+import threading
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from types import SimpleNamespace
+
+from batching import MicroBatcher
+
+DEFAULT_SOCKET = "/tmp/jaldrishti-inference.sock"
+MODELS = ("sentiment", "zero_shot", "image")
+
+log = logging.getLogger("inference_server")
+
+
+def authkey_file(address):
+    return os.getenv("HAZARD_INFERENCE_AUTHKEY_FILE") or address + ".key"
+
+
+def _authkey(address, create=False):
+    """The handshake key: HAZARD_INFERENCE_AUTHKEY, else the key file.
+
+    With `create` (the server) a fresh key is written to the file, mode 0600.
+    """
+    key = os.getenv("HAZARD_INFERENCE_AUTHKEY")
+    if key:
+        return key.encode()
+    path = authkey_file(address)
+    if create:
+        key = secrets.token_hex(32)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(key)
+        os.replace(tmp, path)
+        return key.encode()
+    try:
+        with open(path) as f:
+            return f.read().strip().encode()
+    except OSError as e:
+        raise ConnectionError(
+            f"no inference server key: set HAZARD_INFERENCE_AUTHKEY or make {path} readable ({e})"
+        ) from e
+
+
+def _grouped(items, run):
+    """Runs `run(group_key, values)` once per distinct key, keeping item order."""
+    groups = {}
+    for i, (value, k) in enumerate(items):
+        groups.setdefault(k, []).append((i, value))
+    results = [None] * len(items)
+    for k, members in groups.items():
+        out = run(k, [v for _, v in members])
+        for (i, _), r in zip(members, out):
+            results[i] = r
+    return results
+
+
+class InferenceServer:
+    def __init__(self, registry, address=DEFAULT_SOCKET, max_batch_size=32, max_wait_ms=5.0):
+        self.registry = registry
+        self.address = address
+        self.batchers = {
+            "sentiment": MicroBatcher(self._sentiment, max_batch_size, max_wait_ms, "remote-sentiment"),
+            "zero_shot": MicroBatcher(self._zero_shot, max_batch_size, max_wait_ms, "remote-zero-shot"),
+            "image": MicroBatcher(self._image, max_batch_size, max_wait_ms, "remote-image"),
+        }
+        self.clients = 0
+
+    # Batch functions: items come from any connected client.
+    def _sentiment(self, texts):
+        return self.registry.get("sentiment")(texts, batch_size=len(texts))
+
+    def _zero_shot(self, items):
+        pipe = self.registry.get("zero_shot")
+
+        def run(labels, texts):
+            out = pipe(texts, candidate_labels=list(labels), batch_size=len(texts) * len(labels))
+            return out if isinstance(out, list) else [out]
+
+        return _grouped(items, run)
+
+    def _image(self, items):
+        pipe = self.registry.get("image")
+
+        def run(top_k, images):
+            out = pipe(images, top_k=top_k, batch_size=len(images))
+            return out if isinstance(out[0], list) else [out]
+
+        return _grouped(items, run)
+
+    def _info(self):
+        from imaging import model_input_size
+
+        return {
+            "models": self.registry.status(),
+            "image_input_size": model_input_size(
+                self.registry.get("image") if self.registry.is_loaded("image") else None
+            ),
+            "batching": {name: b.stats() for name, b in self.batchers.items()},
+            "clients": self.clients,
+        }
+
+    def _submit(self, op, args):
+        if op == "sentiment":
+            return [self.batchers[op].submit(t) for t in args["texts"]]
+        if op == "zero_shot":
+            labels = tuple(args["labels"])
+            return [self.batchers[op].submit((t, labels)) for t in args["texts"]]
+        if op == "image":
+            return [self.batchers[op].submit((im, args["top_k"])) for im in args["images"]]
+        raise ValueError(f"unknown op {op!r}")
+
+    def _serve(self, conn):
+        send_lock = threading.Lock()
+
+        def reply(request_id, ok, result):
+            with send_lock:
+                try:
+                    conn.send((request_id, ok, result))
+                except (OSError, EOFError):
+                    pass
+
+        def on_done(request_id, futures):
+            remaining = [len(futures)]
+            lock = threading.Lock()
+
+            def done(_):
+                with lock:
+                    remaining[0] -= 1
+                    if remaining[0]:
+                        return
+                errors = [f.exception() for f in futures if f.exception() is not None]
+                if errors:
+                    reply(request_id, False, repr(errors[0]))
+                else:
+                    reply(request_id, True, [f.result() for f in futures])
+
+            return done
+
+        self.clients += 1
+        try:
+            while True:
+                try:
+                    request_id, op, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if op == "info":
+                        reply(request_id, True, self._info())
+                        continue
+                    futures = self._submit(op, args)
+                except Exception as e:
+                    reply(request_id, False, repr(e))
+                    continue
+                if not futures:
+                    reply(request_id, True, [])
+                    continue
+                callback = on_done(request_id, futures)
+                for f in futures:
+                    f.add_done_callback(callback)
+        finally:
+            self.clients -= 1
+            conn.close()
+
+    def serve_forever(self):
+        authkey = _authkey(self.address, create=True)
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        # The socket is created 0660, never briefly world-connectable.
+        umask = os.umask(0o117)
+        try:
+            listener = Listener(self.address, family="AF_UNIX", authkey=authkey)
+        finally:
+            os.umask(umask)
+        with listener:
+            log.info("inference server listening on %s", self.address)
+            while True:
+                try:
+                    conn = listener.accept()
+                except AuthenticationError:
+                    log.warning("rejected a client that failed the authkey handshake")
+                    continue
+                except Exception:
+                    log.exception("failed to accept a client")
+                    continue
+                threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+
+class InferenceClient:
+    """Thread-safe client; requests from many threads share one connection."""
+
+    def __init__(self, address=DEFAULT_SOCKET, timeout=60.0):
+        self.address = address
+        self.timeout = timeout
+        self._conn = None
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._next_id = 0
+        self._info = None
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = Client(self.address, family="AF_UNIX", authkey=_authkey(self.address))
+            threading.Thread(target=self._read, args=(self._conn,), daemon=True,
+                             name="inference-client").start()
+        return self._conn
+
+    def _read(self, conn):
+        while True:
+            try:
+                request_id, ok, result = conn.recv()
+            except (EOFError, OSError) as e:
+                self._fail_all(conn, e)
+                return
+            with self._lock:
+                fut = self._pending.pop(request_id, (None, None))[1]
+            if fut is None:
+                continue
+            if ok:
+                fut.set_result(result)
+            else:
+                fut.set_exception(RuntimeError(f"inference server: {result}"))
+
+    def _fail_all(self, conn, exc):
+        with self._lock:
+            if self._conn is conn:
+                self._conn = None
+            lost = [rid for rid, (c, _) in self._pending.items() if c is conn]
+            futures = [self._pending.pop(rid)[1] for rid in lost]
+        for fut in futures:
+            fut.set_exception(ConnectionError(f"inference server connection lost: {exc!r}"))
+
+    def call(self, op, **args):
+        fut = Future()
+        with self._lock:
+            conn = self._connect()
+            self._next_id += 1
+            request_id = self._next_id
+            self._pending[request_id] = (conn, fut)
+            try:
+                conn.send((request_id, op, args))
+            except (OSError, EOFError) as e:
+                self._pending.pop(request_id, None)
+                self._conn = None
+                raise ConnectionError(f"inference server unreachable: {e!r}") from e
+        return fut.result(self.timeout)
+
+    def info(self):
+        if self._info is None:
+            self._info = self.call("info")
+        return self._info
+
+
+class RemotePipeline:
+    """Callable with the pipeline signatures the app uses, served remotely.
+
+    Single inputs return a single result and lists return lists, like the
+    transformers pipelines; `batch_size` is accepted and ignored because the
+    server batches across clients.
+    """
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        if name == "image":
+            size = client.info()["image_input_size"]
+            self.image_processor = SimpleNamespace(size={"shortest_edge": size})
+
+    def __call__(self, inputs, candidate_labels=None, top_k=5, **kwargs):
+        single = not isinstance(inputs, (list, tuple))
+        batch = [inputs] if single else list(inputs)
+        if self.name == "sentiment":
+            return self.client.call("sentiment", texts=batch)
+        if self.name == "zero_shot":
+            out = self.client.call("zero_shot", texts=batch, labels=list(candidate_labels))
+        else:
+            out = self.client.call("image", images=batch, top_k=top_k)
+        return out[0] if single else out
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def client_from_env():
+    """The process-wide client for HAZARD_INFERENCE_SOCKET, or None if unset."""
+    address = os.getenv("HAZARD_INFERENCE_SOCKET")
+    if not address:
+        return None
+    with _clients_lock:
+        if address not in _clients:
+            _clients[address] = InferenceClient(
+                address, timeout=float(os.getenv("HAZARD_INFERENCE_TIMEOUT", "60"))
+            )
+        return _clients[address]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve the hazard models to local processes")
+    ap.add_argument("--socket", default=os.getenv("HAZARD_INFERENCE_SOCKET") or DEFAULT_SOCKET)
+    ap.add_argument("--batch-size", type=int, default=int(os.getenv("HAZARD_BATCH_SIZE", "32")))
+    ap.add_argument("--batch-wait-ms", type=float, default=float(os.getenv("HAZARD_BATCH_WAIT_MS", "5")))
+    ap.add_argument("--models", nargs="+", default=list(MODELS), choices=MODELS,
+                    help="models to load before accepting clients")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    # This process owns the models, so it must not itself be a client.
+    os.environ.pop("HAZARD_INFERENCE_SOCKET", None)
+    import app_multimodal_hazard as hazard
+
+    hazard.registry.warm_up(args.models, background=False)
+    for name, status in hazard.registry.status().items():
+        log.info("%s: loaded=%s load_seconds=%s error=%s", name, status["loaded"],
+                 status["load_seconds"], status["error"])
+    InferenceServer(hazard.registry, args.socket, args.batch_size, args.batch_wait_ms).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Continuous, incremental tweet ingestion.
+
+    python ingest.py --keywords tsunami flood cyclone --out scored.jsonl
+    python ingest.py --replay recorded.json --once      # offline, no API
+
+Stages are chained generators (fetch -> dedupe -> score -> sink), so each
+stage only pulls more work when the next one is ready for it: a slow scorer
+slows down fetching instead of buffering tweets in memory. The newest tweet
+id is checkpointed after every poll whose tweets have all been sunk, and the
+next poll asks only for tweets newer than that (`since_id`).
+"""
+import argparse
+import json
+import os
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from cache import content_key
+from tweets import TWEET_SEARCH_FIELDS, build_tweet_query, parse_tweets_response
+
+
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+        self.since_id = None
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.since_id = json.load(f).get("since_id")
+
+    def save(self, since_id):
+        self.since_id = since_id
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"since_id": since_id, "saved_at": time.time()}, f)
+        os.replace(tmp, self.path)
+
+
+def _rate_limit_reset(exc):
+    """Epoch seconds when a 429 error's rate-limit window resets, else None."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None) or getattr(response, "status", None)
+    if status != 429:
+        return None
+    headers = getattr(response, "headers", None) or {}
+    reset = headers.get("x-rate-limit-reset")
+    return float(reset) if reset else time.time() + 60
+
+
+class RateLimitScheduler:
+    """Decides when the next API call may go out.
+
+    Keeps a minimum interval between polls, waits out 429 windows using the
+    reset header instead of blocking inside the client, and backs off
+    exponentially on other errors.
+    """
+
+    def __init__(self, poll_interval=30.0, max_backoff=900.0, clock=time.time, sleep=time.sleep):
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.sleep = sleep
+        self.next_allowed = 0.0
+        self.failures = 0
+        self.rate_limited = 0
+
+    def wait(self):
+        delay = self.next_allowed - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+
+    def success(self):
+        self.failures = 0
+
+    def poll_done(self):
+        self.next_allowed = max(self.next_allowed, self.clock() + self.poll_interval)
+
+    def failure(self, exc):
+        reset = _rate_limit_reset(exc)
+        if reset is not None:
+            self.rate_limited += 1
+            self.next_allowed = reset + 1
+            return
+        self.failures += 1
+        backoff = min(self.max_backoff, 2 ** self.failures)
+        self.next_allowed = self.clock() + backoff
+
+
+def fetch(client, keywords, checkpoint, scheduler, page_size=100, max_pages=10, once=False):
+    """Yields new tweets, paging through every result newer than the checkpoint.
+
+    A None is yielded after each poll so downstream stages can flush partial
+    batches; the checkpoint advances when the consumer asks for what comes
+    after it, i.e. once everything before it has been processed.
+    """
+    query = build_tweet_query(keywords)
+    while True:
+        newest_id, next_token, pages = None, None, 0
+        while pages < max_pages:
+            scheduler.wait()
+            params = dict(query=query, max_results=page_size, **TWEET_SEARCH_FIELDS)
+            if checkpoint.since_id:
+                params["since_id"] = checkpoint.since_id
+            if next_token:
+                params["next_token"] = next_token
+            try:
+                resp = client.search_recent_tweets(**params)
+            except Exception as e:
+                scheduler.failure(e)
+                if once and _rate_limit_reset(e) is None:
+                    raise
+                continue
+            scheduler.success()
+            pages += 1
+            meta = resp.meta or {}
+            newest_id = newest_id or meta.get("newest_id")
+            yield from parse_tweets_response(resp)
+            next_token = meta.get("next_token")
+            if not next_token:
+                break
+        yield None
+        if newest_id:
+            checkpoint.save(newest_id)
+        scheduler.poll_done()
+        if once:
+            return
+
+
+def dedupe(tweets, max_seen=100_000):
+    """Drops tweets already seen by id or by normalized text (reposts, quotes)."""
+    from app_multimodal_hazard import clean_text
+
+    seen = OrderedDict()
+    for tw in tweets:
+        if tw is None:
+            yield None
+            continue
+        keys = [content_key("text", clean_text(tw["text"]))]
+        if tw.get("id") is not None:
+            keys.append(f"id:{tw['id']}")
+        if any(k in seen for k in keys):
+            continue
+        for k in keys:
+            seen[k] = True
+        while len(seen) > max_seen:
+            seen.popitem(last=False)
+        yield tw
+
+
+def score(tweets, batch_size=32):
+    """Scores tweets in batches; a None from upstream flushes a partial batch."""
+    from app_multimodal_hazard import score_reports
+
+    batch = []
+    for tw in tweets:
+        if tw is not None:
+            batch.append(tw)
+        if batch and (tw is None or len(batch) >= batch_size):
+            yield from score_reports(batch)
+            batch = []
+        if tw is None:
+            yield None
+    if batch:
+        yield from score_reports(batch)
+
+
+class JsonlSink:
+    def __init__(self, path):
+        self.f = open(path, "a", encoding="utf-8")
+        self.count = 0
+
+    def __call__(self, results):
+        for r in results:
+            if r is None:
+                self.f.flush()
+                continue
+            self.f.write(json.dumps(r) + "\n")
+            self.count += 1
+            yield r
+        self.f.flush()
+
+
+class FakeTwitterClient:
+    """Replays recorded search_recent_tweets responses in place of the API.
+
+    The recording is a JSON list of pages, newest tweets first, each shaped
+    like the v2 payload: {"data": [...], "includes": {"media": [...]},
+    "meta": {...}}; an {"error": 429} page simulates a rate limit. Tweets
+    older than `since_id` are filtered out and pages are chained through
+    `next_token`, like the real endpoint.
+    """
+
+    def __init__(self, pages):
+        if isinstance(pages, str):
+            with open(pages) as f:
+                pages = json.load(f)
+        self.pages = pages
+        self.calls = []
+
+    def search_recent_tweets(self, query, max_results=10, since_id=None, next_token=None, **kwargs):
+        self.calls.append({"query": query, "since_id": since_id, "next_token": next_token})
+        idx = int(next_token) if next_token else 0
+        if idx < len(self.pages) and "error" in self.pages[idx]:
+            page = self.pages.pop(idx)
+            raise FakeHTTPError(page["error"], page.get("headers", {}))
+        if idx >= len(self.pages):
+            return SimpleNamespace(data=None, includes={}, meta={"result_count": 0})
+        page = self.pages[idx]
+        data = [
+            SimpleNamespace(**t) for t in page.get("data", [])
+            if since_id is None or int(t["id"]) > int(since_id)
+        ][:max_results]
+        includes = {"media": [SimpleNamespace(**m) for m in page.get("includes", {}).get("media", [])]}
+        meta = {"result_count": len(data)}
+        if data:
+            meta["newest_id"] = str(max(int(t.id) for t in data))
+        # Pages after the first one that crosses since_id are all older.
+        if idx + 1 < len(self.pages) and len(data) == len(page.get("data", [])):
+            meta["next_token"] = str(idx + 1)
+        return SimpleNamespace(data=data or None, includes=includes, meta=meta)
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status_code, headers):
+        super().__init__(f"HTTP {status_code}")
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+def run(client, keywords, checkpoint_path, out_path, once=False, poll_interval=30.0, batch_size=32):
+    checkpoint = Checkpoint(checkpoint_path)
+    scheduler = RateLimitScheduler(poll_interval=poll_interval)
+    sink = JsonlSink(out_path)
+    stream = fetch(client, keywords, checkpoint, scheduler, once=once)
+    for _ in sink(score(dedupe(stream), batch_size=batch_size)):
+        pass
+    return sink.count
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Incremental tweet ingestion and scoring")
+    ap.add_argument("--keywords", nargs="+", default=["tsunami", "storm", "surge", "flood", "cyclone"])
+    ap.add_argument("--checkpoint", default="ingest_checkpoint.json")
+    ap.add_argument("--out", default="ingested.jsonl")
+    ap.add_argument("--replay", help="recorded responses for FakeTwitterClient")
+    ap.add_argument("--once", action="store_true", help="run a single poll and exit")
+    ap.add_argument("--poll-interval", type=float, default=30.0)
+    ap.add_argument("--batch-size", type=int, default=32)
+    args = ap.parse_args()
+
+    if args.replay:
+        client = FakeTwitterClient(args.replay)
+    else:
+        import tweepy
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        client = tweepy.Client(bearer_token=os.getenv("BEARER_TOKEN"), wait_on_rate_limit=False)
+    n = run(client, args.keywords, args.checkpoint, args.out, args.once,
+            args.poll_interval, args.batch_size)
+    print(f"wrote {n} scored tweets to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import threading
+
+import numpy as np
+
+
+class MeanPoolingEncoder:
+    """Sentence embeddings from a transformers encoder via masked mean pooling."""
+
+    def __init__(self, model_id, device=-1):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        self._torch = torch
+        self.device = torch.device("cpu" if device < 0 else f"cuda:{device}")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_id)
+        self.model = AutoModel.from_pretrained(model_id).to(self.device).eval()
+
+    def __call__(self, texts):
+        batch = self.tokenizer(
+            list(texts), padding=True, truncation=True, max_length=128, return_tensors="pt"
+        ).to(self.device)
+        with self._torch.inference_mode():
+            hidden = self.model(**batch).last_hidden_state
+        mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        return pooled.cpu().numpy()
+
+
+class OnnxMeanPoolingEncoder:
+    """MeanPoolingEncoder on an ONNX Runtime model (onnx_backend.load_encoder)."""
+
+    def __init__(self, model, tokenizer):
+        self.model = model
+        self.tokenizer = tokenizer
+
+    def __call__(self, texts):
+        batch = self.tokenizer(
+            list(texts), padding=True, truncation=True, max_length=128, return_tensors="np"
+        )
+        hidden = np.asarray(self.model(**batch).last_hidden_state)
+        mask = batch["attention_mask"][..., None].astype(hidden.dtype)
+        return (hidden * mask).sum(axis=1) / mask.sum(axis=1).clip(1e-9)
+
+
+class LabelEmbeddingClassifier:
+    """Zero-shot classification by similarity to cached label embeddings.
+
+    Label embeddings are computed once per label set, so each text costs a
+    single encoder pass instead of one NLI pass per candidate label. Output
+    matches the zero-shot pipeline: {"sequence", "labels", "scores"} with
+    labels sorted by descending score.
+    """
+
+    def __init__(self, encoder, labels, hypothesis_template="This text is about {}.",
+                 temperature=0.05):
+        self.encoder = encoder
+        self.hypothesis_template = hypothesis_template
+        self.temperature = temperature
+        self._lock = threading.Lock()
+        self._label_cache = {}
+        self.set_labels(labels)
+
+    def _embed(self, texts):
+        vecs = np.asarray(self.encoder(list(texts)), dtype=np.float32)
+        return vecs / np.linalg.norm(vecs, axis=1, keepdims=True).clip(1e-12)
+
+    def label_embeddings(self, labels):
+        key = tuple(labels)
+        with self._lock:
+            cached = self._label_cache.get(key)
+        if cached is None:
+            cached = self._embed([self.hypothesis_template.format(l) for l in labels])
+            with self._lock:
+                self._label_cache[key] = cached
+        return cached
+
+    def set_labels(self, labels):
+        """Swaps the default label set; embeddings are computed here, not per request."""
+        labels = list(labels)
+        self.label_embeddings(labels)
+        self.labels = labels
+
+    def __call__(self, texts, candidate_labels=None, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        labels = list(candidate_labels) if candidate_labels else self.labels
+        if not batch:
+            return []
+        sims = self._embed(batch) @ self.label_embeddings(labels).T
+        logits = sims / self.temperature
+        probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+        results = []
+        for text, row in zip(batch, probs):
+            order = np.argsort(-row)
+            results.append({
+                "sequence": text,
+                "labels": [labels[i] for i in order],
+                "scores": [float(row[i]) for i in order],
+            })
+        return results[0] if single else results
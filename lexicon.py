@@ -0,0 +1,76 @@
+import re
+from collections import Counter
+from itertools import repeat
+
+_URL_RE = re.compile(r"http\S+")
+
+# Byte translation table equivalent to clean_text(): ASCII letters are
+# lowercased, digits kept, everything else becomes a separator.
+_CLEAN_TABLE = bytes(
+    c + 32 if 65 <= c <= 90
+    else c if 48 <= c <= 57 or 97 <= c <= 122
+    else 32
+    for c in range(256)
+)
+
+
+def tokenize(text):
+    """Tokens of clean_text(text) as ASCII bytes, in a single C-level pass.
+
+    Non-ASCII characters are replaced before translation, which is what the
+    `[^A-Za-z0-9\\s]` pass in clean_text does to them.
+    """
+    if "http" in text:
+        text = _URL_RE.sub(" ", text)
+    return text.encode("ascii", "replace").translate(_CLEAN_TABLE).split()
+
+
+def urgency(text):
+    n = text.count("!")
+    for w in filter(str.isupper, text.split()):
+        if len(w) > 1:
+            n += 1
+    return n
+
+
+class HazardLexicon:
+    """Weighted keyword scorer compiled once from a weights table.
+
+    Gives exactly the score of matching every keyword with `\\b...\\b` over
+    clean_text(text) plus the urgency bonus: clean_text leaves only
+    lowercase alphanumeric tokens, so whole-word matching reduces to one
+    hash lookup per token.
+    """
+
+    def __init__(self, weights):
+        self.weights = dict(weights)
+        for k in self.weights:
+            if not re.fullmatch(r"[A-Za-z0-9]+", k):
+                raise ValueError(f"lexicon keywords must be single alphanumeric words: {k!r}")
+        self._table = {k.lower().encode("ascii"): v for k, v in self.weights.items()}
+
+    def keyword_counts(self, text):
+        table = self._table
+        return Counter(t.decode() for t in tokenize(text) if t in table)
+
+    def dominant(self, text, min_weight=0):
+        """The highest-weighted keyword in `text` weighing at least `min_weight`."""
+        counts = self.keyword_counts(text)
+        found = [k for k in counts if self.weights[k] >= min_weight]
+        if not found:
+            return None
+        return max(found, key=lambda k: (self.weights[k], counts[k]))
+
+    def keyword_score(self, text):
+        return sum(map(self._table.get, tokenize(text), repeat(0)))
+
+    def score(self, text):
+        return float(self.keyword_score(text) + min(urgency(text) * 1.5, 4))
+
+    def score_many(self, texts):
+        table_get = self._table.get
+        out = []
+        for text in texts:
+            kw = sum(map(table_get, tokenize(text), repeat(0)))
+            out.append(float(kw + min(urgency(text) * 1.5, 4)))
+        return out
@@ -1,65 +1,653 @@
-from fastapi import FastAPI, UploadFile, File, Form
-from pydantic import BaseModel
-from app_multimodal_hazard import (
-    calculate_text_hazard_score,
-    calculate_image_hazard_score,
-    fuse_scores,
-    risk_from_score,
-    sentiment_pipeline,
-    zero_shot_pipeline,
-    download_image_from_url,
-)
-from PIL import Image
-import io
-
-app = FastAPI(title="Multimodal Hazard Analyzer API")
-
-
-class TextRequest(BaseModel):
-    text: str
-
-class FuseRequest(BaseModel):
-    text_score: float
-    image_score: float
-
-
-
-@app.post("/analyze-text")
-def analyze_text(req: TextRequest):
-    """Analyze hazard from text only"""
-    t_score = calculate_text_hazard_score(req.text)
-    sentiment = sentiment_pipeline(req.text)[0]
-    zero = zero_shot_pipeline(req.text, candidate_labels=["hazard alert", "safe", "neutral"])
-    return {
-        "text": req.text,
-        "text_score": t_score,
-        "sentiment": sentiment,
-        "zero_shot": zero,
-        "risk": risk_from_score(t_score),
-    }
-
-@app.post("/analyze-image")
-async def analyze_image(file: UploadFile = File(...)):
-    """Analyze hazard from an uploaded image"""
-    contents = await file.read()
-    image = Image.open(io.BytesIO(contents)).convert("RGB")
-    score, labels = calculate_image_hazard_score(image)
-    return {
-        "image_score": score,
-        "matched_labels": labels,
-        "risk": risk_from_score(score),
-    }
-
-@app.post("/analyze-fuse")
-def analyze_fuse(req: FuseRequest):
-    """Fuse text + image hazard scores"""
-    fused, norms = fuse_scores(req.text_score, req.image_score)
-    return {
-        "fused_score": fused,
-        "norms": norms,
-        "risk": risk_from_score(fused),
-    }
-
-@app.get("/")
-def root():
-    return {"message": "🌊 Multimodal Hazard Analyzer API is running!"}
+import os
+import json
+import time
+import asyncio
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Literal, Optional
+from functools import partial
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from app_multimodal_hazard import (
+    registry,
+    analyze_sentiment_batch,
+    classify_hazard_batch,
+    calculate_text_hazard_score,
+    calculate_image_hazard_score_bytes,
+    calculate_image_hazard_scores_bytes,
+    calculate_image_hazard_scores_or_errors,
+    score_images_bytes,
+    IMAGE_BATCH_SIZE,
+    fuse_scores,
+    IMAGE_CONFIDENT_SCORE,
+    CASCADE,
+    risk_from_score,
+    report_risk,
+    download_image_bytes,
+    result_cache,
+    image_index,
+    HAZARD_WEIGHTS,
+    STOPWORDS,
+    dominant_hazard,
+    is_high_severity,
+)
+from admission import Decision, admission_from_env
+from batching import MicroBatcher, imap_unordered
+from cascade import FULL
+from downloader import check_url
+from executor import QueueFullError, executor_from_env
+from imaging import ImageRejected, ImageUnreadable
+from trending import TrendingEngine
+from store import store_from_env
+import metrics
+
+app = FastAPI(title="Multimodal Hazard Analyzer API")
+
+# The React dashboard reads /reports/stats from the browser.
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=os.getenv("HAZARD_CORS_ORIGINS", "http://localhost:5173").split(","),
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Models this deployment needs before it reports ready, e.g. "sentiment,zero_shot"
+# for a text-only service. Set HAZARD_WARMUP=0 to load purely on first request.
+REQUIRED_MODELS = [
+    m.strip()
+    for m in os.getenv("HAZARD_REQUIRED_MODELS", "sentiment,zero_shot,image").split(",")
+    if m.strip()
+]
+WARMUP = os.getenv("HAZARD_WARMUP", "1") != "0"
+
+
+# Concurrent /analyze-text calls are coalesced into batched pipeline calls.
+# Raising the wait trades a few ms of latency for larger, cheaper batches.
+BATCH_SIZE = int(os.getenv("HAZARD_BATCH_SIZE", "16"))
+BATCH_WAIT_MS = float(os.getenv("HAZARD_BATCH_WAIT_MS", "5"))
+
+sentiment_batcher = MicroBatcher(
+    analyze_sentiment_batch, BATCH_SIZE, BATCH_WAIT_MS, name="sentiment-batcher"
+)
+zero_shot_batcher = MicroBatcher(
+    classify_hazard_batch, BATCH_SIZE, BATCH_WAIT_MS, name="zero-shot-batcher"
+)
+
+# Items of one /analyze-batch request scored concurrently; their text calls
+# land in the batchers above together.
+BATCH_WORKERS = int(os.getenv("HAZARD_BATCH_WORKERS", str(BATCH_SIZE * 2)))
+batch_executor = ThreadPoolExecutor(BATCH_WORKERS, thread_name_prefix="analyze-batch")
+
+# Image decoding and inference run here instead of on the event loop.
+# HAZARD_IMAGE_EXECUTOR_KIND=process moves them to worker processes.
+image_executor = executor_from_env("HAZARD_IMAGE_EXECUTOR")
+# A request's images are scored as one task with batched inference.
+MAX_IMAGES_PER_REQUEST = int(os.getenv("HAZARD_MAX_IMAGES_PER_REQUEST", "16"))
+
+# Image URLs in /analyze-batch come from clients: only http(s) on public
+# addresses is fetched, redirects included. HAZARD_MEDIA_HOSTS (comma-separated
+# domains) restricts them further to those hosts and their subdomains.
+MEDIA_HOSTS = [h.strip().lower() for h in os.getenv("HAZARD_MEDIA_HOSTS", "").split(",") if h.strip()]
+check_media_url = partial(check_url, allowed_hosts=MEDIA_HOSTS)
+
+# /analyze-batch items hand their downloaded images to this batcher, which
+# scores them IMAGE_BATCH_SIZE at a time as one image_executor task, so they
+# share its queue bound. One task runs at a time; images arriving meanwhile
+# form the next, larger batch.
+def _score_image_batch(datas):
+    return image_executor.submit(calculate_image_hazard_scores_or_errors, datas).result()
+
+image_batcher = MicroBatcher(
+    _score_image_batch, IMAGE_BATCH_SIZE, BATCH_WAIT_MS, name="batch-image-batcher"
+)
+
+# Under overload (in-flight requests, text-model backlog or latency past their
+# limits) requests fall back to lexicon-only scoring and skip images; texts with
+# high-severity keywords keep the models longer. HAZARD_ADMISSION=0 disables.
+ADMISSION = admission_from_env(
+    queue_depth=lambda: max(sentiment_batcher.stats()["pending"], zero_shot_batcher.stats()["pending"]),
+    image_queue_depth=image_executor.queue_depth,
+    max_image_queue=image_executor.max_queue,
+)
+_ADMIT_ALL = Decision(True, True, None)
+
+# Rolling keyword / hazard counts over every text the API scores.
+trending = TrendingEngine(STOPWORDS, HAZARD_WEIGHTS)
+
+# Every scored result is persisted here (HAZARD_STORE_PATH="" disables it).
+report_store = store_from_env()
+
+
+def _persist(source, result, text=None, location=None, external_id=None, lat=None, lon=None):
+    if report_store is not None:
+        report_store.add(
+            source, result, text=text, location=location, external_id=external_id,
+            hazard_type=dominant_hazard(text) if text else None, lat=lat, lon=lon,
+        )
+
+
+# Latency histograms, batch sizes and queue depths for Prometheus at /metrics.
+# Scoring endpoints also take ?debug=true to return their own stage timings.
+HTTP_SECONDS = metrics.REGISTRY.histogram(
+    "hazard_http_request_seconds", "Request latency by route until response headers"
+)
+metrics.REGISTRY.gauge(
+    "hazard_batcher_pending", "Items waiting in a text micro-batcher",
+    lambda: {b.name: b.stats()["pending"] for b in (sentiment_batcher, zero_shot_batcher)},
+    label="batcher",
+)
+metrics.REGISTRY.gauge(
+    "hazard_executor_queue_depth", "Image tasks waiting for a worker", image_executor.queue_depth
+)
+metrics.REGISTRY.gauge(
+    "hazard_executor_rejected", "Image tasks rejected with 503", lambda: image_executor.rejected
+)
+metrics.REGISTRY.gauge(
+    "hazard_model_load_seconds", "Time taken to load each model",
+    lambda: {n: s["load_seconds"] for n, s in registry.status().items()}, label="model",
+)
+metrics.REGISTRY.gauge(
+    "hazard_model_loaded", "1 if the model is loaded",
+    lambda: {n: int(s["loaded"]) for n, s in registry.status().items()}, label="model",
+)
+metrics.REGISTRY.gauge(
+    "hazard_cache_lookups", "Result cache lookups by outcome",
+    lambda: {k: result_cache.stats()[k] for k in ("hits", "disk_hits", "misses")}, label="result",
+)
+if image_index is not None:
+    metrics.REGISTRY.gauge(
+        "hazard_image_dedup_lookups", "Perceptual-hash lookups by outcome",
+        lambda: (lambda s: {"hit": s["hits"], "miss": s["lookups"] - s["hits"]})(image_index.stats()),
+        label="result",
+    )
+if ADMISSION is not None:
+    metrics.REGISTRY.gauge(
+        "hazard_admission_pressure", "Load relative to the admission limits (>= 1 degrades)",
+        lambda: ADMISSION.pressure()[1], label="signal",
+    )
+    metrics.REGISTRY.gauge(
+        "hazard_admission_decisions", "Requests by admission outcome",
+        lambda: dict(ADMISSION.decisions), label="outcome",
+    )
+if report_store is not None:
+    metrics.REGISTRY.gauge(
+        "hazard_store_pending", "Reports queued for the store writer", report_store.pending
+    )
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    scoring = ADMISSION is not None and request.url.path.startswith("/analyze")
+    with ADMISSION.slot() if scoring else nullcontext():
+        response = await call_next(request)
+    route = request.scope.get("route")
+    HTTP_SECONDS.observe(
+        time.perf_counter() - start,
+        route=route.path if route is not None else "unmatched",
+        method=request.method,
+        status=response.status_code,
+    )
+    return response
+
+
+def _text_models(text):
+    """(sentiment, zero-shot) for one text through the batchers.
+
+    Inside a trace the wall time from submit to each result, batching wait
+    included, is recorded as that model's stage.
+    """
+    start = time.perf_counter()
+    sentiment_fut = sentiment_batcher.submit(text)
+    zero_fut = zero_shot_batcher.submit(text)
+    sentiment = sentiment_fut.result()
+    timings = metrics.current_trace()
+    if timings is not None:
+        timings["sentiment"] = (time.perf_counter() - start) * 1000.0
+    zero = zero_fut.result()
+    elapsed = time.perf_counter() - start
+    if timings is not None:
+        timings["zero_shot"] = elapsed * 1000.0
+    if ADMISSION is not None:
+        ADMISSION.observe_latency(elapsed)
+    return sentiment, zero
+
+
+def _tier(text, t_score):
+    """Cascade tier for a text (always "full" with HAZARD_CASCADE off)."""
+    return CASCADE.tier(text, t_score) if CASCADE is not None and text else FULL
+
+def _runs_images(tier):
+    return CASCADE is None or CASCADE.runs_images(tier)
+
+def _admit(text):
+    """Admission decision for one request (everything runs with HAZARD_ADMISSION=0)."""
+    if ADMISSION is None:
+        return _ADMIT_ALL
+    return ADMISSION.decide(priority=bool(text) and is_high_severity(text))
+
+def _degraded_reason(decision, wants_text, wants_images):
+    """Why stages that would have run were skipped, or None."""
+    if (wants_text and not decision.text_models) or (wants_images and not decision.images):
+        return decision.reason
+    return None
+
+
+@app.on_event("startup")
+def warm_up_models():
+    if WARMUP:
+        registry.warm_up(REQUIRED_MODELS)
+
+
+class TextRequest(BaseModel):
+    text: str
+    location: Optional[str] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+
+class FuseRequest(BaseModel):
+    text_score: float
+    image_score: float
+    image_confident: Optional[bool] = None
+
+class BatchItem(BaseModel):
+    id: Optional[str] = None
+    text: str = ""
+    image_url: Optional[str] = None
+    location: Optional[str] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+
+class StatusUpdate(BaseModel):
+    status: Literal["active", "resolved"]
+
+
+
+@app.post("/analyze-text")
+def analyze_text(req: TextRequest, debug: bool = False):
+    """Analyze hazard from text only"""
+    with metrics.trace(debug) as timings:
+        with metrics.stage("keywords"):
+            t_score = calculate_text_hazard_score(req.text)
+        tier = _tier(req.text, t_score)
+        admit = _admit(req.text)
+        degraded = _degraded_reason(admit, tier == FULL, False)
+        sentiment = zero = None
+        if tier == FULL and admit.text_models:
+            sentiment, zero = _text_models(req.text)
+    # The text-only fused score puts trending and the map on the same 0-10
+    # scale as /analyze and /analyze-batch.
+    fused, _ = fuse_scores(t_score, 0.0)
+    risk = report_risk(t_score, fused, False)
+    trending.add(req.text, score=fused, high_risk=risk == "High")
+    result = {
+        "text": req.text,
+        "text_score": t_score,
+        "fused_score": fused,
+        "sentiment": sentiment,
+        "zero_shot": zero,
+        "risk": risk,
+        "tier": tier,
+        "degraded": degraded is not None,
+        "degraded_reason": degraded,
+    }
+    _persist("analyze-text", result, text=req.text, location=req.location, lat=req.lat, lon=req.lon)
+    if timings is not None:
+        result["timings_ms"] = timings
+    return result
+
+@app.post("/analyze-image")
+async def analyze_image(file: UploadFile = File(...), debug: bool = False):
+    """Analyze hazard from an uploaded image"""
+    contents = await file.read()
+    admit = _admit(None)
+    if not admit.images:
+        raise HTTPException(
+            status_code=503, detail=f"Image analysis is shed under load ({admit.reason}), retry later",
+            headers={"Retry-After": "1"},
+        )
+    with metrics.trace(debug) as timings:
+        try:
+            score, labels = await image_executor.run(
+                partial(calculate_image_hazard_score_bytes, strict=True), contents
+            )
+        except QueueFullError:
+            raise HTTPException(status_code=503, detail="Image analysis queue is full, retry later")
+        except (ImageRejected, ImageUnreadable) as e:
+            raise _image_error(e)
+    result = {
+        "image_score": score,
+        "matched_labels": labels,
+        "risk": risk_from_score(score),
+    }
+    _persist("analyze-image", result)
+    if timings is not None:
+        result["timings_ms"] = timings
+    return result
+
+def _image_error(e):
+    """413 for images refused by size, 422 for bytes that are not a decodable image."""
+    return HTTPException(status_code=413 if isinstance(e, ImageRejected) else 422, detail=str(e))
+
+def _check_image_count(files):
+    if len(files) > MAX_IMAGES_PER_REQUEST:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_IMAGES_PER_REQUEST} images per request"
+        )
+
+@app.post("/analyze-images")
+async def analyze_images(files: List[UploadFile] = File(...), debug: bool = False):
+    """Score several images (an album or multi-photo report) in one batched model call"""
+    _check_image_count(files)
+    contents = [await f.read() for f in files]
+    admit = _admit(None)
+    if not admit.images:
+        raise HTTPException(
+            status_code=503, detail=f"Image analysis is shed under load ({admit.reason}), retry later",
+            headers={"Retry-After": "1"},
+        )
+    with metrics.trace(debug) as timings:
+        try:
+            result = await image_executor.run(partial(score_images_bytes, strict=True), contents)
+        except QueueFullError:
+            raise HTTPException(status_code=503, detail="Image analysis queue is full, retry later")
+        except (ImageRejected, ImageUnreadable) as e:
+            raise _image_error(e)
+    for f, image in zip(files, result["images"]):
+        image["filename"] = f.filename
+    result["risk"] = risk_from_score(result["image_score"])
+    _persist("analyze-images", result)
+    if timings is not None:
+        result["timings_ms"] = timings
+    return result
+
+@app.post("/analyze-fuse")
+def analyze_fuse(req: FuseRequest):
+    """Fuse text + image hazard scores"""
+    confident = req.image_confident
+    if confident is None:
+        confident = req.image_score >= IMAGE_CONFIDENT_SCORE
+    fused, norms = fuse_scores(req.text_score, req.image_score, image_confident=confident)
+    return {
+        "fused_score": fused,
+        "norms": norms,
+        "risk": risk_from_score(fused),
+    }
+
+def _text_branch(text):
+    start = time.perf_counter()
+    sentiment, zero = _text_models(text)
+    metrics.record_stage("text_branch", time.perf_counter() - start)
+    return {"sentiment": sentiment, "zero_shot": zero}
+
+async def _image_branch(uploads):
+    start = time.perf_counter()
+    contents = [await f.read() for f in uploads]
+    scored = await image_executor.run(partial(calculate_image_hazard_scores_bytes, strict=True), contents)
+    images = [
+        {"filename": f.filename, "image_score": score, "matched_labels": labels}
+        for f, (score, labels) in zip(uploads, scored)
+    ]
+    metrics.record_stage("image_branch", time.perf_counter() - start)
+    return images
+
+@app.post("/analyze")
+async def analyze(
+    text: str = Form(""),
+    files: List[UploadFile] = File(default=[]),
+    location: Optional[str] = Form(None),
+    lat: Optional[float] = Form(None),
+    lon: Optional[float] = Form(None),
+    debug: bool = False,
+):
+    """Score a report's text and images in one call; both branches run concurrently"""
+    if not text and not files:
+        raise HTTPException(status_code=422, detail="Provide text, files or both")
+    _check_image_count(files)
+    with metrics.trace(debug) as timings:
+        with metrics.stage("keywords"):
+            t_score = calculate_text_hazard_score(text) if text else 0.0
+        tier = _tier(text, t_score)
+        wants_text = bool(text) and tier == FULL
+        wants_images = bool(files) and _runs_images(tier)
+        admit = _admit(text)
+        degraded = _degraded_reason(admit, wants_text, wants_images)
+        run_text = wants_text and admit.text_models
+        run_images = wants_images and admit.images
+        try:
+            models, images = await asyncio.gather(
+                run_in_threadpool(_text_branch, text) if run_text else asyncio.sleep(0, {}),
+                _image_branch(files) if run_images else asyncio.sleep(0, []),
+            )
+        except QueueFullError:
+            raise HTTPException(status_code=503, detail="Image analysis queue is full, retry later")
+        except (ImageRejected, ImageUnreadable) as e:
+            raise _image_error(e)
+    text_result = dict({"text_score": t_score, "sentiment": None, "zero_shot": None}, **models) if text else None
+    best = max(images, key=lambda i: i["image_score"], default=None)
+    image_score = best["image_score"] if best else 0.0
+    confident = image_score >= IMAGE_CONFIDENT_SCORE
+    fused, norms = fuse_scores(t_score, image_score, image_confident=confident)
+    risk = report_risk(t_score, fused, bool(images))
+    if text:
+        trending.add(text, score=fused, high_risk=risk == "High")
+    result = {
+        "text": text_result,
+        "images": images,
+        "text_score": t_score,
+        "image_score": image_score,
+        "image_confident": confident,
+        "fused_score": fused,
+        "norms": norms,
+        "risk": risk,
+        "tier": tier,
+        "degraded": degraded is not None,
+        "degraded_reason": degraded,
+    }
+    _persist("analyze", result, text=text or None, location=location, lat=lat, lon=lon)
+    if timings is not None:
+        result["timings_ms"] = timings
+    return result
+
+@app.get("/")
+def root():
+    return {"message": "🌊 Multimodal Hazard Analyzer API is running!"}
+
+def _score_batch_item(item: BatchItem, debug=False):
+    with metrics.trace(debug) as timings:
+        with metrics.stage("keywords"):
+            t_score = calculate_text_hazard_score(item.text) if item.text else 0.0
+        tier = _tier(item.text, t_score)
+        wants_text = bool(item.text) and tier == FULL
+        wants_image = bool(item.image_url) and _runs_images(tier)
+        admit = _admit(item.text)
+        degraded = _degraded_reason(admit, wants_text, wants_image)
+        run_text = wants_text and admit.text_models
+        sentiment = zero = None
+        if run_text:
+            sentiment_fut = sentiment_batcher.submit(item.text)
+            zero_fut = zero_shot_batcher.submit(item.text)
+        image_fut = None
+        if wants_image and admit.images:
+            check_media_url(item.image_url)
+            data = download_image_bytes(item.image_url, check=check_media_url)
+            if data is not None:
+                image_fut = image_batcher.submit(data)
+        if run_text:
+            with metrics.stage("text_models_wait"):
+                sentiment, zero = sentiment_fut.result(), zero_fut.result()
+        image_score, labels = 0.0, []
+        if image_fut is not None:
+            with metrics.stage("image_wait"):
+                scored = image_fut.result()
+            if isinstance(scored, Exception):
+                raise scored
+            image_score, labels = scored
+    fused, norms = fuse_scores(t_score, image_score, image_confident=image_score >= IMAGE_CONFIDENT_SCORE)
+    risk = report_risk(t_score, fused, image_fut is not None)
+    if item.text:
+        trending.add(item.text, score=fused, high_risk=risk == "High")
+    result = {
+        "id": item.id,
+        "text_score": t_score,
+        "sentiment": sentiment,
+        "zero_shot": zero,
+        "image_score": image_score,
+        "matched_labels": labels,
+        "fused_score": fused,
+        "norms": norms,
+        "risk": risk,
+        "tier": tier,
+        "degraded": degraded is not None,
+        "degraded_reason": degraded,
+    }
+    _persist(
+        "analyze-batch", result, text=item.text or None, location=item.location,
+        external_id=item.id, lat=item.lat, lon=item.lon,
+    )
+    if timings is not None:
+        result["timings_ms"] = timings
+    return result
+
+def _stream_batch(items, debug=False):
+    score = partial(_score_batch_item, debug=debug)
+    for idx, result, err in imap_unordered(score, items, batch_executor):
+        if err is not None:
+            result = {"id": items[idx].id, "error": repr(err)}
+        result["index"] = idx
+        yield json.dumps(result) + "\n"
+
+@app.post("/analyze-batch")
+def analyze_batch(req: BatchRequest, debug: bool = False):
+    """Score many items, streaming NDJSON results in completion order"""
+    return StreamingResponse(_stream_batch(req.items, debug), media_type="application/x-ndjson")
+
+def _require_store():
+    if report_store is None:
+        raise HTTPException(status_code=404, detail="Report store is disabled")
+    return report_store
+
+@app.get("/reports")
+def list_reports(
+    risk: Optional[str] = None,
+    hazard_type: Optional[str] = None,
+    location: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Stored reports, newest first; pass next_cursor back to page"""
+    items, next_cursor = _require_store().query(
+        risk=risk, hazard_type=hazard_type, location=location, status=status,
+        since=since, until=until, cursor=cursor, limit=limit,
+    )
+    return {"items": items, "next_cursor": next_cursor}
+
+@app.get("/reports/stats")
+def report_stats():
+    """Dashboard counters, read from materialized totals"""
+    return _require_store().stats()
+
+@app.post("/reports/{report_id}/status")
+def update_report_status(report_id: int, req: StatusUpdate):
+    """Mark a report active/resolved, keeping the counters in step"""
+    if not _require_store().set_status(report_id, req.status):
+        raise HTTPException(status_code=404, detail="Report not found")
+    return {"id": report_id, "status": req.status}
+
+@app.get("/map/bbox")
+def map_bbox(
+    min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+    limit: int = Query(1000, ge=1, le=10000),
+):
+    """Reports inside a viewport (R-tree lookup)"""
+    return {"items": _require_store().in_bbox(min_lat, min_lon, max_lat, max_lon, limit)}
+
+@app.get("/map/radius")
+def map_radius(
+    lat: float, lon: float, radius_km: float = Query(..., gt=0, le=2000),
+    limit: int = Query(1000, ge=1, le=10000),
+):
+    """Reports within radius_km of a point, nearest first"""
+    return {"items": _require_store().within_radius(lat, lon, radius_km, limit)}
+
+@app.get("/map/tiles")
+def map_tiles(z: int, min_lat: float, min_lon: float, max_lat: float, max_lon: float):
+    """Clustered cells (count, max fused score, centroid) at zoom z for a viewport"""
+    return {"cells": _require_store().tiles(z, min_lat, min_lon, max_lat, max_lon)}
+
+@app.get("/trending")
+def trending_keywords(window: str = Query("1h"), n: int = Query(15, ge=1, le=200)):
+    """Trending keywords, hazard counts and rolling hazard index for a window"""
+    if window not in trending.windows:
+        raise HTTPException(status_code=400, detail=f"window must be one of {list(trending.windows)}")
+    return trending.snapshot(window, n)
+
+@app.get("/batching")
+def batching_stats():
+    """Batch sizes and queue lengths of the text and /analyze-batch image batchers"""
+    return {
+        "sentiment": sentiment_batcher.stats(),
+        "zero_shot": zero_shot_batcher.stats(),
+        "image": image_batcher.stats(),
+    }
+
+@app.get("/executor")
+def executor_stats():
+    """Queue depth and wait times of the image executor"""
+    return image_executor.stats()
+
+@app.get("/cache")
+def cache_stats():
+    """Hit/miss counters of the model result cache"""
+    return result_cache.stats()
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Stage latencies, batch sizes, queue depths and model load times (Prometheus text format)"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cascade")
+def cascade_stats():
+    """How many texts each cascade tier handled (HAZARD_CASCADE=1)"""
+    if CASCADE is None:
+        return {"enabled": False}
+    return dict(CASCADE.stats(), enabled=True)
+
+@app.get("/admission")
+def admission_stats():
+    """Current load against the admission limits and how requests were served"""
+    if ADMISSION is None:
+        return {"enabled": False}
+    return dict(ADMISSION.stats(), enabled=True)
+
+@app.get("/image-dedup")
+def image_dedup_stats():
+    """Perceptual-hash index size, hit rate and hit distances (to tune HAZARD_PHASH_DISTANCE)"""
+    if image_index is None:
+        raise HTTPException(status_code=404, detail="Image dedup is disabled")
+    return image_index.stats()
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving requests"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: every required model is loaded"""
+    ready = all(registry.is_loaded(m) for m in REQUIRED_MODELS)
+    body = {
+        "status": "ready" if ready else "loading",
+        "required": REQUIRED_MODELS,
+        "models": registry.status(),
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
@@ -0,0 +1,163 @@
+import io
+import os
+from functools import lru_cache
+from itertools import islice
+
+from PIL import Image
+
+from imaging import DEFAULT_INPUT_SIZE, MAX_IMAGE_PIXELS, ImageRejected, ImageUnreadable
+import metrics
+from phash import dhash, hamming
+
+# What a media body is, sniffed from its leading bytes.
+IMAGE = "image"
+ANIMATED = "animated"
+VIDEO = "video"
+
+# ISO base media major brands of video files; other brands in an ftyp box
+# (avif, heic, mif1, ...) are still images that Pillow may decode.
+VIDEO_BRANDS = {
+    b"isom", b"iso2", b"iso3", b"iso4", b"iso5", b"iso6", b"mp41", b"mp42", b"mp71",
+    b"avc1", b"M4V ", b"M4VH", b"M4VP", b"qt  ", b"dash", b"MSNV", b"f4v ",
+}
+
+# Decoding bound per clip: frames looked at, whatever is kept.
+MAX_DECODE_FRAMES = int(os.getenv("HAZARD_MEDIA_MAX_DECODE_FRAMES", "300"))
+
+# Frames classified per clip: a few distinct ones in small batches, stopping
+# early once one of them is clearly a hazard.
+MEDIA_MAX_FRAMES = int(os.getenv("HAZARD_MEDIA_MAX_FRAMES", "8"))
+MEDIA_FRAME_BATCH = int(os.getenv("HAZARD_MEDIA_FRAME_BATCH", "4"))
+MEDIA_STOP_SCORE = float(os.getenv("HAZARD_MEDIA_STOP_SCORE", "4.0"))
+MEDIA_FRAMES = metrics.REGISTRY.histogram(
+    "hazard_media_frames", "Frames classified per animation or video", metrics.SIZE_BUCKETS
+)
+
+
+def media_kind(data):
+    """IMAGE, ANIMATED (GIF, WebP or PNG with several frames) or VIDEO (MP4/MOV, WebM)."""
+    if data[:4] == b"\x1a\x45\xdf\xa3":
+        return VIDEO
+    if data[4:8] == b"ftyp":
+        brand = data[8:12]
+        return VIDEO if brand in VIDEO_BRANDS or brand[:3] in (b"3gp", b"3g2") else IMAGE
+    if data[:4] == b"GIF8" or data[:8] == b"\x89PNG\r\n\x1a\n" or (data[:4] == b"RIFF" and data[8:12] == b"WEBP"):
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                return ANIMATED if getattr(image, "is_animated", False) else IMAGE
+        except Exception:
+            return IMAGE
+    return IMAGE
+
+
+@lru_cache(maxsize=None)
+def video_supported():
+    """Videos are decoded with PyAV (pip install av), imported on first use."""
+    try:
+        import av  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _small(image, size):
+    image = image.convert("RGB")
+    w, h = image.size
+    scale = size / min(w, h)
+    if scale < 1:
+        image = image.resize((max(size, round(w * scale)), max(size, round(h * scale))), Image.BILINEAR)
+    return image
+
+
+def _animated_frames(data):
+    image = Image.open(io.BytesIO(data))
+    w, h = image.size
+    if w * h > MAX_IMAGE_PIXELS:
+        raise ImageRejected(f"{w}x{h} animation exceeds {MAX_IMAGE_PIXELS} pixels per frame")
+    t = 0.0
+    for i in range(MAX_DECODE_FRAMES):
+        try:
+            image.seek(i)
+        except EOFError:
+            return
+        yield t, image
+        t += image.info.get("duration", 100) / 1000.0
+
+
+def _video_frames(data):
+    if not video_supported():
+        raise ImageUnreadable("video decoding needs PyAV: pip install av")
+    import av
+
+    with av.open(io.BytesIO(data)) as container:
+        stream = container.streams.video[0]
+        if stream.width * stream.height > MAX_IMAGE_PIXELS:
+            raise ImageRejected(f"{stream.width}x{stream.height} video exceeds {MAX_IMAGE_PIXELS} pixels")
+        # Keyframes only: no inter-frame decoding, and encoders place them at cuts.
+        stream.codec_context.skip_frame = "NONKEY"
+        for i, frame in enumerate(container.decode(stream)):
+            if i >= MAX_DECODE_FRAMES:
+                return
+            yield float(frame.time or 0.0), frame.to_image()
+
+
+def sample_frames(data, kind=None, size=DEFAULT_INPUT_SIZE, min_change=12, min_interval_s=0.5):
+    """Yields (seconds, frame) for the distinct scenes of an animation or video.
+
+    Frames come as small RGB images (shortest side `size`). The first frame
+    is always kept; later ones only when at least `min_interval_s` after the
+    last kept frame and at least `min_change` dHash bits away from it, so
+    static stretches cost one classification. Decoding is lazy: a caller
+    that stops iterating stops decoding.
+    """
+    kind = kind or media_kind(data)
+    if kind == VIDEO:
+        frames = _video_frames(data)
+    elif kind == ANIMATED:
+        frames = _animated_frames(data)
+    else:
+        frames = iter([(0.0, Image.open(io.BytesIO(data)))])
+    last_t = last_hash = None
+    for t, frame in frames:
+        if last_t is not None and t - last_t < min_interval_s:
+            continue
+        key = dhash(frame)
+        if last_hash is not None and hamming(key, last_hash) < min_change:
+            continue
+        last_t, last_hash = t, key
+        # Animated images reuse one object across frames: copy out before moving on.
+        yield t, _small(frame, size)
+
+
+def classify_media(data, classify, score, kind=None, size=DEFAULT_INPUT_SIZE, strict=False):
+    """Labels of the highest-scoring sampled frame of an animation or video, or None.
+
+    `classify(frames)` returns labels per frame (None where one failed) and
+    `score(labels)` a (score, matched labels) pair. With `strict`, a clip of
+    which no frame could be decoded raises ImageRejected/ImageUnreadable.
+    """
+    frames = sample_frames(data, kind, size=size)
+    best_score, best = 0.0, None
+    scored = 0
+    try:
+        while scored < MEDIA_MAX_FRAMES and best_score < MEDIA_STOP_SCORE:
+            batch = [f for _, f in islice(frames, min(MEDIA_FRAME_BATCH, MEDIA_MAX_FRAMES - scored))]
+            if not batch:
+                break
+            scored += len(batch)
+            for labels in classify(batch):
+                if labels is None:
+                    continue
+                s = score(labels)[0]
+                if best is None or s > best_score:
+                    best_score, best = s, labels
+    except Exception as e:
+        # Corrupt tail or no video decoder: keep whatever was scored.
+        if strict and not scored:
+            if isinstance(e, (ImageRejected, ImageUnreadable)):
+                raise
+            raise ImageUnreadable(str(e)) from e
+    finally:
+        frames.close()
+    MEDIA_FRAMES.observe(scored)
+    return best
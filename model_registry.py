@@ -0,0 +1,83 @@
+import threading
+import time
+
+
+class ModelRegistry:
+    """Loads named pipelines on first use and tracks which ones are ready."""
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._errors = {}
+        self._load_times = {}
+        self._locks = {}
+
+    def register(self, name, loader):
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._locks[name]:
+            if name not in self._models:
+                start = time.perf_counter()
+                try:
+                    self._models[name] = self._loaders[name]()
+                except Exception as e:
+                    self._errors[name] = repr(e)
+                    raise
+                self._errors.pop(name, None)
+                self._load_times[name] = time.perf_counter() - start
+            return self._models[name]
+
+    def lazy(self, name):
+        return LazyPipeline(self, name)
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def warm_up(self, names=None, background=True):
+        names = list(names if names is not None else self._loaders)
+
+        def _run():
+            for n in names:
+                try:
+                    self.get(n)
+                except Exception:
+                    pass
+
+        if not background:
+            _run()
+            return None
+        t = threading.Thread(target=_run, name="model-warmup", daemon=True)
+        t.start()
+        return t
+
+    def status(self):
+        return {
+            name: {
+                "loaded": name in self._models,
+                "load_seconds": self._load_times.get(name),
+                "error": self._errors.get(name),
+            }
+            for name in self._loaders
+        }
+
+
+class LazyPipeline:
+    """Callable stand-in for a pipeline that is only loaded when first called."""
+
+    def __init__(self, registry, name):
+        self._registry = registry
+        self._name = name
+
+    def __call__(self, *args, **kwargs):
+        return self._registry.get(self._name)(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        return getattr(self._registry.get(self._name), attr)
+
+    def __repr__(self):
+        return f"LazyPipeline({self._name!r}, loaded={self._registry.is_loaded(self._name)})"
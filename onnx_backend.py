@@ -0,0 +1,79 @@
+import os
+
+# Directory for exported (and quantized) ONNX models, reused across restarts.
+ONNX_DIR = os.getenv("HAZARD_ONNX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".onnx_models"))
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def _imports():
+    try:
+        from optimum.onnxruntime import (
+            ORTModelForFeatureExtraction,
+            ORTModelForImageClassification,
+            ORTModelForSequenceClassification,
+            ORTQuantizer,
+        )
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    except ImportError as e:
+        raise ImportError(
+            "The ONNX backend needs `optimum[onnxruntime]` (pip install 'optimum[onnxruntime]')"
+        ) from e
+    return {
+        "seq": ORTModelForSequenceClassification,
+        "image": ORTModelForImageClassification,
+        "features": ORTModelForFeatureExtraction,
+        "quantizer": ORTQuantizer,
+        "qconfig": AutoQuantizationConfig,
+    }
+
+
+# ORT model class per pipeline task; text classification tasks use "seq".
+TASK_MODELS = {"image-classification": "image", "feature-extraction": "features"}
+
+
+def _model_class(ort, task):
+    return ort[TASK_MODELS.get(task, "seq")]
+
+
+def export_model(task, model_id, quantize=False, onnx_dir=ONNX_DIR):
+    """Exports `model_id` to ONNX once (optionally int8 dynamic-quantized).
+
+    Returns (directory, file name) of the model to load.
+    """
+    ort = _imports()
+    cls = _model_class(ort, task)
+    export_dir = os.path.join(onnx_dir, model_id.replace("/", "--"))
+    if not os.path.exists(os.path.join(export_dir, "model.onnx")):
+        model = cls.from_pretrained(model_id, export=True)
+        model.save_pretrained(export_dir)
+    if not quantize:
+        return export_dir, "model.onnx"
+    quant_dir = export_dir + "-int8"
+    if not os.path.exists(os.path.join(quant_dir, "model_quantized.onnx")):
+        quantizer = ort["quantizer"].from_pretrained(export_dir, file_name="model.onnx")
+        qconfig = ort["qconfig"].avx2(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=quant_dir, quantization_config=qconfig)
+    return quant_dir, "model_quantized.onnx"
+
+
+def load_pipeline(task, model_id, quantize=False, onnx_dir=ONNX_DIR):
+    """A transformers pipeline for `task` running on ONNX Runtime (CPU)."""
+    from transformers import AutoImageProcessor, AutoTokenizer, pipeline
+
+    ort = _imports()
+    cls = _model_class(ort, task)
+    model_dir, file_name = export_model(task, model_id, quantize, onnx_dir)
+    model = cls.from_pretrained(model_dir, file_name=file_name)
+    if task == "image-classification":
+        return pipeline(task, model=model, image_processor=AutoImageProcessor.from_pretrained(model_id))
+    return pipeline(task, model=model, tokenizer=AutoTokenizer.from_pretrained(model_id))
+
+
+def load_encoder(model_id, quantize=False, onnx_dir=ONNX_DIR):
+    """(ORT feature-extraction model, tokenizer) for sentence embeddings."""
+    from transformers import AutoTokenizer
+
+    ort = _imports()
+    model_dir, file_name = export_model("feature-extraction", model_id, quantize, onnx_dir)
+    return ort["features"].from_pretrained(model_dir, file_name=file_name), AutoTokenizer.from_pretrained(model_id)
@@ -0,0 +1,130 @@
+import os
+import threading
+from collections import Counter, deque
+
+from PIL import Image
+
+
+def dhash(image, size=8):
+    """64-bit difference hash: survives recompression, resizing and small edits."""
+    small = image.convert("L").resize((size + 1, size), Image.BILINEAR)
+    px = small.tobytes()
+    bits = 0
+    for row in range(size):
+        base = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (px[base + col] > px[base + col + 1])
+    return bits
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """Burkhard-Keller tree over Hamming distance for radius lookups."""
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, key, value):
+        self.size += 1
+        if self.root is None:
+            self.root = [key, value, {}]
+            return
+        node = self.root
+        while True:
+            d = hamming(key, node[0])
+            if d == 0:
+                node[1] = value
+                self.size -= 1
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [key, value, {}]
+                return
+            node = child
+
+    def nearest(self, key, max_distance):
+        """(distance, value) of the closest key within `max_distance`, else None."""
+        if self.root is None:
+            return None
+        best = None
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            d = hamming(key, node[0])
+            if d <= max_distance and (best is None or d < best[0]):
+                best = (d, node[1])
+                if d == 0:
+                    return best
+            radius = best[0] if best is not None else max_distance
+            for dist, child in node[2].items():
+                if d - radius <= dist <= d + radius:
+                    stack.append(child)
+        return best
+
+
+class PerceptualIndex:
+    """Model outputs keyed by perceptual hash, matched within a Hamming radius.
+
+    Bounded: past `max_entries` the tree is rebuilt from the newest half.
+    """
+
+    def __init__(self, max_distance=6, max_entries=50000):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self._tree = BKTree()
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.hit_distances = Counter()
+
+    def lookup(self, key):
+        with self._lock:
+            self.lookups += 1
+            found = self._tree.nearest(key, self.max_distance)
+            if found is None:
+                return None
+            self.hits += 1
+            self.hit_distances[found[0]] += 1
+            return found[1]
+
+    def add(self, key, value):
+        with self._lock:
+            self._tree.add(key, value)
+            self._recent.append((key, value))
+            if len(self._recent) > self.max_entries:
+                keep = list(self._recent)[-(self.max_entries // 2):]
+                self._tree = BKTree()
+                for k, v in keep:
+                    self._tree.add(k, v)
+                self._recent = deque(keep)
+
+    def clear(self):
+        with self._lock:
+            self._tree = BKTree()
+            self._recent.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": self._tree.size,
+                "max_entries": self.max_entries,
+                "max_distance": self.max_distance,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": (self.hits / self.lookups) if self.lookups else 0.0,
+                "exact_hits": self.hit_distances.get(0, 0),
+                "hit_distances": dict(sorted(self.hit_distances.items())),
+            }
+
+
+def index_from_env():
+    """HAZARD_PHASH_DISTANCE sets the match radius (bits of 64); HAZARD_PHASH_SIZE=0 disables."""
+    size = int(os.getenv("HAZARD_PHASH_SIZE", "50000"))
+    if size <= 0:
+        return None
+    return PerceptualIndex(int(os.getenv("HAZARD_PHASH_DISTANCE", "6")), size)
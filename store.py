@@ -0,0 +1,316 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import geo
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created REAL NOT NULL,
+    source TEXT NOT NULL,
+    external_id TEXT,
+    text TEXT,
+    location TEXT,
+    hazard_type TEXT,
+    risk TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'active',
+    text_score REAL,
+    image_score REAL,
+    fused_score REAL,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reports_created ON reports (created);
+CREATE INDEX IF NOT EXISTS idx_reports_risk ON reports (risk, id);
+CREATE INDEX IF NOT EXISTS idx_reports_hazard ON reports (hazard_type, id);
+CREATE INDEX IF NOT EXISTS idx_reports_location ON reports (location, id);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+STATUSES = ("active", "resolved")
+
+COLUMNS = (
+    "created", "source", "external_id", "text", "location", "hazard_type",
+    "risk", "status", "text_score", "image_score", "fused_score", "payload",
+)
+
+
+def _counter_deltas(row, sign=1):
+    deltas = {"total": sign, f"risk:{row['risk']}": sign, f"status:{row['status']}": sign}
+    if row.get("hazard_type"):
+        deltas[f"hazard:{row['hazard_type']}"] = sign
+    if row["status"] == "active" and row["risk"] != "Low":
+        deltas["active_hazards"] = sign
+    return deltas
+
+
+def _map_score(row):
+    # Only the fused score is 0-10; raw text and image scores are on other scales.
+    return row["fused_score"] if row["fused_score"] is not None else 0.0
+
+
+def _item(row):
+    item = dict(row)
+    item["payload"] = json.loads(item["payload"]) if item.get("payload") else None
+    return item
+
+
+class ReportStore:
+    """Embedded SQLite (WAL) store for scored reports.
+
+    Inserts are queued and written by one background thread in batched
+    transactions. Counters for the dashboard (totals per risk level, hazard
+    type and status) are updated in the same transaction, so reading them
+    is a single-table lookup instead of a scan.
+    """
+
+    def __init__(self, path, batch_size=200, flush_ms=200):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000.0
+        self._write_lock = threading.Lock()
+        self._writer_conn = self._connect()
+        self._writer_conn.executescript(SCHEMA)
+        geo.install(self._writer_conn)
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="report-store", daemon=True)
+        self._worker.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def add(self, source, result, text=None, location=None, external_id=None, hazard_type=None,
+            lat=None, lon=None):
+        """Queues one scored result; returns immediately.
+
+        Reports with coordinates (given, or geocoded from `location`) are
+        added to the spatial index and map tiles in the same transaction.
+        """
+        fused = result.get("fused_score")
+        if lat is None or lon is None:
+            lat, lon = geo.geocode(location) or (None, None)
+        row = {
+            "lat": lat,
+            "lon": lon,
+            "created": time.time(),
+            "source": source,
+            "external_id": None if external_id is None else str(external_id),
+            "text": text,
+            "location": location,
+            "hazard_type": hazard_type,
+            "risk": result.get("risk") or result.get("final_risk") or "Low",
+            "status": "active",
+            "text_score": result.get("text_score"),
+            "image_score": result.get("image_score"),
+            "fused_score": fused,
+            "payload": json.dumps(result, default=str),
+        }
+        self._queue.put(row)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception:
+                logging.getLogger(__name__).exception("failed to write %d reports", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, rows):
+        events = [r for r in rows if isinstance(r, threading.Event)]
+        rows = [r for r in rows if not isinstance(r, threading.Event)]
+        try:
+            self._insert(rows)
+        finally:
+            for e in events:
+                e.set()
+
+    def _insert(self, rows):
+        if rows:
+            deltas = {}
+            for r in rows:
+                for k, v in _counter_deltas(r).items():
+                    deltas[k] = deltas.get(k, 0) + v
+            with self._write_lock:
+                conn = self._writer_conn
+                conn.execute("BEGIN")
+                try:
+                    conn.executemany(
+                        f"INSERT INTO reports ({', '.join(COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                        [tuple(r[c] for c in COLUMNS) for r in rows],
+                    )
+                    # One writer, one transaction: the new ids are contiguous.
+                    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                    first_id = last_id - len(rows) + 1
+                    geo.index_points(conn, [
+                        (first_id + i, r["lat"], r["lon"], _map_score(r))
+                        for i, r in enumerate(rows) if r["lat"] is not None
+                    ])
+                    self._bump(conn, deltas)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+
+    @staticmethod
+    def _retile(conn, report_id, score, active):
+        # Map tiles cluster active reports only.
+        point = conn.execute(
+            "SELECT lat, lon FROM report_points WHERE id = ?", (report_id,)
+        ).fetchone()
+        if point is None:
+            return
+        points = [(point["lat"], point["lon"], score)]
+        if active:
+            geo.add_to_tiles(conn, points)
+            return
+
+        def live_max(ids):
+            return conn.execute(
+                "SELECT max(coalesce(fused_score, 0.0)) FROM reports "
+                "WHERE id IN (SELECT value FROM json_each(?)) AND status = 'active'",
+                (json.dumps(ids),),
+            ).fetchone()[0]
+
+        geo.remove_from_tiles(conn, points, live_max)
+
+    @staticmethod
+    def _bump(conn, deltas):
+        conn.executemany(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            list(deltas.items()),
+        )
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self, timeout=None):
+        """Blocks until everything queued so far is committed."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def set_status(self, report_id, status):
+        if status not in STATUSES:
+            raise ValueError(f"status must be one of {STATUSES}, got {status!r}")
+        with self._write_lock:
+            conn = self._writer_conn
+            conn.execute("BEGIN")
+            try:
+                row = conn.execute(
+                    "SELECT risk, status, hazard_type, fused_score FROM reports WHERE id = ?",
+                    (report_id,),
+                ).fetchone()
+                if row is None or row["status"] == status:
+                    conn.execute("COMMIT")
+                    return row is not None
+                old = dict(row)
+                deltas = _counter_deltas(old, -1)
+                for k, v in _counter_deltas(dict(old, status=status)).items():
+                    deltas[k] = deltas.get(k, 0) + v
+                conn.execute("UPDATE reports SET status = ? WHERE id = ?", (status, report_id))
+                self._bump(conn, {k: v for k, v in deltas.items() if v})
+                self._retile(conn, report_id, _map_score(old), status == "active")
+                conn.execute("COMMIT")
+                return True
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def query(self, risk=None, hazard_type=None, location=None, status=None,
+              since=None, until=None, cursor=None, limit=50):
+        """Newest-first page of reports plus the cursor for the next page.
+
+        The cursor is the last row id returned, so paging is an index seek
+        (`id < cursor`) no matter how deep the client goes.
+        """
+        clauses, params = [], []
+        for col, val in (("risk", risk), ("hazard_type", hazard_type),
+                         ("location", location), ("status", status)):
+            if val is not None:
+                clauses.append(f"{col} = ?")
+                params.append(val)
+        if since is not None:
+            clauses.append("created >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created < ?")
+            params.append(until)
+        if cursor is not None:
+            clauses.append("id < ?")
+            params.append(cursor)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT * FROM reports {where} ORDER BY id DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+        items = [_item(r) for r in rows]
+        next_cursor = items[-1]["id"] if len(items) == limit else None
+        return items, next_cursor
+
+    def in_bbox(self, min_lat, min_lon, max_lat, max_lon, limit=1000):
+        return [_item(r) for r in geo.in_bbox(self._reader(), min_lat, min_lon, max_lat, max_lon, limit)]
+
+    def within_radius(self, lat, lon, radius_km, limit=1000):
+        return [
+            dict(_item(r), distance_km=round(d, 3))
+            for d, r in geo.within_radius(self._reader(), lat, lon, radius_km, limit)
+        ]
+
+    def tiles(self, z, min_lat, min_lon, max_lat, max_lon):
+        return geo.tiles(self._reader(), z, min_lat, min_lon, max_lat, max_lon)
+
+    def counters(self):
+        return {
+            name: value
+            for name, value in self._reader().execute("SELECT name, value FROM counters")
+        }
+
+    def stats(self):
+        c = self.counters()
+        group = lambda prefix: {
+            k[len(prefix):]: v for k, v in c.items() if k.startswith(prefix) and v
+        }
+        return {
+            "total_reports": c.get("total", 0),
+            "active_hazards": c.get("active_hazards", 0),
+            "resolved": c.get("status:resolved", 0),
+            "by_risk": group("risk:"),
+            "by_hazard": group("hazard:"),
+            "by_status": group("status:"),
+        }
+
+
+def store_from_env():
+    path = os.getenv("HAZARD_STORE_PATH", "hazard_reports.db")
+    return ReportStore(path) if path else None
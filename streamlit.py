@@ -1,416 +1,601 @@
-# app_multimodal_hazard.py
-import os
-import re
-import io
-import requests
-import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-from dotenv import load_dotenv
-from PIL import Image
-from collections import Counter
-
-# NLP and multimodal models
-from transformers import pipeline, AutoFeatureExtractor, AutoModelForImageClassification
-
-# Optional Twitter v2 client
-import tweepy
-
-# NLTK for stopwords (optional for keyword extraction)
-import nltk
-from nltk.corpus import stopwords
-
-nltk.download('stopwords')
-STOPWORDS = set(stopwords.words('english'))
-
-# Load env
-load_dotenv()
-BEARER_TOKEN = os.getenv("BEARER_TOKEN")
-
-# Attempt to initialize Twitter client if token present
-twitter_client = None
-if BEARER_TOKEN:
-    try:
-        twitter_client = tweepy.Client(bearer_token=BEARER_TOKEN, wait_on_rate_limit=True)
-    except Exception as e:
-        twitter_client = None
-        st.warning(f"Twitter client init failed: {e}")
-
-# Device selection for transformers/pytorch: use GPU if available
-try:
-    import torch
-    DEVICE = 0 if torch.cuda.is_available() else -1  # pipeline device param: 0 for gpu, -1 for cpu
-except Exception:
-    DEVICE = -1
-
-# Initialize transformers pipelines (with device)
-@st.cache_resource(show_spinner=False)
-def init_pipelines():
-    # text sentiment (fast)
-    sentiment = pipeline("sentiment-analysis", device=DEVICE)
-    # zero-shot for hazard classification (text)
-    zero_shot = pipeline("zero-shot-classification", model="cardiffnlp/twitter-roberta-base-sentiment", device=DEVICE)
-    # image classification (uses a vision model via transformers)
-    # Use a general image-classification pipeline (will pick a reasonable ViT/ResNet under the hood)
-    image_clf = pipeline("image-classification", device=DEVICE)
-    return sentiment, zero_shot, image_clf
-
-sentiment_pipeline, zero_shot_pipeline, image_pipeline = init_pipelines()
-
-# Hazard keyword weights (optimized)
-HAZARD_WEIGHTS = {
-    "tsunami": 5,
-    "earthquake": 5,
-    "cyclone": 4,
-    "flood": 4,
-    "storm": 3,
-    "surge": 2,
-    "high": 1,
-    "wave": 1,
-    "waves": 1,
-    "coast": 2,
-    "flooding": 4,
-    "inundation": 4
-}
-
-# Keywords considered high-severity for boosting
-HIGH_SEVERITY_KEYWORDS = {"tsunami", "earthquake", "cyclone", "flood", "flooding"}
-
-# Image label keywords mapping (labels returned by image pipeline that indicate hazard)
-IMAGE_HAZARD_KEYWORDS = ["flood", "storm", "coast", "sea", "wave", "boat", "pier", "harbor", "shore", "sandbar", "drought", "mud", "ruin", "wreck", "debris"]
-
-# Helpers: text cleaning and keyword extraction
-def clean_text(t: str):
-    t = re.sub(r"http\S+", " ", t)          # remove urls
-    t = re.sub(r"[^A-Za-z0-9\s]", " ", t)  # remove punctuation
-    t = re.sub(r"\s+", " ", t).strip()
-    return t.lower()
-
-def extract_keywords_from_texts(texts, top_n=15):
-    all_words = []
-    for t in texts:
-        for w in clean_text(t).split():
-            if w not in STOPWORDS and len(w) > 2:
-                all_words.append(w)
-    return [w for w, _ in Counter(all_words).most_common(top_n)]
-
-# Hazard scoring from text
-def calculate_text_hazard_score(text):
-    text_l = clean_text(text)
-    score = 0
-    # match whole words with regex
-    for kw, weight in HAZARD_WEIGHTS.items():
-        matches = len(re.findall(r"\b{}\b".format(re.escape(kw)), text_l))
-        score += matches * weight
-    # urgency heuristics
-    urgency = text.count("!") + sum(1 for w in text.split() if w.isupper() and len(w) > 1)
-    score += min(urgency * 1.5, 4)  # small cap for punctuation/caps
-    return float(score)
-
-# Classify hazard risk from numeric score using thresholds
-def risk_from_score(score):
-    # These thresholds can be tuned
-    if score >= 6:
-        return "High"
-    elif score >= 3:
-        return "Medium"
-    else:
-        return "Low"
-
-# Image hazard scoring using image classifier labels
-def calculate_image_hazard_score(pil_image):
-    """
-    Uses image classification pipeline labels; if labels contain hazard keywords,
-    increase score by label confidence scaled to [0..5].
-    """
-    try:
-        results = image_pipeline(pil_image, top_k=5)
-    except Exception as e:
-        # if the image pipeline fails for some reason, return 0
-        return 0.0, []
-    score = 0.0
-    matched_labels = []
-    for r in results:
-        label = r.get("label", "").lower()
-        conf = float(r.get("score", 0.0))
-        # check if any IMAGE_HAZARD_KEYWORDS appear in label text
-        for key in IMAGE_HAZARD_KEYWORDS:
-            if key in label:
-                # scale confidence to 0..5
-                score += conf * 5.0
-                matched_labels.append((label, conf))
-                break
-    # cap to a sensible maximum
-    score = min(score, 5.0)
-    return float(round(score, 3)), matched_labels
-
-# Combine text & image scores into final score & interpretation
-def fuse_scores(text_score, image_score, image_confident=False):
-    """
-    - Normalize text_score roughly: expect max meaningful text_score maybe around 10.
-    - text_norm = text_score / 10 (cap 1.0)
-    - image_norm = image_score / 5 (cap 1.0)
-    - default weights: text 0.6, image 0.4
-    - if image_confident (image_score high), boost image weight
-    """
-    text_norm = min(text_score / 10.0, 1.0)
-    image_norm = min(image_score / 5.0, 1.0)
-    if image_confident and image_score >= 3.5:
-        w_image = 0.6
-        w_text = 0.4
-    else:
-        w_image = 0.4
-        w_text = 0.6
-    fused = w_text * text_norm + w_image * image_norm
-    # scale to 0..10 for readability
-    fused_scaled = fused * 10
-    return float(round(fused_scaled, 3)), {"text_norm": text_norm, "image_norm": image_norm, "w_text": w_text, "w_image": w_image}
-
-# Fetch recent tweets with media (attempt)
-def fetch_tweets_with_media(keywords, max_results=20):
-    """
-    Builds v2 query with OR between keywords. Requests expansions for media.
-    Returns list of dicts: {'text':..., 'media_urls': [..]}
-    """
-    if not twitter_client:
-        return []
-    query = "(" + " OR ".join(keywords) + ") -is:retweet lang:en"
-    # request expansions for media and media fields (url)
-    try:
-        resp = twitter_client.search_recent_tweets(query=query, max_results=max_results,
-                                                  expansions=['attachments.media_keys'],
-                                                  media_fields=['url','preview_image_url','type'])
-    except Exception as e:
-        st.warning(f"Twitter API error: {e}")
-        return []
-    tweets = []
-    includes = resp.includes or {}
-    media_map = {}
-    # build media map if present
-    if 'media' in includes:
-        for m in includes['media']:
-            # m.media_key and m.url (if image) may exist
-            key = getattr(m, 'media_key', None)
-            url = getattr(m, 'url', None) or getattr(m, 'preview_image_url', None)
-            if key and url:
-                media_map[key] = url
-    # iterate data
-    if resp.data:
-        for t in resp.data:
-            text = t.text
-            m_urls = []
-            if hasattr(t, 'attachments') and getattr(t.attachments, 'media_keys', None):
-                for mk in t.attachments.media_keys:
-                    if mk in media_map:
-                        m_urls.append(media_map[mk])
-            tweets.append({'text': text, 'media_urls': m_urls})
-    return tweets
-
-# Utility to download image from URL to PIL
-def download_image_from_url(url):
-    try:
-        r = requests.get(url, timeout=8)
-        img = Image.open(io.BytesIO(r.content)).convert("RGB")
-        return img
-    except Exception:
-        return None
-
-# Mock data for offline/hackathon demo
-MOCK_TWEETS = [
-    {"text": "Huge tsunami warning issued for coastal areas!", "media_urls": []},
-    {"text": "Massive storm surge expected tonight, stay safe!", "media_urls": []},
-    {"text": "Cyclone approaching, authorities on high alert!", "media_urls": []},
-    {"text": "Flood waters rising fast, avoid low-lying areas!", "media_urls": []},
-    {"text": "High waves reported along the coast, surfing dangerous!", "media_urls": []}
-]
-# Optionally provide a sample mock image (you can place a sample.jpg next to the file)
-MOCK_IMAGE_PATH = None  # set to "sample.jpg" if you want an image fallback
-
-# Streamlit UI
-st.set_page_config(page_title="Multimodal Ocean Hazard Analyzer", layout="wide")
-st.title("🌊 Multimodal Ocean Hazard Analyzer — Text + Image + Social Media")
-st.markdown("""
-This demo combines **text analysis**, **image analysis**, and **Twitter** (optional) to detect ocean hazards.
-- Provide text and optional image, or fetch recent tweets for keywords.
-- Uses weighted keyword scoring + transformers sentiment + image classification to fuse a final hazard level.
-""")
-
-# Sidebar options
-st.sidebar.header("Mode & Settings")
-mode = st.sidebar.radio("Mode", ["Custom Input", "Twitter Keywords (live)", "Batch Mock Demo"])
-keywords_input = st.sidebar.text_input("Keywords (space-separated)", "tsunami storm surge flood cyclone")
-keywords = [k.strip() for k in keywords_input.split() if k.strip()]
-tweet_count = st.sidebar.slider("Max tweets to fetch", 1, 50, 10)
-use_image_model = st.sidebar.checkbox("Enable image analysis", value=True)
-show_debug = st.sidebar.checkbox("Show debug details (scores / matched labels)", value=False)
-
-# Content area columns
-col_l, col_r = st.columns([2, 1])
-
-with col_l:
-    if mode == "Custom Input":
-        st.subheader("Custom Text + Image")
-        user_text = st.text_area("Enter text (tweet / report)", height=150)
-        uploaded_file = st.file_uploader("Upload an image (optional)", type=["jpg", "jpeg", "png"])
-        run_btn = st.button("Analyze Input")
-        if run_btn:
-            if not user_text and not uploaded_file:
-                st.warning("Please provide text and/or an image for analysis.")
-            else:
-                # text analysis
-                t_score = calculate_text_hazard_score(user_text) if user_text else 0.0
-                sentiment_result = sentiment_pipeline(user_text) if user_text else [{'label': 'NEUTRAL', 'score': 1.0}]
-                sent_label = sentiment_result[0]['label']
-                z = zero_shot_pipeline(user_text, candidate_labels=["hazard alert", "safe", "neutral"]) if user_text else {'labels': ['neutral']}
-                text_hazard_class = z['labels'][0]
-
-                # image analysis
-                image_score = 0.0
-                matched_image_labels = []
-                if uploaded_file and use_image_model:
-                    pil = Image.open(uploaded_file).convert("RGB")
-                    image_score, matched_image_labels = calculate_image_hazard_score(pil)
-
-                elif uploaded_file is None and MOCK_IMAGE_PATH:
-                    pil = Image.open(MOCK_IMAGE_PATH).convert("RGB")
-                    image_score, matched_image_labels = calculate_image_hazard_score(pil)
-
-                # fuse
-                image_confident = image_score >= 3.0
-                fused_score, norms = fuse_scores(t_score, image_score, image_confident=image_confident)
-                final_risk = risk_from_score(fused_score / 1.0)  # risk_from_score expects 0..10 style
-                st.markdown("### Result")
-                st.write(f"**Text Hazard Score:** {t_score:.2f}")
-                st.write(f"**Text Hazard Class (zero-shot):** {text_hazard_class}")
-                st.write(f"**Text Sentiment:** {sent_label}")
-                st.write(f"**Image Hazard Score:** {image_score:.2f}")
-                if matched_image_labels:
-                    st.write("**Matched image labels:**")
-                    for lbl, conf in matched_image_labels:
-                        st.write(f"- {lbl} ({conf:.2f})")
-                st.write(f"**Fused Score (0-10):** {fused_score:.2f}")
-                st.markdown(f"## 🔴 Final Hazard Level: **{final_risk}**")
-
-                if show_debug:
-                    st.write("Debug:", norms)
-
-    elif mode == "Twitter Keywords (live)":
-        st.subheader("Fetch Tweets for Keywords & Analyze (live)")
-        st.write("If Twitter credentials are not configured, toggle to 'Batch Mock Demo' or add BEARER token in `.env`.")
-        if not twitter_client:
-            st.warning("Twitter client not configured or failed. Add TWITTER_BEARER_TOKEN to `.env` to enable live fetch.")
-        run_twitter = st.button("Fetch & Analyze Tweets")
-        if run_twitter:
-            if not keywords:
-                st.warning("Enter at least one keyword.")
-            else:
-                tweets_data = fetch_tweets_with_media(keywords, max_results=tweet_count) if twitter_client else MOCK_TWEETS
-                if not tweets_data:
-                    st.info("No tweets found. Using mock data.")
-                    tweets_data = MOCK_TWEETS
-                # aggregate results list
-                rows = []
-                for tw in tweets_data:
-                    text = tw.get("text") if isinstance(tw, dict) else tw
-                    media_urls = tw.get("media_urls", []) if isinstance(tw, dict) else []
-                    # text metrics
-                    t_score = calculate_text_hazard_score(text)
-                    sent_label = sentiment_pipeline(text)[0]['label'] if text else "NEUTRAL"
-                    z = zero_shot_pipeline(text, candidate_labels=["hazard alert", "safe", "neutral"]) if text else {'labels': ['neutral']}
-                    text_hazard_class = z['labels'][0]
-                    # images (if any)
-                    image_score = 0.0
-                    matched_labels = []
-                    for url in media_urls:
-                        img = download_image_from_url(url)
-                        if img:
-                            iscore, mlabels = calculate_image_hazard_score(img)
-                            # keep the max image score across attachments
-                            if iscore > image_score:
-                                image_score = iscore
-                                matched_labels = mlabels
-                    # fuse
-                    image_confident = image_score >= 3.0
-                    fused_score, norms = fuse_scores(t_score, image_score, image_confident=image_confident)
-                    final_risk = risk_from_score(fused_score)
-                    rows.append({
-                        "text": text,
-                        "media_count": len(media_urls),
-                        "text_score": round(t_score, 2),
-                        "image_score": round(image_score, 2),
-                        "fused_score": fused_score,
-                        "final_risk": final_risk,
-                        "sentiment": sent_label,
-                        "text_hazard_class": text_hazard_class,
-                        "matched_image_labels": matched_labels
-                    })
-
-                df = pd.DataFrame(rows)
-                st.subheader("Analyzed Tweets")
-                st.dataframe(df[["final_risk", "fused_score", "text_score", "image_score", "sentiment", "text_hazard_class", "media_count"]].sort_values(by="fused_score", ascending=False))
-
-                # Visualizations
-                if not df.empty:
-                    # risk distribution
-                    st.subheader("Risk Distribution")
-                    fig1, ax1 = plt.subplots()
-                    df['final_risk'].value_counts().reindex(["High","Medium","Low"]).fillna(0).plot(kind='bar', ax=ax1, color=['red','orange','green'])
-                    ax1.set_ylabel("Count")
-                    st.pyplot(fig1)
-
-                    # sentiment pie
-                    st.subheader("Sentiment Distribution")
-                    fig2, ax2 = plt.subplots()
-                    df['sentiment'].value_counts().plot.pie(autopct='%1.1f%%', ax=ax2)
-                    ax2.set_ylabel("")
-                    st.pyplot(fig2)
-
-                    # word cloud
-                    st.subheader("Trending Keywords")
-                    kw = extract_keywords_from_texts(df['text'].tolist(), top_n=30)
-                    if kw:
-                        wc = WordCloud(width=800, height=300, background_color='white').generate(" ".join(kw))
-                        fig3, ax3 = plt.subplots(figsize=(10,3))
-                        ax3.imshow(wc, interpolation='bilinear')
-                        ax3.axis('off')
-                        st.pyplot(fig3)
-
-    else:  # Batch Mock Demo
-        st.subheader("Batch Mock Demo (offline)")
-        if st.button("Run Mock Demo"):
-            tweets_data = MOCK_TWEETS
-            rows = []
-            for tw in tweets_data:
-                text = tw.get("text") if isinstance(tw, dict) else tw
-                t_score = calculate_text_hazard_score(text)
-                sent_label = sentiment_pipeline(text)[0]['label']
-                z = zero_shot_pipeline(text, candidate_labels=["hazard alert", "safe", "neutral"])
-                text_hazard_class = z['labels'][0]
-                image_score = 0.0
-                fused_score, norms = fuse_scores(t_score, image_score)
-                final_risk = risk_from_score(fused_score)
-                rows.append({
-                    "text": text,
-                    "text_score": round(t_score,2),
-                    "image_score": image_score,
-                    "fused_score": fused_score,
-                    "final_risk": final_risk,
-                    "sentiment": sent_label,
-                    "text_hazard_class": text_hazard_class
-                })
-            df = pd.DataFrame(rows)
-            st.dataframe(df)
-            st.subheader("Risk Distribution")
-            fig1, ax1 = plt.subplots()
-            df['final_risk'].value_counts().reindex(["High","Medium","Low"]).fillna(0).plot(kind='bar', ax=ax1, color=['red','orange','green'])
-            st.pyplot(fig1)
-
-# Footer / notes
-st.markdown("---")
-st.markdown("""
-**Notes & Limitations**  
-- The image classifier is *general-purpose*; matching labels to hazard keywords is heuristic. For production you'd want a fine-tuned model for floods/tsunami/shoreline damage.  
-- Twitter API v2 media access may be limited by your app access level; mock mode ensures demo stability.  
-- Thresholds and weights can be tuned with labeled data for better accuracy.
-""")
+# app_multimodal_hazard.py
+import os
+import re
+import threading
+import streamlit as st
+import pandas as pd
+import matplotlib.pyplot as plt
+from wordcloud import WordCloud
+from dotenv import load_dotenv
+from PIL import Image
+from collections import Counter, OrderedDict
+
+# NLP and multimodal models
+from transformers import pipeline, AutoFeatureExtractor, AutoModelForImageClassification
+
+# Optional Twitter v2 client
+import tweepy
+
+# Label-embedding zero-shot classifier
+from label_classifier import LabelEmbeddingClassifier, MeanPoolingEncoder
+
+# Content-addressed cache for model outputs (shared on-disk tier with the API)
+from cache import cache_from_env, content_key
+
+# Pooled, concurrent media downloader
+from downloader import downloader_from_env
+
+# Reduced-resolution decode with decompression-bomb checks
+from imaging import model_input_size, preprocess_image
+
+# Frame sampling for animated GIFs and videos
+import media
+
+# Shared recent-tweet search
+from tweets import search_tweets
+
+# Perceptual-hash index for near-duplicate photos
+from phash import dhash, index_from_env
+
+# Sliding-window trending keywords
+from trending import TrendingEngine
+
+# Persistent report store (same SQLite file as the API by default)
+from store import store_from_env
+
+# Shared inference server client (HAZARD_INFERENCE_SOCKET)
+from inference_server import RemotePipeline, client_from_env
+
+# Bundled stopword list (no corpus download at startup)
+from stopwords import ENGLISH
+
+# Report hazard_type as the API assigns it (the store's hazard:* counters are shared)
+from hazards import dominant_hazard
+
+STOPWORDS = set(ENGLISH)
+
+# Load env
+load_dotenv()
+BEARER_TOKEN = os.getenv("BEARER_TOKEN")
+
+# Attempt to initialize Twitter client if token present
+twitter_client = None
+if BEARER_TOKEN:
+    try:
+        twitter_client = tweepy.Client(bearer_token=BEARER_TOKEN, wait_on_rate_limit=True)
+    except Exception as e:
+        twitter_client = None
+        st.warning(f"Twitter client init failed: {e}")
+
+# Device selection for transformers/pytorch: use GPU if available
+try:
+    import torch
+    DEVICE = 0 if torch.cuda.is_available() else -1  # pipeline device param: 0 for gpu, -1 for cpu
+except Exception:
+    DEVICE = -1
+
+# Hazard classes for zero-shot classification (comma-separated HAZARD_LABELS to override)
+ZERO_SHOT_LABELS = [l.strip() for l in os.getenv("HAZARD_LABELS", "hazard alert,safe,neutral").split(",") if l.strip()]
+ZERO_SHOT_MODE = os.getenv("HAZARD_ZERO_SHOT", "embedding")
+SENTIMENT_MODEL = "distilbert/distilbert-base-uncased-finetuned-sst-2-english"
+ZERO_SHOT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment"
+IMAGE_MODEL = "google/vit-base-patch16-224"
+LABEL_ENCODER_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Initialize transformers pipelines (with device)
+@st.cache_resource(show_spinner=False)
+def init_pipelines():
+    # models served by inference_server.py: no local copies in this process
+    client = client_from_env()
+    if client is not None:
+        return tuple(RemotePipeline(client, name) for name in ("sentiment", "zero_shot", "image"))
+    # text sentiment (fast)
+    sentiment = pipeline("sentiment-analysis", model=SENTIMENT_MODEL, device=DEVICE)
+    # zero-shot for hazard classification (text): cached label embeddings by default,
+    # HAZARD_ZERO_SHOT=nli for the per-label NLI pipeline
+    if ZERO_SHOT_MODE == "embedding":
+        zero_shot = LabelEmbeddingClassifier(MeanPoolingEncoder(LABEL_ENCODER_MODEL, DEVICE), ZERO_SHOT_LABELS)
+    else:
+        zero_shot = pipeline("zero-shot-classification", model=ZERO_SHOT_MODEL, device=DEVICE)
+    # image classification (uses a vision model via transformers)
+    # Use a general image-classification pipeline (will pick a reasonable ViT/ResNet under the hood)
+    image_clf = pipeline("image-classification", model=IMAGE_MODEL, device=DEVICE)
+    return sentiment, zero_shot, image_clf
+
+sentiment_pipeline, zero_shot_pipeline, image_pipeline = init_pipelines()
+
+# One cache per Streamlit server process (reruns of the script reuse it)
+@st.cache_resource(show_spinner=False)
+def init_result_cache():
+    return cache_from_env()
+
+result_cache = init_result_cache()
+
+# Cache namespaces name the model and backend (local pipelines run on torch),
+# matching the API's keys so both share one persistent cache safely.
+SENTIMENT_CACHE_KIND = f"sentiment:{SENTIMENT_MODEL}:torch"
+ZERO_SHOT_CACHE_KIND = (
+    f"zero_shot:{LABEL_ENCODER_MODEL if ZERO_SHOT_MODE == 'embedding' else ZERO_SHOT_MODEL}:torch:"
+    + "|".join(ZERO_SHOT_LABELS)
+)
+IMAGE_CACHE_KIND = f"image:{IMAGE_MODEL}:torch"
+
+@st.cache_resource(show_spinner=False)
+def init_image_index():
+    return index_from_env()
+
+image_index = init_image_index()
+
+# Hazard keyword weights (optimized)
+HAZARD_WEIGHTS = {
+    "tsunami": 5,
+    "earthquake": 5,
+    "cyclone": 4,
+    "flood": 4,
+    "storm": 3,
+    "surge": 2,
+    "high": 1,
+    "wave": 1,
+    "waves": 1,
+    "coast": 2,
+    "flooding": 4,
+    "inundation": 4
+}
+
+# Keywords considered high-severity for boosting
+HIGH_SEVERITY_KEYWORDS = {"tsunami", "earthquake", "cyclone", "flood", "flooding"}
+
+# Image label keywords mapping (labels returned by image pipeline that indicate hazard)
+IMAGE_HAZARD_KEYWORDS = ["flood", "storm", "coast", "sea", "wave", "boat", "pier", "harbor", "shore", "sandbar", "drought", "mud", "ruin", "wreck", "debris"]
+
+# Helpers: text cleaning and keyword extraction
+def clean_text(t: str):
+    t = re.sub(r"http\S+", " ", t)          # remove urls
+    t = re.sub(r"[^A-Za-z0-9\s]", " ", t)  # remove punctuation
+    t = re.sub(r"\s+", " ", t).strip()
+    return t.lower()
+
+def extract_keywords_from_texts(texts, top_n=15):
+    all_words = []
+    for t in texts:
+        for w in clean_text(t).split():
+            if w not in STOPWORDS and len(w) > 2:
+                all_words.append(w)
+    return [w for w, _ in Counter(all_words).most_common(top_n)]
+
+# Cached model calls, keyed by the normalized text so reposts reuse results
+def cached_sentiment(text):
+    key = content_key(SENTIMENT_CACHE_KIND, clean_text(text))
+    return result_cache.get_or_compute(key, lambda: sentiment_pipeline(text)[0])
+
+def cached_zero_shot(text):
+    key = content_key(ZERO_SHOT_CACHE_KIND, clean_text(text))
+    return result_cache.get_or_compute(
+        key, lambda: zero_shot_pipeline(text, candidate_labels=ZERO_SHOT_LABELS)
+    )
+
+# Hazard scoring from text
+def calculate_text_hazard_score(text):
+    text_l = clean_text(text)
+    score = 0
+    # match whole words with regex
+    for kw, weight in HAZARD_WEIGHTS.items():
+        matches = len(re.findall(r"\b{}\b".format(re.escape(kw)), text_l))
+        score += matches * weight
+    # urgency heuristics
+    urgency = text.count("!") + sum(1 for w in text.split() if w.isupper() and len(w) > 1)
+    score += min(urgency * 1.5, 4)  # small cap for punctuation/caps
+    return float(score)
+
+# Classify hazard risk from numeric score using thresholds
+def risk_from_score(score):
+    # These thresholds can be tuned
+    if score >= 6:
+        return "High"
+    elif score >= 3:
+        return "Medium"
+    else:
+        return "Low"
+
+# Image hazard scoring using image classifier labels
+def calculate_image_hazard_score(pil_image, image_bytes=None):
+    """
+    Uses image classification pipeline labels; if labels contain hazard keywords,
+    increase score by label confidence scaled to [0..5].
+    When the encoded image bytes are given, the labels are cached by their hash;
+    near-duplicates of an already classified photo reuse its labels.
+    """
+    def classify():
+        if image_index is None:
+            return image_pipeline(pil_image, top_k=5)
+        key = dhash(pil_image)
+        labels = image_index.lookup(key)
+        if labels is None:
+            labels = image_pipeline(pil_image, top_k=5)
+            image_index.add(key, labels)
+        return labels
+
+    try:
+        if image_bytes is None:
+            results = classify()
+        else:
+            results = result_cache.get_or_compute(content_key(IMAGE_CACHE_KIND, image_bytes), classify)
+    except Exception as e:
+        # if the image pipeline fails for some reason, return 0
+        return 0.0, []
+    return image_score_from_labels(results)
+
+def image_score_from_labels(results):
+    score = 0.0
+    matched_labels = []
+    for r in results:
+        label = r.get("label", "").lower()
+        conf = float(r.get("score", 0.0))
+        # check if any IMAGE_HAZARD_KEYWORDS appear in label text
+        for key in IMAGE_HAZARD_KEYWORDS:
+            if key in label:
+                # scale confidence to 0..5
+                score += conf * 5.0
+                matched_labels.append((label, conf))
+                break
+    # cap to a sensible maximum
+    score = min(score, 5.0)
+    return float(round(score, 3)), matched_labels
+
+# Images per classifier call when a whole batch of tweets is scored
+IMAGE_BATCH_SIZE = int(os.getenv("HAZARD_IMAGE_BATCH_SIZE", "8"))
+
+def calculate_image_hazard_scores(images):
+    """
+    calculate_image_hazard_score for a list of (pil_image, image_bytes): cache and
+    near-duplicate misses go through the classifier IMAGE_BATCH_SIZE at a time.
+    """
+    keys = [content_key(IMAGE_CACHE_KIND, b) if b is not None else None for _, b in images]
+    results = [result_cache.get(k) if k is not None else None for k in keys]
+    hashes = [None] * len(images)
+    if image_index is not None:
+        for i, (img, _) in enumerate(images):
+            if results[i] is None:
+                hashes[i] = dhash(img)
+                results[i] = image_index.lookup(hashes[i])
+    missing = [i for i, r in enumerate(results) if r is None]
+    for start in range(0, len(missing), IMAGE_BATCH_SIZE):
+        chunk = missing[start:start + IMAGE_BATCH_SIZE]
+        try:
+            out = image_pipeline([images[i][0] for i in chunk], top_k=5, batch_size=len(chunk))
+        except Exception:
+            continue
+        for i, r in zip(chunk, out):
+            results[i] = r
+            if hashes[i] is not None:
+                image_index.add(hashes[i], r)
+            if keys[i] is not None:
+                result_cache.put(keys[i], r)
+    return [image_score_from_labels(r) if r is not None else (0.0, []) for r in results]
+
+def classify_frames(frames):
+    return image_pipeline(frames, top_k=5, batch_size=len(frames))
+
+# Animated GIFs and videos: labels of the best sampled frame, cached by content hash
+def calculate_media_hazard_score(data, kind=None):
+    key = content_key(IMAGE_CACHE_KIND, data)
+    results = result_cache.get(key)
+    if results is None:
+        results = media.classify_media(data, classify_frames, image_score_from_labels, kind,
+                                       model_input_size(image_pipeline))
+        if results is None:
+            return 0.0, []
+        result_cache.put(key, results)
+    return image_score_from_labels(results)
+
+# Combine text & image scores into final score & interpretation
+def fuse_scores(text_score, image_score, image_confident=False):
+    """
+    - Normalize text_score roughly: expect max meaningful text_score maybe around 10.
+    - text_norm = text_score / 10 (cap 1.0)
+    - image_norm = image_score / 5 (cap 1.0)
+    - default weights: text 0.6, image 0.4
+    - if image_confident (image_score high), boost image weight
+    """
+    text_norm = min(text_score / 10.0, 1.0)
+    image_norm = min(image_score / 5.0, 1.0)
+    if image_confident and image_score >= 3.5:
+        w_image = 0.6
+        w_text = 0.4
+    else:
+        w_image = 0.4
+        w_text = 0.6
+    fused = w_text * text_norm + w_image * image_norm
+    # scale to 0..10 for readability
+    fused_scaled = fused * 10
+    return float(round(fused_scaled, 3)), {"text_norm": text_norm, "image_norm": image_norm, "w_text": w_text, "w_image": w_image}
+
+# Fetch recent tweets with media; GIFs and videos come as their MP4 variant when PyAV is installed
+def fetch_tweets_with_media(keywords, max_results=20):
+    if not twitter_client:
+        return []
+    try:
+        return search_tweets(twitter_client, keywords, max_results)
+    except Exception as e:
+        st.warning(f"Twitter API error: {e}")
+        return []
+
+# Utility to decode downloaded image bytes to PIL, downscaled to the model input size
+def decode_image(data):
+    try:
+        return preprocess_image(data, model_input_size(image_pipeline))
+    except Exception:
+        return None
+
+# Shared downloader: one connection pool, bounded parallel fetches per host
+@st.cache_resource(show_spinner=False)
+def init_downloader():
+    return downloader_from_env(decode=decode_image)
+
+image_downloader = init_downloader()
+MEDIA_BATCH_DEADLINE_S = 20.0
+
+# Fetch every URL concurrently; returns {url: (PIL image, raw bytes)} for still images
+# and {url: (raw bytes, media kind)} for animations and videos
+def download_images(urls):
+    images, clips = {}, {}
+    for url, data, img in image_downloader.fetch_many(urls, deadline_s=MEDIA_BATCH_DEADLINE_S):
+        if data is None:
+            continue
+        kind = media.media_kind(data)
+        if kind != media.IMAGE:
+            clips[url] = (data, kind)
+        elif img is not None:
+            images[url] = (img, data)
+    return images, clips
+
+# Streaming trending-keyword engine (sliding windows, bounded memory), shared across reruns
+@st.cache_resource(show_spinner=False)
+def init_trending_engine():
+    return TrendingEngine(STOPWORDS, HAZARD_WEIGHTS)
+
+trending_engine = init_trending_engine()
+TRENDING_MAX_SEEN = 100_000
+
+# Tweets already counted by the engine: each fetch returns mostly the same recent tweets
+@st.cache_resource(show_spinner=False)
+def init_trending_seen():
+    return OrderedDict(), threading.Lock()
+
+def add_to_trending(rows):
+    seen, lock = init_trending_seen()
+    with lock:
+        for r in rows:
+            key = f"id:{r['id']}" if r.get("id") is not None else content_key("text", clean_text(r["text"]))
+            if key in seen:
+                continue
+            seen[key] = True
+            trending_engine.add(r["text"], score=r["fused_score"], high_risk=r["final_risk"] == "High")
+        while len(seen) > TRENDING_MAX_SEEN:
+            seen.popitem(last=False)
+
+# Persist analyzed rows so the dashboard / API can query them later
+@st.cache_resource(show_spinner=False)
+def init_report_store():
+    return store_from_env()
+
+report_store = init_report_store()
+
+def persist_rows(rows, source):
+    if report_store is None:
+        return
+    for r in rows:
+        report_store.add(source, r, text=r["text"], hazard_type=dominant_hazard(r["text"]))
+
+# Mock data for offline/hackathon demo
+MOCK_TWEETS = [
+    {"text": "Huge tsunami warning issued for coastal areas!", "media_urls": []},
+    {"text": "Massive storm surge expected tonight, stay safe!", "media_urls": []},
+    {"text": "Cyclone approaching, authorities on high alert!", "media_urls": []},
+    {"text": "Flood waters rising fast, avoid low-lying areas!", "media_urls": []},
+    {"text": "High waves reported along the coast, surfing dangerous!", "media_urls": []}
+]
+# Optionally provide a sample mock image (you can place a sample.jpg next to the file)
+MOCK_IMAGE_PATH = None  # set to "sample.jpg" if you want an image fallback
+
+# Streamlit UI
+st.set_page_config(page_title="Multimodal Ocean Hazard Analyzer", layout="wide")
+st.title("🌊 Multimodal Ocean Hazard Analyzer — Text + Image + Social Media")
+st.markdown("""
+This demo combines **text analysis**, **image analysis**, and **Twitter** (optional) to detect ocean hazards.
+- Provide text and optional image, or fetch recent tweets for keywords.
+- Uses weighted keyword scoring + transformers sentiment + image classification to fuse a final hazard level.
+""")
+
+# Sidebar options
+st.sidebar.header("Mode & Settings")
+mode = st.sidebar.radio("Mode", ["Custom Input", "Twitter Keywords (live)", "Batch Mock Demo"])
+keywords_input = st.sidebar.text_input("Keywords (space-separated)", "tsunami storm surge flood cyclone")
+keywords = [k.strip() for k in keywords_input.split() if k.strip()]
+tweet_count = st.sidebar.slider("Max tweets to fetch", 1, 50, 10)
+use_image_model = st.sidebar.checkbox("Enable image analysis", value=True)
+show_debug = st.sidebar.checkbox("Show debug details (scores / matched labels)", value=False)
+
+# Content area columns
+col_l, col_r = st.columns([2, 1])
+
+with col_l:
+    if mode == "Custom Input":
+        st.subheader("Custom Text + Image")
+        user_text = st.text_area("Enter text (tweet / report)", height=150)
+        uploaded_file = st.file_uploader("Upload an image (optional)", type=["jpg", "jpeg", "png"])
+        run_btn = st.button("Analyze Input")
+        if run_btn:
+            if not user_text and not uploaded_file:
+                st.warning("Please provide text and/or an image for analysis.")
+            else:
+                # text analysis
+                t_score = calculate_text_hazard_score(user_text) if user_text else 0.0
+                sentiment_result = cached_sentiment(user_text) if user_text else {'label': 'NEUTRAL', 'score': 1.0}
+                sent_label = sentiment_result['label']
+                z = cached_zero_shot(user_text) if user_text else {'labels': ['neutral']}
+                text_hazard_class = z['labels'][0]
+
+                # image analysis
+                image_score = 0.0
+                matched_image_labels = []
+                if uploaded_file and use_image_model:
+                    pil = decode_image(uploaded_file.getvalue())
+                    if pil is None:
+                        st.error("Could not read the uploaded image (unsupported or too large).")
+                        st.stop()
+                    image_score, matched_image_labels = calculate_image_hazard_score(pil, uploaded_file.getvalue())
+
+                elif uploaded_file is None and MOCK_IMAGE_PATH:
+                    pil = Image.open(MOCK_IMAGE_PATH).convert("RGB")
+                    image_score, matched_image_labels = calculate_image_hazard_score(pil)
+
+                # fuse
+                image_confident = image_score >= 3.0
+                fused_score, norms = fuse_scores(t_score, image_score, image_confident=image_confident)
+                # Text-only reports are rated on the text score, as in the API
+                image_scored = bool(uploaded_file and use_image_model) or (uploaded_file is None and bool(MOCK_IMAGE_PATH))
+                final_risk = risk_from_score(fused_score if image_scored else t_score)
+                st.markdown("### Result")
+                st.write(f"**Text Hazard Score:** {t_score:.2f}")
+                st.write(f"**Text Hazard Class (zero-shot):** {text_hazard_class}")
+                st.write(f"**Text Sentiment:** {sent_label}")
+                st.write(f"**Image Hazard Score:** {image_score:.2f}")
+                if matched_image_labels:
+                    st.write("**Matched image labels:**")
+                    for lbl, conf in matched_image_labels:
+                        st.write(f"- {lbl} ({conf:.2f})")
+                st.write(f"**Fused Score (0-10):** {fused_score:.2f}")
+                st.markdown(f"## 🔴 Final Hazard Level: **{final_risk}**")
+
+                if show_debug:
+                    st.write("Debug:", norms)
+
+    elif mode == "Twitter Keywords (live)":
+        st.subheader("Fetch Tweets for Keywords & Analyze (live)")
+        st.write("If Twitter credentials are not configured, toggle to 'Batch Mock Demo' or add BEARER token in `.env`.")
+        if not twitter_client:
+            st.warning("Twitter client not configured or failed. Add TWITTER_BEARER_TOKEN to `.env` to enable live fetch.")
+        run_twitter = st.button("Fetch & Analyze Tweets")
+        if run_twitter:
+            if not keywords:
+                st.warning("Enter at least one keyword.")
+            else:
+                tweets_data = fetch_tweets_with_media(keywords, max_results=tweet_count) if twitter_client else MOCK_TWEETS
+                if not tweets_data:
+                    st.info("No tweets found. Using mock data.")
+                    tweets_data = MOCK_TWEETS
+                # download all attachments up front, in parallel
+                all_urls = [u for tw in tweets_data if isinstance(tw, dict) for u in tw.get("media_urls", [])]
+                downloaded, clips = download_images(all_urls) if all_urls else ({}, {})
+                # score every attachment of the batch together; clips from a few sampled frames
+                image_scores = dict(zip(downloaded, calculate_image_hazard_scores(list(downloaded.values()))))
+                for url, (data, kind) in clips.items():
+                    image_scores[url] = calculate_media_hazard_score(data, kind)
+                # aggregate results list
+                rows = []
+                for tw in tweets_data:
+                    text = tw.get("text") if isinstance(tw, dict) else tw
+                    media_urls = tw.get("media_urls", []) if isinstance(tw, dict) else []
+                    # text metrics
+                    t_score = calculate_text_hazard_score(text)
+                    sent_label = cached_sentiment(text)['label'] if text else "NEUTRAL"
+                    z = cached_zero_shot(text) if text else {'labels': ['neutral']}
+                    text_hazard_class = z['labels'][0]
+                    # images (if any)
+                    image_score = 0.0
+                    matched_labels = []
+                    for url in media_urls:
+                        iscore, mlabels = image_scores.get(url, (0.0, []))
+                        # keep the max image score across attachments
+                        if iscore > image_score:
+                            image_score = iscore
+                            matched_labels = mlabels
+                    # fuse
+                    image_confident = image_score >= 3.0
+                    fused_score, norms = fuse_scores(t_score, image_score, image_confident=image_confident)
+                    final_risk = risk_from_score(fused_score if media_urls else t_score)
+                    rows.append({
+                        "id": tw.get("id") if isinstance(tw, dict) else None,
+                        "text": text,
+                        "media_count": len(media_urls),
+                        "text_score": round(t_score, 2),
+                        "image_score": round(image_score, 2),
+                        "fused_score": fused_score,
+                        "final_risk": final_risk,
+                        "sentiment": sent_label,
+                        "text_hazard_class": text_hazard_class,
+                        "matched_image_labels": matched_labels
+                    })
+
+                persist_rows(rows, "streamlit-twitter")
+                df = pd.DataFrame(rows)
+                st.subheader("Analyzed Tweets")
+                st.dataframe(df[["final_risk", "fused_score", "text_score", "image_score", "sentiment", "text_hazard_class", "media_count"]].sort_values(by="fused_score", ascending=False))
+
+                # Visualizations
+                if not df.empty:
+                    # risk distribution
+                    st.subheader("Risk Distribution")
+                    fig1, ax1 = plt.subplots()
+                    df['final_risk'].value_counts().reindex(["High","Medium","Low"]).fillna(0).plot(kind='bar', ax=ax1, color=['red','orange','green'])
+                    ax1.set_ylabel("Count")
+                    st.pyplot(fig1)
+
+                    # sentiment pie
+                    st.subheader("Sentiment Distribution")
+                    fig2, ax2 = plt.subplots()
+                    df['sentiment'].value_counts().plot.pie(autopct='%1.1f%%', ax=ax2)
+                    ax2.set_ylabel("")
+                    st.pyplot(fig2)
+
+                    # word cloud from the rolling trending counts (last hour of analyzed tweets)
+                    st.subheader("Trending Keywords")
+                    add_to_trending(rows)
+                    kw = dict(trending_engine.trending("1h", n=30))
+                    if kw:
+                        wc = WordCloud(width=800, height=300, background_color='white').generate_from_frequencies(kw)
+                        fig3, ax3 = plt.subplots(figsize=(10,3))
+                        ax3.imshow(wc, interpolation='bilinear')
+                        ax3.axis('off')
+                        st.pyplot(fig3)
+
+    else:  # Batch Mock Demo
+        st.subheader("Batch Mock Demo (offline)")
+        if st.button("Run Mock Demo"):
+            tweets_data = MOCK_TWEETS
+            rows = []
+            for tw in tweets_data:
+                text = tw.get("text") if isinstance(tw, dict) else tw
+                t_score = calculate_text_hazard_score(text)
+                sent_label = cached_sentiment(text)['label']
+                z = cached_zero_shot(text)
+                text_hazard_class = z['labels'][0]
+                image_score = 0.0
+                fused_score, norms = fuse_scores(t_score, image_score)
+                final_risk = risk_from_score(t_score)
+                rows.append({
+                    "text": text,
+                    "text_score": round(t_score,2),
+                    "image_score": image_score,
+                    "fused_score": fused_score,
+                    "final_risk": final_risk,
+                    "sentiment": sent_label,
+                    "text_hazard_class": text_hazard_class
+                })
+            persist_rows(rows, "streamlit-mock")
+            df = pd.DataFrame(rows)
+            st.dataframe(df)
+            st.subheader("Risk Distribution")
+            fig1, ax1 = plt.subplots()
+            df['final_risk'].value_counts().reindex(["High","Medium","Low"]).fillna(0).plot(kind='bar', ax=ax1, color=['red','orange','green'])
+            st.pyplot(fig1)
+
+# Footer / notes
+st.markdown("---")
+st.markdown("""
+**Notes & Limitations**  
+- The image classifier is *general-purpose*; matching labels to hazard keywords is heuristic. For production you'd want a fine-tuned model for floods/tsunami/shoreline damage.  
+- Twitter API v2 media access may be limited by your app access level; mock mode ensures demo stability.  
+- Thresholds and weights can be tuned with labeled data for better accuracy.
+""")
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Memory-only cache, no warm-up, no shared inference server.
+os.environ["HAZARD_CACHE_PATH"] = ""
+os.environ["HAZARD_WARMUP"] = "0"
+os.environ.pop("HAZARD_INFERENCE_SOCKET", None)
+
+
+@pytest.fixture(scope="session")
+def hazard():
+    """The app module with deterministic stand-in models (benchmarks/stubs.py)."""
+    import app_multimodal_hazard
+    from benchmarks import stubs
+
+    stubs.install(app_multimodal_hazard.registry)
+    return app_multimodal_hazard
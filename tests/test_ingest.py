@@ -0,0 +1,159 @@
+import io
+import json
+
+import pytest
+from PIL import Image
+
+import ingest
+
+
+def _tweet(id, text, media_keys=None):
+    t = {"id": id, "text": text}
+    if media_keys:
+        t["attachments"] = {"media_keys": media_keys}
+    return t
+
+
+def _page(*tweets, media=()):
+    return {"data": list(tweets), "includes": {"media": list(media)}}
+
+
+def _recording():
+    """Three pages of one search, newest tweets first."""
+    return [
+        _page(
+            _tweet(130, "Tsunami warning issued for the coast!", ["3_1"]),
+            _tweet(129, "Flood water rising near the river bank"),
+            media=[{"media_key": "3_1", "type": "photo", "url": "https://pbs.example/1.jpg"}],
+        ),
+        _page(
+            # A repost of 130 with different casing and punctuation.
+            _tweet(128, "TSUNAMI warning issued for the coast"),
+            _tweet(127, "Lovely calm evening by the sea"),
+        ),
+        _page(_tweet(126, "Cyclone expected to make landfall tonight")),
+    ]
+
+
+def _jpeg():
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 48), "navy").save(buf, "JPEG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def offline_media(hazard, monkeypatch):
+    """Serves every media URL from memory instead of the network."""
+    requested = []
+
+    def download_images(urls, deadline_s=None):
+        for url in urls:
+            requested.append(url)
+            yield url, _jpeg()
+
+    monkeypatch.setattr(hazard, "download_images", download_images)
+    return requested
+
+
+def _rows(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def _scheduler(now=1000.0):
+    clock = [now]
+    sleeps = []
+
+    def sleep(s):
+        sleeps.append(s)
+        clock[0] += s
+
+    return ingest.RateLimitScheduler(poll_interval=30, clock=lambda: clock[0], sleep=sleep), sleeps
+
+
+def test_one_poll_pages_dedupes_scores_and_sinks(tmp_path, offline_media):
+    client = ingest.FakeTwitterClient(_recording())
+    out, ckpt = tmp_path / "out.jsonl", tmp_path / "ckpt.json"
+
+    n = ingest.run(client, ["tsunami", "flood"], str(ckpt), str(out), once=True)
+
+    assert [c["next_token"] for c in client.calls] == [None, "1", "2"]
+    assert all(c["since_id"] is None for c in client.calls)
+    rows = _rows(out)
+    assert n == len(rows) == 4
+    assert [r["id"] for r in rows] == [130, 129, 127, 126]
+    for r in rows:
+        assert {"text_score", "image_score", "fused_score", "final_risk", "sentiment"} <= set(r)
+    assert rows[0]["media_urls"] == ["https://pbs.example/1.jpg"]
+    assert offline_media == ["https://pbs.example/1.jpg"]
+    assert rows[0]["fused_score"] > rows[2]["fused_score"]
+    assert json.loads(ckpt.read_text())["since_id"] == "130"
+
+
+def test_rate_limit_waits_for_reset_then_continues(tmp_path, offline_media):
+    pages = _recording()
+    pages.insert(1, {"error": 429, "headers": {"x-rate-limit-reset": "1500"}})
+    client = ingest.FakeTwitterClient(pages)
+    scheduler, sleeps = _scheduler(now=1000.0)
+    checkpoint = ingest.Checkpoint(str(tmp_path / "ckpt.json"))
+    sink = ingest.JsonlSink(str(tmp_path / "out.jsonl"))
+
+    stream = ingest.fetch(client, ["tsunami"], checkpoint, scheduler, once=True)
+    list(sink(ingest.score(ingest.dedupe(stream))))
+
+    assert scheduler.rate_limited == 1
+    # The retry waited until one second past the reset, not a fixed backoff.
+    assert sleeps == [501.0]
+    # The rate-limited page was asked for again and paging went on from there.
+    assert [c["next_token"] for c in client.calls] == [None, "1", "1", "2"]
+    assert sink.count == 4
+    assert checkpoint.since_id == "130"
+
+
+def test_other_errors_fail_a_single_poll(tmp_path):
+    client = ingest.FakeTwitterClient([{"error": 503}])
+    scheduler, _ = _scheduler()
+    checkpoint = ingest.Checkpoint(str(tmp_path / "ckpt.json"))
+
+    with pytest.raises(ingest.FakeHTTPError):
+        list(ingest.fetch(client, ["flood"], checkpoint, scheduler, once=True))
+    assert checkpoint.since_id is None
+    assert scheduler.failures == 1
+
+
+def test_resume_asks_only_for_newer_tweets(tmp_path, offline_media):
+    out, ckpt = tmp_path / "out.jsonl", tmp_path / "ckpt.json"
+    ingest.run(ingest.FakeTwitterClient(_recording()), ["tsunami"], str(ckpt), str(out), once=True)
+
+    # Later the search also returns two newer tweets ahead of the old ones.
+    newer = [_page(
+        _tweet(132, "Landslide blocks the highway after heavy rain"),
+        _tweet(131, "Storm surge floods the harbour"),
+    )] + _recording()
+    client = ingest.FakeTwitterClient(newer)
+    n = ingest.run(client, ["tsunami"], str(ckpt), str(out), once=True)
+
+    # Paging stops at the first page that reaches back to the checkpoint.
+    assert [(c["since_id"], c["next_token"]) for c in client.calls] == [("130", None), ("130", "1")]
+    assert n == 2
+    assert [r["id"] for r in _rows(out)] == [130, 129, 127, 126, 132, 131]
+    assert json.loads(ckpt.read_text())["since_id"] == "132"
+
+
+def test_checkpoint_only_advances_after_the_poll_is_sunk(tmp_path, offline_media):
+    client = ingest.FakeTwitterClient(_recording())
+    scheduler, _ = _scheduler()
+    checkpoint = ingest.Checkpoint(str(tmp_path / "ckpt.json"))
+    sink = ingest.JsonlSink(str(tmp_path / "out.jsonl"))
+
+    results = sink(ingest.score(ingest.dedupe(
+        ingest.fetch(client, ["tsunami"], checkpoint, scheduler, once=True)
+    ), batch_size=2))
+    first = next(results)
+    assert first["id"] == 130
+    # A crash here must not skip the rest of the poll on restart.
+    assert checkpoint.since_id is None
+    assert not (tmp_path / "ckpt.json").exists()
+
+    list(results)
+    assert checkpoint.since_id == "130"
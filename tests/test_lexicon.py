@@ -0,0 +1,105 @@
+import random
+import re
+
+import pytest
+
+from lexicon import HazardLexicon, tokenize
+
+
+# The regex scorer HazardLexicon replaced, kept verbatim as the reference.
+def clean_text(t):
+    t = re.sub(r"http\S+", " ", t)
+    t = re.sub(r"[^A-Za-z0-9\s]", " ", t)
+    t = re.sub(r"\s+", " ", t).strip()
+    return t.lower()
+
+
+def regex_score(text, weights):
+    text_l = clean_text(text)
+    score = 0
+    for kw, weight in weights.items():
+        matches = len(re.findall(rf"\b{re.escape(kw)}\b", text_l))
+        score += matches * weight
+    urgency = text.count("!") + sum(1 for w in text.split() if w.isupper() and len(w) > 1)
+    score += min(urgency * 1.5, 4)
+    return float(score)
+
+
+CASES = [
+    "",
+    "   ",
+    "Huge tsunami warning issued for coastal areas!",
+    "TSUNAMI!!! EARTHQUAKE!! run to high ground",
+    "flood flooding floods flood-water flood_water flood's",
+    # Unicode whitespace between keywords.
+    "tsunami\u00a0flood\u2003storm\u3000surge\u2028wave\u200bwind",
+    "tsunami\tflood\nstorm\r\nsurge\x0bwave\x0cwind\x1csea\x1frain\x85coast",
+    # URLs, including ones glued to keywords and ones with Unicode in them.
+    "flood http://example.com/flood tsunami https://t.co/x?q=storm",
+    "floodhttp://x.y/tsunami storm",
+    "see http://例え.jp/津波 cyclone",
+    "http flood https",
+    # Underscores and other word characters the old \b treated specially.
+    "_flood_ __tsunami__ storm_surge #flood @tsunami_alert",
+    # Non-ASCII letters, digits and marks adjacent to keywords.
+    "floodé tsunamiß Ölstorm cyclone\u0301 wave٠ ١٢ surge",
+    "ＴＳＵＮＡＭＩ ｆｌｏｏｄ tsunami",
+    "İstanbul earthquake ǅ DŽ ﬁre wildﬁre",
+    "🌊 tsunami🌊flood 🌪️cyclone ⚠️ WARNING ⚠️",
+    "Ünïcödé CAPS ÉÉ É A1 B2 a!b!c!",
+    "\ud83c flood \udf0a tsunami",
+    "EARTHQUAKE earthquake Earthquake eArThQuAkE",
+    "volcano eruption 2024 volcano2024 2024volcano",
+]
+
+
+@pytest.fixture(scope="module")
+def weights():
+    from hazards import HAZARD_WEIGHTS
+
+    return HAZARD_WEIGHTS
+
+
+def _random_texts(weights, n=2000, seed=7):
+    rng = random.Random(seed)
+    pieces = list(weights) + [k.upper() for k in weights] + [
+        " ", "  ", "\t", "\n", "\u00a0", "\u2003", "\u3000", "_", "-", "'", "!", "!!", "?", ".",
+        "http://a.b/", "https://t.co/", "http", "é", "ß", "Ö", "日本", "🌊", "\u0301", "Ｆ",
+        "٣", "a", "B", "x1", "42", "İ", "ﬁ", "\ud800",
+    ]
+    for _ in range(n):
+        yield "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_tokens_match_clean_text(text):
+    assert [t.decode() for t in tokenize(text)] == clean_text(text).split()
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_score_matches_regex_scorer(text, weights):
+    assert HazardLexicon(weights).score(text) == regex_score(text, weights)
+
+
+def test_random_texts_match_regex_scorer(weights):
+    lexicon = HazardLexicon(weights)
+    texts = list(_random_texts(weights))
+    expected = [regex_score(t, weights) for t in texts]
+    assert [lexicon.score(t) for t in texts] == expected
+    assert lexicon.score_many(texts) == expected
+    for t in texts:
+        assert [w.decode() for w in tokenize(t)] == clean_text(t).split(), t
+
+
+def test_app_clean_text_is_the_reference():
+    import app_multimodal_hazard
+
+    for text in CASES:
+        assert app_multimodal_hazard.clean_text(text) == clean_text(text)
+
+
+def test_rejects_keywords_the_regex_scorer_could_match_differently():
+    with pytest.raises(ValueError):
+        HazardLexicon({"storm surge": 5})
+    with pytest.raises(ValueError):
+        HazardLexicon({"flood_water": 5})
@@ -0,0 +1,178 @@
+import threading
+import time
+from array import array
+from collections import Counter
+
+from lexicon import tokenize
+
+DEFAULT_WINDOWS = {"5m": 300, "1h": 3600, "24h": 86400}
+
+
+def sketch_cells(key, width, depth):
+    h = hash(key)
+    return tuple(hash((i, h)) % width for i in range(depth))
+
+
+class CountMinSketch:
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array("q", bytes(8 * width)) for _ in range(depth)]
+
+    def cells(self, key):
+        return sketch_cells(key, self.width, self.depth)
+
+    def add(self, key, n=1, cells=None):
+        for row, j in zip(self.rows, cells or self.cells(key)):
+            row[j] += n
+
+    def estimate(self, key):
+        return min(row[j] for row, j in zip(self.rows, self.cells(key)))
+
+    def subtract(self, other):
+        for mine, theirs in zip(self.rows, other.rows):
+            for j, v in enumerate(theirs):
+                if v:
+                    mine[j] -= v
+
+    def clear(self):
+        for row in self.rows:
+            row[:] = array("q", bytes(8 * self.width))
+
+
+class _Bucket:
+    def __init__(self, width, depth):
+        self.sketch = CountMinSketch(width, depth)
+        self.hazards = Counter()
+        self.texts = 0
+        self.score_sum = 0.0
+        self.high = 0
+        self.touched = False
+
+    def reset(self):
+        if self.touched:
+            self.sketch.clear()
+        self.hazards.clear()
+        self.texts = 0
+        self.score_sum = 0.0
+        self.high = 0
+        self.touched = False
+
+
+class SlidingWindow:
+    """Keyword and hazard counts over the last `span` seconds.
+
+    The window is a ring of `buckets` time slices plus running totals; an
+    expiring slice is subtracted from the totals, so updates and queries
+    never rescan history. Keyword counts live in count-min sketches and only
+    a bounded candidate set is kept for the top-k query.
+    """
+
+    def __init__(self, span, buckets=30, width=2048, depth=4, top_k=50):
+        self.span = span
+        self.bucket_span = span / buckets
+        self.ring = [_Bucket(width, depth) for _ in range(buckets)]
+        self.total = _Bucket(width, depth)
+        self.top_k = top_k
+        self.candidates = {}
+        self.current = None
+
+    def _advance(self, now):
+        idx = int(now // self.bucket_span)
+        if self.current is None:
+            self.current = idx
+            return
+        steps = min(idx - self.current, len(self.ring))
+        for step in range(1, steps + 1):
+            old = self.ring[(self.current + step) % len(self.ring)]
+            if old.touched:
+                self.total.sketch.subtract(old.sketch)
+                self.total.hazards.subtract(old.hazards)
+                self.total.texts -= old.texts
+                self.total.score_sum -= old.score_sum
+                self.total.high -= old.high
+                old.reset()
+        self.current = max(self.current, idx)
+
+    def add(self, keywords, hazards, score, high, now):
+        """`keywords` is a list of (keyword, sketch cells) pairs."""
+        self._advance(now)
+        bucket = self.ring[self.current % len(self.ring)]
+        bucket.touched = self.total.touched = True
+        for kw, cells in keywords:
+            bucket.sketch.add(kw, cells=cells)
+            self.total.sketch.add(kw, cells=cells)
+            self.candidates[kw] = True
+        bucket.hazards.update(hazards)
+        self.total.hazards.update(hazards)
+        bucket.texts += 1
+        self.total.texts += 1
+        if score is not None:
+            bucket.score_sum += score
+            self.total.score_sum += score
+        if high:
+            bucket.high += 1
+            self.total.high += 1
+        if len(self.candidates) > 4 * self.top_k:
+            self._prune()
+
+    def _prune(self):
+        ranked = sorted(self.candidates, key=self.total.sketch.estimate, reverse=True)
+        self.candidates = dict.fromkeys(ranked[: 2 * self.top_k], True)
+
+    def trending(self, n, now):
+        self._advance(now)
+        est = self.total.sketch.estimate
+        ranked = sorted(((kw, est(kw)) for kw in self.candidates), key=lambda x: -x[1])
+        return [(kw, c) for kw, c in ranked[:n] if c > 0]
+
+    def summary(self, now):
+        self._advance(now)
+        t = self.total
+        return {
+            "texts": t.texts,
+            "hazard_index": (t.score_sum / t.texts) if t.texts else 0.0,
+            "high_risk_share": (t.high / t.texts) if t.texts else 0.0,
+            "hazards": {k: v for k, v in t.hazards.most_common() if v > 0},
+        }
+
+
+class TrendingEngine:
+    """Trending keywords and a rolling hazard index over several windows."""
+
+    def __init__(self, stopwords=(), hazard_keywords=(), windows=None, clock=time.time,
+                 width=2048, depth=4, **window_kw):
+        self.stopwords = {w.encode() for w in stopwords}
+        self.hazard_keywords = {w.encode() for w in hazard_keywords}
+        self.windows = {
+            name: SlidingWindow(span, width=width, depth=depth, **window_kw)
+            for name, span in (windows or DEFAULT_WINDOWS).items()
+        }
+        # Every window shares the sketch geometry, so cells are hashed once per keyword.
+        self.width = width
+        self.depth = depth
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    def add(self, text, score=None, high_risk=False, ts=None):
+        tokens = tokenize(text)
+        width, depth = self.width, self.depth
+        keywords = [
+            (kw, sketch_cells(kw, width, depth))
+            for kw in (t.decode() for t in tokens if len(t) > 2 and t not in self.stopwords)
+        ]
+        hazards = [t.decode() for t in tokens if t in self.hazard_keywords]
+        now = self.clock() if ts is None else ts
+        with self._lock:
+            for w in self.windows.values():
+                w.add(keywords, hazards, score, high_risk, now)
+
+    def trending(self, window="1h", n=15):
+        with self._lock:
+            return self.windows[window].trending(n, self.clock())
+
+    def snapshot(self, window="1h", n=15):
+        with self._lock:
+            w = self.windows[window]
+            now = self.clock()
+            return dict(w.summary(now), window=window, trending=w.trending(n, now))
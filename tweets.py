@@ -0,0 +1,56 @@
+"""Recent-tweet search with media, shared by the API, ingest.py and the Streamlit app."""
+import media
+
+TWEET_SEARCH_FIELDS = {
+    "expansions": ["attachments.media_keys"],
+    "media_fields": ["url", "preview_image_url", "type", "variants"],
+}
+
+
+def media_url(m):
+    """URL to score for a tweet media object.
+
+    Animated GIFs and videos use their smallest MP4 variant when videos can
+    be decoded (PyAV installed), otherwise their preview image.
+    """
+    if getattr(m, "type", None) in ("animated_gif", "video") and media.video_supported():
+        variants = [v for v in getattr(m, "variants", None) or [] if v.get("content_type") == "video/mp4"]
+        if variants:
+            return min(variants, key=lambda v: v.get("bit_rate") or 0)["url"]
+    return getattr(m, "url", None) or getattr(m, "preview_image_url", None)
+
+
+def build_tweet_query(keywords):
+    return "(" + " OR ".join(keywords) + ") -is:retweet lang:en"
+
+
+def parse_tweets_response(resp):
+    tweets, includes = [], resp.includes or {}
+    media_map = {}
+    if "media" in includes:
+        for m in includes["media"]:
+            key = getattr(m, "media_key", None)
+            url = media_url(m)
+            if key and url:
+                media_map[key] = url
+    if resp.data:
+        for t in resp.data:
+            text, m_urls = t.text, []
+            # tweepy exposes attachments as a plain dict
+            att = getattr(t, "attachments", None)
+            keys = att.get("media_keys") if isinstance(att, dict) else getattr(att, "media_keys", None)
+            for mk in keys or []:
+                if mk in media_map:
+                    m_urls.append(media_map[mk])
+            tweets.append({"id": getattr(t, "id", None), "text": text, "media_urls": m_urls})
+    return tweets
+
+
+def search_tweets(client, keywords, max_results=20):
+    """[{'id', 'text', 'media_urls'}] for one search; API errors propagate."""
+    resp = client.search_recent_tweets(
+        query=build_tweet_query(keywords),
+        max_results=max_results,
+        **TWEET_SEARCH_FIELDS,
+    )
+    return parse_tweets_response(resp)